@@ -9,8 +9,23 @@ from app.controller.productos_controller import productos_bp
 from app.controller.auth_controller import auth_bp
 from app.controller.admin_controller import admin_bp
 from app.controller.static_controller import static_bp
+from app.controller.metricas_controller import metricas_bp
 from app.security.jwt_callbacks import register_jwt_callbacks
+from app.security.contrasenias import init_contrasenias
+from app.security.revocation_cache import init_revocation_cache
 from app.service.cloudinary_service import init_cloudinary
+from app.service.cache_service import init_cache
+from app.service.trabajos_service import init_trabajos
+from app.service import imagenes_service
+from app.service.busqueda_service import init_busqueda
+from app.service.pool_service import init_pool
+from app.cli import register_commands
+from app.middleware.compresion import init_compresion
+from app.middleware.tiempos import init_tiempos
+from app.middleware.metricas import init_metricas
+from app.middleware.consultas_lentas import init_consultas_lentas
+from app.json_provider import init_json
+from app.service.usuarios_service import iniciar_purga_periodica
 """
 Este módulo define la función principal para crear e inicializar una aplicación Flask con configuración flexible.
 Funciones:
@@ -22,6 +37,14 @@ Características destacadas:
 - Inicialización de CORS con orígenes configurables y soporte para credenciales.
 - Registro tolerante de blueprints, útil para pruebas parciales.
 - Inicialización de extensiones comunes (base de datos, JWT).
+- Caché en memoria del catálogo público con invalidación automática.
+- Índice de búsqueda de productos por trigramas y comandos CLI de mantenimiento.
+- Compresión gzip/brotli de las respuestas según 'Accept-Encoding'.
+- Cabecera 'Server-Timing' (tiempo total, SQL y llamadas externas) en una muestra de las peticiones.
+- Métricas de Prometheus en /metrics (latencia por ruta, pool de conexiones, JWT, Cloudinary).
+- Registro opcional de consultas SQL lentas con su plan (EXPLAIN).
+- Proveedor JSON configurable (orjson) para jsonify y request.get_json.
+- Pool de conexiones configurable por entorno (DB_POOL_*), precalentado al arrancar el worker.
 """
 
 def _load_config(app, config_like):
@@ -81,7 +104,11 @@ def create_app(config_class=None):
 
     app.config['MAX_CONTENT_LENGTH'] = app.config.get('MAX_CONTENT_LENGTH', 5 * 1024 * 1024)
 
-    # Inicializar DB
+    # Serialización JSON (orjson si está disponible; misma salida que el proveedor de Flask)
+    init_json(app)
+
+    # Inicializar DB (con las opciones del pool de conexiones)
+    init_pool(app)
     db.init_app(app)
 
     # Inicializar JWT
@@ -91,7 +118,46 @@ def create_app(config_class=None):
     init_cloudinary(app)
     print("Cloudinary:", cloudinary.config().cloud_name)
 
+    # Variantes redimensionadas de /uploads (anchos permitidos y tope de la caché en disco)
+    imagenes_service.configurar(
+        app.config.get("IMAGENES_ANCHOS", (160, 320, 480, 640, 960, 1280, 1920)),
+        app.config.get("IMAGENES_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+    )
+
+    # Pool de trabajos en segundo plano (subidas/eliminaciones asincrónicas)
+    init_trabajos(app)
+
+    # Hash de contraseñas (método, costo y pool de procesos acotado)
+    init_contrasenias(app)
+
     register_jwt_callbacks(jwt)
+    init_revocation_cache(app)
+
+    # Caché del catálogo público (se invalida con cada escritura sobre productos)
+    init_cache(app)
+
+    # Índice de búsqueda de productos (se mantiene en cada flush)
+    init_busqueda(app)
+
+    # Registro de consultas SQL lentas (SQL_LENTAS_HABILITADO)
+    init_consultas_lentas(app)
+
+    # Métricas de Prometheus por ruta (latencia y códigos de estado)
+    init_metricas(app)
+
+    # Server-Timing por petición; se registra antes que la compresión para que su tiempo quede incluido
+    init_tiempos(app)
+
+    # Compresión gzip/br de las respuestas JSON y de texto
+    init_compresion(app)
+
+    # Comandos de mantenimiento (flask <comando>)
+    register_commands(app)
+
+    # Purga periódica opcional de la lista negra de tokens (0 = desactivada; usar 'flask purgar-tokens')
+    intervalo_purga = float(app.config.get("TOKEN_PURGE_INTERVAL", 0) or 0)
+    if intervalo_purga > 0:
+        iniciar_purga_periodica(app, intervalo_purga)
 
     # Registrar blueprints sólo si existen (evita errores en tests parciales)
     try:
@@ -118,6 +184,10 @@ def create_app(config_class=None):
         app.register_blueprint(static_bp)
     except Exception:
         pass
+    try:
+        app.register_blueprint(metricas_bp)
+    except Exception:
+        pass
 
     return app
 
@@ -0,0 +1,76 @@
+import time
+import click
+from app.extensions import db
+from app.migraciones.motor import estado, migrar
+from app.service.busqueda_service import reindexar_todo
+from app.service.semillas_service import CONTRASENIA_POR_DEFECTO, sembrar
+from app.service.usuarios_service import purgar_tokens_expirados
+"""
+Comandos de línea de comandos (Flask CLI) para tareas de mantenimiento.
+Uso:
+    flask --app app.wsgi <comando>
+Comandos:
+    reindexar-busqueda: Reconstruye el índice de trigramas de productos a partir de la tabla 'productos'.
+    purgar-tokens: Elimina por lotes los tokens vencidos de la lista negra.
+    migrar: Aplica las migraciones pendientes del esquema (ver app/migraciones).
+    estado-migraciones: Muestra qué migraciones están aplicadas y cuáles pendientes.
+    seed: Genera usuarios, productos y pedidos sintéticos con INSERT masivos (ver semillas_service). Las
+        cantidades se multiplican por --escala; con --semilla los datos son reproducibles.
+"""
+
+def register_commands(app):
+
+    @app.cli.command("reindexar-busqueda")
+    @click.option("--lote", default=1000, show_default=True, help="Productos procesados por lote.")
+    def reindexar_busqueda(lote):
+        """Reconstruye el índice de búsqueda de productos."""
+        reindexar_todo(lote)
+        click.echo("Índice de búsqueda reconstruido")
+
+    @app.cli.command("purgar-tokens")
+    @click.option("--lote", default=1000, show_default=True, help="Filas eliminadas por transacción.")
+    def purgar_tokens(lote):
+        """Elimina de la lista negra los tokens ya vencidos."""
+        total = purgar_tokens_expirados(lote)
+        click.echo(f"Tokens vencidos eliminados: {total}")
+
+    @app.cli.command("migrar")
+    @click.option("--hasta", type=int, default=None, help="Última versión a aplicar (por defecto, todas).")
+    def migrar_esquema(hasta):
+        """Aplica las migraciones pendientes del esquema."""
+        aplicadas = migrar(db.engine, hasta)
+        if not aplicadas:
+            click.echo("El esquema ya está actualizado")
+        for version in aplicadas:
+            click.echo(f"Migración {version:04d} aplicada")
+
+    @app.cli.command("estado-migraciones")
+    def estado_migraciones():
+        """Muestra el estado de cada migración del esquema."""
+        for version, descripcion, aplicada in estado(db.engine):
+            click.echo(f"{version:04d} [{'aplicada' if aplicada else 'pendiente'}] {descripcion}")
+
+    @app.cli.command("seed")
+    @click.option("--usuarios", default=1000, show_default=True, help="Usuarios a generar (antes de --escala).")
+    @click.option("--productos", default=2000, show_default=True, help="Productos a generar (antes de --escala).")
+    @click.option("--pedidos", default=10000, show_default=True, help="Pedidos a generar (antes de --escala).")
+    @click.option("--escala", type=float, default=1.0, show_default=True, help="Multiplicador de las cantidades.")
+    @click.option("--semilla", type=int, default=None, help="Semilla del generador aleatorio.")
+    @click.option("--lote", default=5000, show_default=True, help="Filas por INSERT masivo.")
+    @click.option("--admins", default=1, show_default=True, help="Cuántos de los usuarios generados son admin.")
+    @click.option("--contrasenia", default=CONTRASENIA_POR_DEFECTO, show_default=True,
+                  help="Contraseña de todos los usuarios generados.")
+    def seed(usuarios, productos, pedidos, escala, semilla, lote, admins, contrasenia):
+        """Carga datos sintéticos a gran escala."""
+        inicio = time.perf_counter()
+        try:
+            resultado = sembrar(int(usuarios * escala), int(productos * escala), int(pedidos * escala),
+                                semilla, lote, contrasenia, admins)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(
+            f"Generados {resultado['usuarios']} usuarios (desde el id {resultado['primer_usuario']}), "
+            f"{resultado['productos']} productos (desde el id {resultado['primer_producto']}) y "
+            f"{resultado['pedidos']} pedidos (desde el id {resultado['primer_pedido']}) "
+            f"en {time.perf_counter() - inicio:.1f} s"
+        )
@@ -18,6 +18,19 @@ class Config:
 
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5 MB
 
+    # Variantes redimensionadas de /uploads (?w=320&fmt=webp)
+    IMAGENES_ANCHOS = tuple(int(a) for a in os.getenv("IMAGENES_ANCHOS", "160,320,480,640,960,1280,1920").split(","))
+    IMAGENES_CACHE_MAX_BYTES = int(os.getenv("IMAGENES_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+    # Caché HTTP de /uploads: nombres con hash = inmutables (1 año; None = patrón por defecto del controlador);
+    # el resto, max-age en segundos
+    STATIC_INMUTABLE_PATRON = os.getenv("STATIC_INMUTABLE_PATRON") or None
+    STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", 3600))
+    # Descarga delegada al servidor web: "" (la sirve Flask), "x-sendfile" o "x-accel" (nginx)
+    STATIC_SENDFILE = os.getenv("STATIC_SENDFILE", "")
+    STATIC_X_ACCEL_PREFIJO = os.getenv("STATIC_X_ACCEL_PREFIJO", "/_uploads/")
+    USE_X_SENDFILE = STATIC_SENDFILE == "x-sendfile"
+
     # JWT Config
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=7)
@@ -27,12 +40,30 @@ class Config:
     JWT_HEADER_TYPE = "Bearer"
     JWT_BLACKLIST_ENABLED = True
     JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
+    # Caché de revocación por worker: intervalo de sincronización (seg, 0 = desactivada) y tamaños
+    JWT_REVOCATION_CACHE_TTL = float(os.getenv("JWT_REVOCATION_CACHE_TTL", 5))
+    JWT_REVOCATION_BLOOM_CAPACITY = int(os.getenv("JWT_REVOCATION_BLOOM_CAPACITY", 100000))
+    JWT_REVOCATION_NEGATIVE_CACHE = int(os.getenv("JWT_REVOCATION_NEGATIVE_CACHE", 10000))
+    # Purga de tokens vencidos de la lista negra: cada cuántos segundos (0 = sólo con 'flask purgar-tokens')
+    TOKEN_PURGE_INTERVAL = float(os.getenv("TOKEN_PURGE_INTERVAL", 0))
+    TOKEN_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", 1000))
+
+    # Hash de contraseñas: método de werkzeug con su costo, procesos del pool por worker (0 = en el hilo de la
+    # petición), máximo de hashes en curso o en espera y segundos de espera antes de responder 503
+    CONTRASENIA_HASH_METODO = os.getenv("CONTRASENIA_HASH_METODO", "scrypt:32768:8:1")
+    CONTRASENIA_PROCESOS = int(os.getenv("CONTRASENIA_PROCESOS", 2))
+    CONTRASENIA_MAX_PENDIENTES = int(os.getenv("CONTRASENIA_MAX_PENDIENTES", 32))
+    CONTRASENIA_TIMEOUT = float(os.getenv("CONTRASENIA_TIMEOUT", 10))
 
     # Cloudinary Config
     CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
     CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
     CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
 
+    # Trabajos en segundo plano (subidas asincrónicas a Cloudinary): hilos por worker y máximo en espera
+    TRABAJOS_HILOS = int(os.getenv("TRABAJOS_HILOS", 2))
+    TRABAJOS_MAX_PENDIENTES = int(os.getenv("TRABAJOS_MAX_PENDIENTES", 20))
+
     # URI de SQLAlchemy - CORREGIDO CON PUERTO Y SSL
     SQLALCHEMY_DATABASE_URI = (
         f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
@@ -49,6 +80,48 @@ class Config:
         }
     }
 
+    # Pool de conexiones (por worker): tamaño base, conexiones extra, espera máxima por una conexión (seg),
+    # reciclado antes de que MySQL/el proxy corte las inactivas (seg), ping al tomar una conexión y
+    # cuántas abrir al arrancar el worker (0 = ninguna)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 300))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_PREFILL = int(os.getenv("DB_POOL_PREFILL", 2))
+
+    # Caché del catálogo público (LRU + TTL en segundos)
+    CATALOGO_CACHE_MAX_ITEMS = int(os.getenv("CATALOGO_CACHE_MAX_ITEMS", 256))
+    CATALOGO_CACHE_TTL = float(os.getenv("CATALOGO_CACHE_TTL", 30))
+
+    # Listados de administración en streaming (?stream=json|ndjson): filas por lote
+    ADMIN_STREAM_LOTE = int(os.getenv("ADMIN_STREAM_LOTE", 500))
+
+    # Proveedor JSON: "orjson" (si está instalado) o "default" (json de la librería estándar)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
+    # Compresión de respuestas (gzip; br si está instalado 'brotli'): tamaño mínimo en bytes y niveles
+    COMPRESION_HABILITADA = os.getenv("COMPRESION_HABILITADA", "true").lower() == "true"
+    COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", 1024))
+    COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", 6))
+    COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", 4))
+
+    # Cabecera Server-Timing y log por petición (total, SQL, llamadas externas): fracción de peticiones medidas
+    SERVER_TIMING_HABILITADO = os.getenv("SERVER_TIMING_HABILITADO", "true").lower() == "true"
+    SERVER_TIMING_MUESTREO = float(os.getenv("SERVER_TIMING_MUESTREO", 0.1))
+    SERVER_TIMING_LOG = os.getenv("SERVER_TIMING_LOG", "true").lower() == "true"
+
+    # Registro de consultas SQL lentas (opcional): umbral en ms y planes (EXPLAIN) recordados por texto SQL
+    SQL_LENTAS_HABILITADO = os.getenv("SQL_LENTAS_HABILITADO", "false").lower() == "true"
+    SQL_LENTAS_UMBRAL_MS = float(os.getenv("SQL_LENTAS_UMBRAL_MS", 200))
+    SQL_LENTAS_MAX_PLANES = int(os.getenv("SQL_LENTAS_MAX_PLANES", 1000))
+    SQL_LENTAS_TTL_PLANES = float(os.getenv("SQL_LENTAS_TTL_PLANES", 24 * 60 * 60))
+
+    # Métricas de Prometheus en GET /metrics (con METRICAS_TOKEN se exige 'Authorization: Bearer <token>';
+    # en producción sin METRICAS_TOKEN la ruta queda deshabilitada)
+    METRICAS_HABILITADAS = os.getenv("METRICAS_HABILITADAS", "true").lower() == "true"
+    METRICAS_TOKEN = os.getenv("METRICAS_TOKEN") or None
+
     # Otras configuraciones de Flask
     ENV = os.getenv("FLASK_ENV", "production")
     DEBUG = ENV == "development"
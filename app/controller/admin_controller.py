@@ -1,22 +1,33 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, url_for
 from flask_jwt_extended import jwt_required
 from pydantic import ValidationError
 from app.controller.auth_middleware import require_admin
 from app.service.admin_service import (
     crear_producto, editar_pedido, editar_producto, editar_usuario,
-    eliminar_pedido, eliminar_producto, eliminar_usuario, listar_pedidos,
-    listar_productos, listar_usuarios, obtener_pedido, obtener_productos,
-    obtener_usuario
+    eliminar_pedido, eliminar_producto, eliminar_usuario, iterar_pedidos,
+    iterar_usuarios, listar_pedidos, listar_productos, listar_usuarios,
+    obtener_pedido, obtener_productos, obtener_usuario
 )
-from app.service.cloudinary_service import upload_image, delete_image
+from app.service.pool_service import estadisticas_pool
+from app.service.cloudinary_service import upload_image, delete_image, encolar_subida, encolar_eliminacion
+from app.service.trabajos_service import ColaLlenaError, obtener_trabajo
 
 """
 Controlador de rutas administrativas para la gestión de productos, usuarios y pedidos en la API.
 Incluye:
-- Subida y eliminación de imágenes de productos en Cloudinary.
+- Subida y eliminación de imágenes de productos en Cloudinary. Con '?async=true' la operación se encola y se
+  responde 202 con el id del trabajo, cuyo estado se consulta en GET /admin/trabajos/<id>.
 - CRUD completo para productos: listar, buscar (por nombre, id, categoría), crear, modificar y eliminar.
 - CRUD para usuarios: listar, obtener por id, modificar (rol y estado), y eliminar (cambio de estado a inactivo).
 - CRUD para pedidos: listar, buscar (por usuario, id, código de producto), modificar y eliminar.
+- GET /admin/db/pool: estado del pool de conexiones del worker que atiende (en uso, inactivas, overflow,
+  checkouts, timeouts y tiempos de espera), para dimensionar los workers de gunicorn frente a la base.
+
+Los listados generales (productos, usuarios y pedidos) aceptan 'limit' y 'cursor' opcionales para paginar por ID.
+El listado de productos acepta además 'fields' para traer y devolver sólo algunos campos.
+Los listados de usuarios y pedidos aceptan además '?stream=json' (un arreglo JSON) o '?stream=ndjson' (un objeto
+por línea): la respuesta se envía a medida que se recorre la tabla, por lotes de ADMIN_STREAM_LOTE filas, sin
+armar la lista completa en memoria. En ese modo se ignoran 'limit' y 'cursor'.
 
 Todas las rutas están protegidas por autenticación JWT y requieren permisos de administrador.
 """
@@ -34,6 +45,44 @@ MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def es_asincronico():
+    return request.args.get("async", default="false", type=str).lower() == "true"
+
+FORMATOS_STREAM = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+def formato_stream():
+    formato = request.args.get("stream", default=None, type=str)
+    if formato is not None and formato.lower() not in FORMATOS_STREAM:
+        raise ValueError("Error en el parámetro 'stream': debe ser 'json' o 'ndjson'")
+    return formato.lower() if formato else None
+
+def lote_stream():
+    return int(current_app.config.get("ADMIN_STREAM_LOTE", 500))
+
+def respuesta_stream(lotes, formato):
+    dumps = current_app.json.dumps
+
+    def generar():
+        if formato == "ndjson":
+            for items in lotes:
+                yield "".join(dumps(item) + "\n" for item in items)
+            return
+        separador = "["
+        for items in lotes:
+            if items:
+                yield separador + ",".join(dumps(item) for item in items)
+                separador = ","
+        yield "[]\n" if separador == "[" else "]\n"
+
+    return Response(stream_with_context(generar()), mimetype=FORMATOS_STREAM[formato])
+
+def respuesta_trabajo(trabajo_id):
+    return jsonify({
+        'trabajo_id': trabajo_id,
+        'estado': 'pendiente',
+        'url_estado': url_for('admin.get_trabajo', trabajo_id=trabajo_id)
+    }), 202
+
 # Ruta para subir imágenes a Cloudinary
 @admin_bp.route('/upload-image', methods=['POST'])
 @jwt_required()
@@ -65,11 +114,17 @@ def upload_image_endpoint():
                 'error': 'Tipo de archivo no permitido. Solo: ' + ', '.join(ALLOWED_EXTENSIONS)
             }), 400
 
+        # Subir a Cloudinary en segundo plano
+        if es_asincronico():
+            return respuesta_trabajo(encolar_subida(file, folder="productos"))
+
         # Subir a Cloudinary
         image_url = upload_image(file, folder="productos")
 
         return jsonify({'url': image_url}), 200
         
+    except ColaLlenaError as e:
+        return jsonify({'error': str(e)}), 503
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -86,6 +141,10 @@ def delete_image_endpoint():
         if not image_url:
             return jsonify({'error': 'No se especificó la URL de la imagen'}), 400
 
+        # Eliminar de Cloudinary en segundo plano
+        if es_asincronico():
+            return respuesta_trabajo(encolar_eliminacion(image_url))
+
         # Eliminar de Cloudinary
         success = delete_image(image_url)
         
@@ -94,9 +153,33 @@ def delete_image_endpoint():
         else:
             return jsonify({'error': 'No se pudo eliminar la imagen'}), 400
             
+    except ColaLlenaError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': 'Error al eliminar la imagen', 'detalle': str(e)}), 500
 
+# Consultar el estado de un trabajo en segundo plano
+@admin_bp.route('/trabajos/<string:trabajo_id>', methods=['GET'])
+@jwt_required()
+@require_admin
+def get_trabajo(trabajo_id):
+    try:
+        return jsonify(obtener_trabajo(trabajo_id)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": "Error interno del servidor", "detalle": str(e)}), 500
+
+# Estado del pool de conexiones a la base de datos (por worker)
+@admin_bp.route('/db/pool', methods=['GET'])
+@jwt_required()
+@require_admin
+def get_pool():
+    try:
+        return jsonify(estadisticas_pool()), 200
+    except Exception as e:
+        return jsonify({"error": "Error interno del servidor", "detalle": str(e)}), 500
+
 # Listar Productos
 @admin_bp.route("/productos", methods=["GET"])
 @jwt_required()
@@ -104,7 +187,10 @@ def delete_image_endpoint():
 def get_productos():
     try:
         L_mostrar = request.args.get("mostrar", default=None, type=str)
-        return jsonify(listar_productos(L_mostrar)), 200
+        limit = request.args.get("limit", default=None, type=str)
+        cursor = request.args.get("cursor", default=None, type=str)
+        fields = request.args.get("fields", default=None, type=str)
+        return jsonify(listar_productos(L_mostrar, limit, cursor, fields)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -206,7 +292,12 @@ def delete_producto(id):
 def get_usuarios():
     try:
         L_activos = request.args.get("activos", default=None, type=str)
-        return jsonify(listar_usuarios(L_activos)), 200
+        formato = formato_stream()
+        if formato:
+            return respuesta_stream(iterar_usuarios(L_activos, lote_stream()), formato)
+        limit = request.args.get("limit", default=None, type=str)
+        cursor = request.args.get("cursor", default=None, type=str)
+        return jsonify(listar_usuarios(L_activos, limit, cursor)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -233,6 +324,8 @@ def put_usuario(id):
     try:
         editar_usuario(id, request.json)
         return jsonify({"message":"Usuario modificado exitosamente"}), 200
+    except ColaLlenaError as e:
+        return jsonify({"error": str(e)}), 503
     except ValidationError as e:
         return jsonify({"error": "Error de validación", "detalles": e.errors()}), 400
     except ValueError as e:
@@ -263,7 +356,12 @@ def delete_usuario(id):
 def get_pedidos():
     try:
         L_cerrado = request.args.get("cerrado", default=None, type=str)
-        return jsonify(listar_pedidos(L_cerrado)), 200
+        formato = formato_stream()
+        if formato:
+            return respuesta_stream(iterar_pedidos(L_cerrado, lote_stream()), formato)
+        limit = request.args.get("limit", default=None, type=str)
+        cursor = request.args.get("cursor", default=None, type=str)
+        return jsonify(listar_pedidos(L_cerrado, limit, cursor)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
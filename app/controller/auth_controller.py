@@ -7,6 +7,7 @@ from flask_jwt_extended import (
     get_jwt_identity
 )
 from pydantic import ValidationError
+from app.service.trabajos_service import ColaLlenaError
 from app.service.usuarios_service import check_password, crear, logout_token, obtener
 """
 Controlador de autenticación para la API.
@@ -15,11 +16,13 @@ Rutas:
         - Respuestas:
             200: Retorna tokens de acceso y refresh.
             400: Error de validación o credenciales incorrectas.
+            503: Demasiados hashes de contraseña en curso (CONTRASENIA_MAX_PENDIENTES).
             500: Error interno del servidor.
     /auth/register (POST): Registra un nuevo usuario. Requiere datos de usuario en formato JSON.
         - Respuestas:
             201: Usuario creado exitosamente.
             400: Error de validación o datos incorrectos.
+            503: Demasiados hashes de contraseña en curso (CONTRASENIA_MAX_PENDIENTES).
             500: Error interno del servidor.
     /auth/logout (POST): Cierra la sesión del usuario autenticado. Requiere JWT válido.
         - Respuestas:
@@ -56,6 +59,8 @@ def login():
             "refresh": data["refresh"]
         }), 200
 
+    except ColaLlenaError as e:
+        return jsonify({"error": str(e)}), 503
     except ValidationError as e:
         return jsonify({"error": "Error de validación", "detalles": e.errors()}), 400
     except ValueError as e:
@@ -72,6 +77,8 @@ def register():
         crear(request.json)
         return jsonify({"message": "Usuario creado exitosamente"}), 201
 
+    except ColaLlenaError as e:
+        return jsonify({"error": str(e)}), 503
     except ValidationError as e:
         return jsonify({"error": "Error de validación", "detalles": e.errors()}), 400
     except ValueError as e:
@@ -82,15 +89,15 @@ def register():
 @auth_bp.route("/logout", methods=["POST"])     #✅ Probado en postman
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]
-    logout_token(jti)
+    claims = get_jwt()
+    logout_token(claims["jti"], claims.get("exp"))
     return jsonify({"message": "Logout OK"}), 200
 
 @auth_bp.route("/refresh", methods=["POST"])    #✅ Probado en postman
 @jwt_required(refresh=True)
 def refresh():
-    old_jti = get_jwt()["jti"]
-    logout_token(old_jti)
+    old_claims = get_jwt()
+    logout_token(old_claims["jti"], old_claims.get("exp"))
 
     user_id = get_jwt_identity()
     claims = get_jwt()
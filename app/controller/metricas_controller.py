@@ -0,0 +1,26 @@
+import hmac
+from flask import Blueprint, current_app, jsonify, request
+from app.middleware.metricas import exportar
+"""
+Controlador de métricas para Prometheus.
+Rutas:
+- GET /metrics: Devuelve todas las métricas (ver app/middleware/metricas.py) en formato de texto de Prometheus.
+  Si METRICAS_TOKEN está configurado, exige 'Authorization: Bearer <token>' (el scraper de Prometheus lo envía
+  con 'authorization' o 'bearer_token'). En producción (ENV='production') el token es obligatorio: sin él la ruta
+  responde 404. Fuera de producción, sin token la ruta es pública.
+"""
+
+metricas_bp = Blueprint("metricas", __name__)
+
+@metricas_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    token = current_app.config.get("METRICAS_TOKEN")
+    if not token and current_app.config.get("ENV") == "production":
+        return jsonify({"error": "Métricas deshabilitadas: configure METRICAS_TOKEN"}), 404
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"error": "No autorizado"}), 401
+    try:
+        cuerpo, content_type = exportar()
+        return cuerpo, 200, {"Content-Type": content_type}
+    except Exception as e:
+        return jsonify({"error": "Error interno del servidor", "detalle": str(e)}), 500
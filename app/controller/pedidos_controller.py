@@ -2,11 +2,13 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from pydantic import ValidationError
 from app.service.pedidos_service import crear, obtener, cancelar
+from app.service.productos_service import StockInsuficienteError
 """
 Controlador de pedidos para la API.
 Rutas:
     - GET /pedidos/me: Lista los pedidos del usuario autenticado. Permite filtrar por estado 'cerrado' mediante parámetro de consulta.
     - POST /pedidos: Crea un nuevo pedido para el usuario autenticado. Requiere datos en formato JSON.
+      Si falta stock responde 400 con la lista 'faltantes' (producto_id, nombre, disponible, solicitado).
     - DELETE /pedidos/<int:id>/cancelar: Cancela un pedido específico del usuario autenticado y devuelve el stock correspondiente.
 Decoradores:
     - Todas las rutas requieren autenticación JWT.
@@ -43,6 +45,8 @@ def post():
         return jsonify({"message": "Pedido creado exitosamente"}), 201
     except ValidationError as e:
         return jsonify({"error": "Error de validación", "detalles": e.errors()}), 400
+    except StockInsuficienteError as e:
+        return jsonify({"error": str(e), "faltantes": e.faltantes}), 400
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
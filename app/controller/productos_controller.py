@@ -1,24 +1,60 @@
-from flask import Blueprint, jsonify
+import zlib
+from functools import wraps
+from flask import Blueprint, jsonify, make_response, request
+from app.service.cache_service import obtener_version_catalogo
 from app.service.productos_service import listar, obtener, categorias_list, featured
 """
 Controlador de productos para la API.
 Rutas:
-- GET /productos: Lista todos los productos.
+- GET /productos: Lista todos los productos. Acepta 'limit' y 'cursor' opcionales para paginar por ID.
 - GET /productos/categoria/<string:categoria>: Busca productos por categoría.
 - GET /productos/<string:nombre>: Busca productos por nombre.
 - GET /productos/<int:id>: Busca producto por ID.
 - GET /productos/categoria: Lista todas las categorías de productos.
 - GET /productos/destacado: Lista todos los productos destacados.
+Las rutas que devuelven productos aceptan 'fields' (p.ej. '?fields=id,nombre,precio,imagen_url,stock') para
+traer y devolver sólo esos campos.
 Cada endpoint maneja errores de valor y errores internos del servidor, devolviendo mensajes apropiados en formato JSON.
+Caché HTTP:
+    Todas las rutas devuelven un ETag formado por la versión del catálogo y la URL pedida (débil si la respuesta
+    viaja comprimida).
+    Si el cliente envía If-None-Match con ese ETag se responde 304 sin consultar ni serializar productos.
 """
 
 productos_bp = Blueprint("productos", __name__)
 
+def con_etag(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        # la versión se lee ANTES de armar la respuesta: si hay una escritura en el medio,
+        # el ETag queda viejo y el cliente simplemente vuelve a descargar
+        try:
+            version = obtener_version_catalogo()
+        except Exception:
+            return fn(*args, **kwargs)
+
+        etag = f"catalogo-{version}-{zlib.crc32(request.full_path.encode()):08x}"
+        # comparación débil: la compresión convierte el ETag en W/"..."
+        if request.if_none_match.contains_weak(etag):
+            respuesta = make_response("", 304)
+        else:
+            respuesta = make_response(fn(*args, **kwargs))
+            if respuesta.status_code != 200:
+                return respuesta
+        respuesta.set_etag(etag)
+        respuesta.headers["Cache-Control"] = "no-cache"
+        return respuesta
+    return wrapper
+
 # Listar Productos
 @productos_bp.route("/productos", methods=["GET"]) #✅ Probado en postman
+@con_etag
 def get():
     try:
-        return jsonify(listar()), 200
+        limit = request.args.get("limit", default=None, type=str)
+        cursor = request.args.get("cursor", default=None, type=str)
+        fields = request.args.get("fields", default=None, type=str)
+        return jsonify(listar(limit, cursor, fields)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -26,9 +62,11 @@ def get():
 
 # buscar producto por categoria
 @productos_bp.route("/productos/categoria/<string:categoria>", methods=["GET"]) # ✅ Probado en postman
+@con_etag
 def get_category(categoria):
     try:
-        return jsonify(obtener(2, categoria)), 200
+        fields = request.args.get("fields", default=None, type=str)
+        return jsonify(obtener(2, categoria, fields)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -36,9 +74,11 @@ def get_category(categoria):
 
 # buscar producto por nombre
 @productos_bp.route("/productos/<string:nombre>", methods=["GET"])  #✅ Probado en postman
+@con_etag
 def get_name(nombre):
     try:
-        return jsonify(obtener(0, nombre)), 200
+        fields = request.args.get("fields", default=None, type=str)
+        return jsonify(obtener(0, nombre, fields)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -46,9 +86,11 @@ def get_name(nombre):
 
 # buscar producto por id
 @productos_bp.route("/productos/<int:id>", methods=["GET"]) #✅ Probado en postman
+@con_etag
 def get_id(id):
     try:
-        return jsonify(obtener(1, id)), 200
+        fields = request.args.get("fields", default=None, type=str)
+        return jsonify(obtener(1, id, fields)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -56,6 +98,7 @@ def get_id(id):
 
 # buscar todas las categorias de los productos
 @productos_bp.route("/productos/categoria", methods=["GET"])    #✅ Probado en postman
+@con_etag
 def get_all_categories():
     try:
         return jsonify(categorias_list()), 200
@@ -66,9 +109,11 @@ def get_all_categories():
 
 # Lista todos los productos destacados
 @productos_bp.route("/productos/destacado", methods=["GET"])    #✅ Probado en postman
+@con_etag
 def get_destacados():
     try:
-        return jsonify(featured()), 200
+        fields = request.args.get("fields", default=None, type=str)
+        return jsonify(featured(fields)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -1,5 +1,11 @@
-from flask import Blueprint, send_from_directory
+from flask import Blueprint, current_app, request, send_file
+from urllib.parse import quote
+import mimetypes
 import os
+import re
+from werkzeug.exceptions import HTTPException
+from werkzeug.security import safe_join
+from app.service.imagenes_service import normalizar_parametros, obtener_variante
 """
 Controlador para servir archivos estáticos subidos por los usuarios.
 Este módulo define un Blueprint de Flask para manejar la entrega de archivos ubicados en la carpeta 'static/uploads'.
@@ -7,14 +13,33 @@ Incluye una ruta para acceder a archivos dentro de subdirectorios específicos,
 Atributos:
     static_bp (Blueprint): Blueprint de Flask para rutas estáticas.
     UPLOAD_BASE (str): Ruta base absoluta donde se almacenan los archivos subidos.
+    PRECOMPRIMIDOS (tuple): Codificaciones aceptadas para archivos precomprimidos junto al original ('.br', '.gz').
+    PATRON_INMUTABLE (str): Patrón por defecto de nombres con hash (contenido direccionado).
 Rutas:
-    /uploads/<path:subpath> (GET): Sirve archivos desde la carpeta de uploads. 
+    /uploads/<path:subpath> (GET): Sirve archivos desde la carpeta de uploads.
         Parámetros:
             subpath (str): Ruta relativa dentro de 'uploads' del archivo solicitado.
+            w (int, query, opcional): Ancho deseado; se sirve una variante redimensionada (cacheada en disco).
+            fmt (str, query, opcional): Formato de la variante: webp, jpeg/jpg o png.
         Respuestas:
             200: Devuelve el archivo solicitado.
+            206: Devuelve el rango pedido en la cabecera 'Range'.
+            304: El archivo no cambió (If-None-Match / If-Modified-Since).
+            400: Parámetros 'w' o 'fmt' inválidos.
             404: Archivo no encontrado.
+            416: Rango inválido.
             500: Error interno al cargar el archivo.
+Caché HTTP:
+    Los archivos cuyo nombre contiene un hash (STATIC_INMUTABLE_PATRON) se sirven con
+    'Cache-Control: public, max-age=31536000, immutable'; el resto con 'public, max-age=STATIC_MAX_AGE'.
+    Siempre se envían ETag y Last-Modified, y se atienden peticiones condicionales y por rangos.
+Precomprimidos:
+    Si existe 'archivo.br' o 'archivo.gz' (no más viejo que el original) y el cliente lo acepta, se sirve ese
+    archivo con 'Content-Encoding' y 'Vary: Accept-Encoding'.
+Descarga delegada (STATIC_SENDFILE):
+    "x-sendfile": Se responde sólo con la cabecera 'X-Sendfile' (Apache/lighttpd) y el servidor envía el archivo.
+    "x-accel": Se responde con 'X-Accel-Redirect' hacia STATIC_X_ACCEL_PREFIJO (location 'internal' de nginx).
+    En ambos casos el worker queda libre en cuanto responde las cabeceras.
 """
 
 static_bp = Blueprint("static", __name__)
@@ -22,12 +47,82 @@ static_bp = Blueprint("static", __name__)
 # Ruta base de uploads
 UPLOAD_BASE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'uploads')
 
+PRECOMPRIMIDOS = (("br", ".br"), ("gzip", ".gz"))
+MAX_AGE_INMUTABLE = 365 * 24 * 60 * 60
+# hash hexadecimal de 16+ caracteres o uuid en el nombre del archivo
+PATRON_INMUTABLE = r"[0-9a-f]{16,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
 @static_bp.route('/uploads/<path:subpath>', methods=['GET'])
 def serve_upload(subpath):
     try:
-        # subpath será algo como: productos/imagen_123.jpg
-        return send_from_directory(UPLOAD_BASE, subpath)
+        ancho, formato = normalizar_parametros(
+            request.args.get("w", default=None, type=str),
+            request.args.get("fmt", default=None, type=str)
+        )
+        codificacion, hay_precomprimidos = None, False
+        if ancho is not None or formato is not None:
+            directorio, nombre, mimetype = obtener_variante(UPLOAD_BASE, subpath, ancho, formato)
+            ruta = os.path.join(directorio, nombre)
+        else:
+            # subpath será algo como: productos/imagen_123.jpg
+            ruta = safe_join(UPLOAD_BASE, subpath)
+            if ruta is None or not os.path.isfile(ruta):
+                raise FileNotFoundError(subpath)
+            mimetype = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+            ruta, codificacion, hay_precomprimidos = _elegir_precomprimido(ruta)
+
+        response = _enviar(ruta, mimetype, _max_age(subpath))
+        if codificacion:
+            response.headers["Content-Encoding"] = codificacion
+        if hay_precomprimidos:
+            response.vary.add("Accept-Encoding")
+        return response
+    except ValueError as e:
+        return {'error': str(e)}, 400
     except FileNotFoundError:
         return {'error': 'Archivo no encontrado'}, 404
+    except HTTPException:
+        # 416 (rango inválido) y demás respuestas HTTP de werkzeug
+        raise
     except Exception as e:
-        return {'error': 'Error al cargar el archivo'}, 500
\ No newline at end of file
+        return {'error': 'Error al cargar el archivo'}, 500
+
+def _elegir_precomprimido(ruta):
+    mtime_original = os.stat(ruta).st_mtime
+    hay_precomprimidos = False
+    for codificacion, extension in PRECOMPRIMIDOS:
+        try:
+            estado = os.stat(ruta + extension)
+        except FileNotFoundError:
+            continue
+        # un precomprimido más viejo que el original está desactualizado
+        if estado.st_mtime < mtime_original:
+            continue
+        hay_precomprimidos = True
+        if request.accept_encodings[codificacion] > 0:
+            return ruta + extension, codificacion, True
+    return ruta, None, hay_precomprimidos
+
+def _max_age(subpath):
+    nombre = os.path.splitext(os.path.basename(subpath))[0]
+    patron = current_app.config.get("STATIC_INMUTABLE_PATRON") or PATRON_INMUTABLE
+    if re.search(patron, nombre, re.IGNORECASE):
+        return MAX_AGE_INMUTABLE
+    return int(current_app.config.get("STATIC_MAX_AGE", 3600))
+
+def _enviar(ruta, mimetype, max_age):
+    if current_app.config.get("STATIC_SENDFILE") == "x-accel":
+        # nginx atiende Range y condicionales sobre el archivo interno
+        relativa = os.path.relpath(ruta, UPLOAD_BASE).replace(os.sep, "/")
+        prefijo = current_app.config.get("STATIC_X_ACCEL_PREFIJO", "/_uploads/").rstrip("/")
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers["X-Accel-Redirect"] = f"{prefijo}/{quote(relativa)}"
+    else:
+        # con USE_X_SENDFILE, send_file responde sólo con la cabecera 'X-Sendfile'
+        response = send_file(ruta, mimetype=mimetype, conditional=True, max_age=max_age)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if max_age == MAX_AGE_INMUTABLE:
+        response.cache_control.immutable = True
+    return response
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from pydantic import ValidationError
+from app.service.trabajos_service import ColaLlenaError
 from app.service.usuarios_service import obtener, editar
 """
 Controlador de usuarios para la API.
@@ -19,6 +20,7 @@ Rutas:
         Respuestas:
             200: Perfil actualizado exitosamente.
             400: Error de validación o datos incorrectos.
+            503: El servicio de contraseñas está saturado (si se cambia la contraseña).
             500: Error interno del servidor.
 """
 
@@ -43,6 +45,8 @@ def update_me():
         user_id = get_jwt_identity()
         editar(user_id, request.json, es_admin=False)
         return jsonify({"message": "Perfil actualizado"}), 200
+    except ColaLlenaError as e:
+        return jsonify({"error": str(e)}), 503
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except ValidationError as e:
@@ -0,0 +1,72 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin el paquete se usa el proveedor estándar de Flask
+    orjson = None
+"""
+Proveedor JSON de la aplicación basado en orjson (serialización en C), con la misma salida que el de Flask.
+Clases:
+    OrjsonProvider: Reemplaza 'app.json'; lo usan jsonify, request.get_json y flask.json.
+Funciones:
+    init_json(app): Registra el proveedor según JSON_PROVIDER ("orjson" o "default"). Si se pide orjson y
+        el paquete no está instalado, se mantiene el proveedor de Flask y se avisa en el log.
+Compatibilidad con DefaultJSONProvider:
+    - Claves ordenadas (sort_keys) y claves no string convertidas a texto.
+    - datetime/date con formato HTTP (http_date), Decimal y UUID como texto, dataclasses como diccionario.
+    - Salida compacta terminada en salto de línea; con indentación si la app está en modo debug.
+    - Diferencia: los caracteres no ASCII se escriben en UTF-8 en lugar de escaparse (\\uXXXX).
+      El JSON es equivalente para cualquier cliente.
+    - Si se pasan argumentos propios de json.dumps (cls, indent, ...) se delega en el proveedor estándar.
+"""
+
+def _por_defecto(obj):
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(DefaultJSONProvider):
+    # fechas y dataclasses pasan por _por_defecto para respetar el formato de Flask
+    opciones = (
+        orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    ) if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_por_defecto, option=self.opciones).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        opciones = self.opciones | orjson.OPT_APPEND_NEWLINE
+        if self.compact is None and self._app.debug or self.compact is False:
+            opciones |= orjson.OPT_INDENT_2
+        # los bytes van directo a la respuesta, sin pasar por str
+        return self._app.response_class(
+            orjson.dumps(obj, default=_por_defecto, option=opciones), mimetype=self.mimetype
+        )
+
+def init_json(app):
+    proveedor = str(app.config.get("JSON_PROVIDER", "orjson")).lower()
+    if proveedor != "orjson":
+        return
+    if orjson is None:
+        app.logger.warning("JSON_PROVIDER=orjson pero el paquete 'orjson' no está instalado; se usa el de Flask")
+        return
+    app.json = OrjsonProvider(app)
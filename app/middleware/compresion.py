@@ -0,0 +1,117 @@
+import zlib
+from flask import request
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin el paquete sólo se ofrece gzip
+    brotli = None
+"""
+Compresión de respuestas (gzip y, si está instalado el paquete 'brotli', br) negociada con 'Accept-Encoding'.
+Se registra como 'after_request' de la app, así aplica a todos los blueprints.
+Funciones:
+    init_compresion(app): Lee la configuración y registra el hook si COMPRESION_HABILITADA es verdadero.
+    elegir_codificacion(): Retorna 'br', 'gzip' o None según lo que acepta el cliente (y su calidad 'q').
+Reglas:
+    - Sólo se comprimen tipos de texto (COMPRESION_MIMETYPES) con status 200-299 (salvo 204 y 206).
+    - No se tocan respuestas que ya traen 'Content-Encoding', con 'Cache-Control: no-transform' o de archivos
+      (send_file), que tienen su propio manejo de rangos y precomprimidos.
+    - Respuestas con cuerpo en memoria: se comprimen si miden al menos COMPRESION_MIN_BYTES.
+    - Respuestas en streaming: se comprimen trozo a trozo a medida que se envían, sin juntar el cuerpo en memoria.
+    - El ETag pasa a ser débil (W/"...") porque los bytes ya no son los del recurso original.
+Configuración:
+    COMPRESION_HABILITADA (bool), COMPRESION_MIN_BYTES (int), COMPRESION_NIVEL_GZIP (1-9),
+    COMPRESION_NIVEL_BROTLI (0-11), COMPRESION_MIMETYPES (iterable de mimetypes).
+"""
+
+MIMETYPES_POR_DEFECTO = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+)
+
+def init_compresion(app):
+    if not app.config.get("COMPRESION_HABILITADA", True):
+        return
+
+    config = {
+        "min_bytes": int(app.config.get("COMPRESION_MIN_BYTES", 1024)),
+        "nivel_gzip": int(app.config.get("COMPRESION_NIVEL_GZIP", 6)),
+        "nivel_brotli": int(app.config.get("COMPRESION_NIVEL_BROTLI", 4)),
+        "mimetypes": frozenset(app.config.get("COMPRESION_MIMETYPES", MIMETYPES_POR_DEFECTO)),
+    }
+
+    @app.after_request
+    def comprimir_respuesta(response):
+        return _comprimir(response, config)
+
+def elegir_codificacion():
+    aceptadas = request.accept_encodings
+    calidad_br = aceptadas["br"] if brotli is not None else 0
+    calidad_gzip = aceptadas["gzip"]
+    if calidad_br <= 0 and calidad_gzip <= 0:
+        return None
+    # a igual calidad se prefiere brotli (comprime mejor el JSON)
+    return "br" if calidad_br >= calidad_gzip else "gzip"
+
+def _comprimir(response, config):
+    if response.mimetype not in config["mimetypes"]:
+        return response
+    response.vary.add("Accept-Encoding")
+
+    if request.method == "HEAD" or response.direct_passthrough \
+            or not 200 <= response.status_code < 300 or response.status_code in (204, 206) \
+            or "Content-Encoding" in response.headers or response.cache_control.no_transform:
+        return response
+
+    codificacion = elegir_codificacion()
+    if codificacion is None:
+        return response
+
+    if response.is_streamed:
+        compresor = _nuevo_compresor(codificacion, config)
+        response.response = _comprimir_stream(response.iter_encoded(), response.response, compresor)
+        response.headers.pop("Content-Length", None)
+    else:
+        datos = response.get_data()
+        if len(datos) < config["min_bytes"]:
+            return response
+        compresor = _nuevo_compresor(codificacion, config)
+        response.set_data(compresor.compress(datos) + compresor.flush())
+
+    response.headers["Content-Encoding"] = codificacion
+    etag, debil = response.get_etag()
+    if etag and not debil:
+        response.set_etag(etag, weak=True)
+    return response
+
+def _comprimir_stream(trozos, original, compresor):
+    try:
+        for trozo in trozos:
+            datos = compresor.compress(trozo)
+            if datos:
+                yield datos
+        yield compresor.flush()
+    finally:
+        # cerrar el iterable original (p.ej. libera el contexto de stream_with_context)
+        if hasattr(original, "close"):
+            original.close()
+
+class _CompresorBrotli:
+    def __init__(self, nivel):
+        self._compresor = brotli.Compressor(quality=nivel)
+
+    def compress(self, datos):
+        return self._compresor.process(datos)
+
+    def flush(self):
+        return self._compresor.finish()
+
+def _nuevo_compresor(codificacion, config):
+    if codificacion == "br":
+        return _CompresorBrotli(config["nivel_brotli"])
+    # wbits=31: formato gzip (cabecera + crc) en lugar de zlib crudo
+    return zlib.compressobj(config["nivel_gzip"], zlib.DEFLATED, 31)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.service.cache_service import LRUCache
+"""
+Registro de consultas SQL lentas con captura automática del plan (EXPLAIN). Es opcional: SQL_LENTAS_HABILITADO.
+Cada sentencia que tarda al menos SQL_LENTAS_UMBRAL_MS milisegundos se escribe como una línea JSON (nivel WARNING)
+en el logger 'app.consultas_lentas' con:
+    duracion_ms, sql, sql_hash (sha1 corto del texto), endpoint de Flask (si hay petición), funcion (primer
+    llamador dentro de app/service, p.ej. 'pedidos_service.obtener'), parametros (sólo la forma: tipos, nunca
+    valores) y explain (filas del plan).
+El plan se captura una sola vez por texto SQL distinto (se recuerdan SQL_LENTAS_MAX_PLANES textos durante
+SQL_LENTAS_TTL_PLANES segundos); las siguientes apariciones llevan 'explain': null y el mismo 'sql_hash'.
+EXPLAIN se ejecuta con un cursor DBAPI de la misma conexión (no dispara eventos), sólo para SELECT, UPDATE y
+DELETE, y con 'EXPLAIN QUERY PLAN' en SQLite. Si falla, se registra 'explain_error' y la sentencia original no se
+ve afectada.
+Funciones:
+    init_consultas_lentas(app): Lee la configuración y registra los eventos del Engine si está habilitado.
+"""
+
+logger = logging.getLogger("app.consultas_lentas")
+
+SENTENCIAS_EXPLICABLES = ("SELECT", "UPDATE", "DELETE")
+CARPETA_SERVICIOS = os.path.join("app", "service") + os.sep
+
+_config = {"habilitado": False, "umbral": 0.2}
+_planes = LRUCache(max_items=1000, ttl=24 * 60 * 60)
+
+def init_consultas_lentas(app):
+    _config["habilitado"] = bool(app.config.get("SQL_LENTAS_HABILITADO", False))
+    _config["umbral"] = float(app.config.get("SQL_LENTAS_UMBRAL_MS", 200)) / 1000
+    _planes.configurar(
+        int(app.config.get("SQL_LENTAS_MAX_PLANES", 1000)),
+        float(app.config.get("SQL_LENTAS_TTL_PLANES", 24 * 60 * 60))
+    )
+    if _config["habilitado"] and not event.contains(Engine, "before_cursor_execute", _antes_de_sql):
+        event.listen(Engine, "before_cursor_execute", _antes_de_sql)
+        event.listen(Engine, "after_cursor_execute", _despues_de_sql)
+        event.listen(Engine, "handle_error", _error_de_sql)
+
+def _antes_de_sql(conn, cursor, statement, parameters, context, executemany):
+    if _config["habilitado"]:
+        conn.info.setdefault("inicios_lentas", []).append(time.perf_counter())
+
+def _despues_de_sql(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicios_lentas")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    if _config["habilitado"] and duracion >= _config["umbral"]:
+        _registrar(conn, statement, parameters, executemany, duracion)
+
+def _error_de_sql(contexto):
+    inicios = contexto.connection.info.get("inicios_lentas") if contexto.connection is not None else None
+    if inicios:
+        inicios.pop()
+
+def _registrar(conn, statement, parameters, executemany, duracion):
+    sql_hash = hashlib.sha1(statement.encode()).hexdigest()[:12]
+    registro = {
+        "duracion_ms": round(duracion * 1000, 1),
+        "sql_hash": sql_hash,
+        "sql": statement,
+        "endpoint": request.endpoint if has_request_context() else None,
+        "funcion": _funcion_de_servicio(),
+        "parametros": _forma(parameters, executemany),
+        "explain": None,
+    }
+    if not executemany and _planes.get(sql_hash) is not True:
+        _planes.set(sql_hash, True)
+        try:
+            registro["explain"] = _explain(conn, statement, parameters)
+        except Exception as e:
+            registro["explain_error"] = str(e)
+    logger.warning(json.dumps(registro, default=str))
+
+def _funcion_de_servicio():
+    frame = sys._getframe(2)
+    while frame is not None:
+        ruta = frame.f_code.co_filename
+        if CARPETA_SERVICIOS in ruta:
+            modulo = os.path.splitext(os.path.basename(ruta))[0]
+            return f"{modulo}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+def _forma(parameters, executemany):
+    if executemany:
+        filas = list(parameters)
+        return {"filas": len(filas), "primera": _forma(filas[0], False) if filas else None}
+    if isinstance(parameters, dict):
+        return {clave: type(valor).__name__ for clave, valor in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(valor).__name__ for valor in parameters]
+    return type(parameters).__name__
+
+def _explain(conn, statement, parameters):
+    if not statement.lstrip().upper().startswith(SENTENCIAS_EXPLICABLES):
+        return None
+    prefijo = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefijo + statement, parameters)
+        return [list(fila) for fila in cursor.fetchall()]
+    finally:
+        cursor.close()
@@ -0,0 +1,114 @@
+import os
+import time
+from contextlib import contextmanager
+from flask import g, request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, multiprocess
+from sqlalchemy.pool import QueuePool
+from app.extensions import db
+"""
+Métricas de la API en formato de texto de Prometheus (expuestas en GET /metrics, ver metricas_controller).
+Métricas:
+    mj_http_request_duration_seconds (histograma; metodo, blueprint, endpoint): Latencia por ruta.
+    mj_http_requests_total (contador; metodo, blueprint, endpoint, status): Respuestas por código de estado.
+    mj_db_pool_conexiones (gauge; estado = en_uso | inactivas | overflow): Conexiones del pool, sumadas entre
+        los workers vivos. Se actualiza al final de cada petición.
+    mj_db_pool_espera_seconds (histograma) y mj_db_pool_timeouts_total (contador): Tiempo para obtener una
+        conexión y checkouts que agotaron DB_POOL_TIMEOUT.
+    mj_jwt_blocklist_consultas_total (contador; origen = memoria | db): Verificaciones de tokens revocados.
+    mj_cloudinary_duracion_seconds (histograma; operacion) y mj_cloudinary_errores_total (contador; operacion).
+    mj_contrasenias_duracion_seconds (histograma; operacion = hashear | verificar): Tiempo de cada hash,
+        incluida la espera en el pool. mj_contrasenias_rechazos_total (contador; operacion): Hashes rechazados
+        por cola llena o tiempo agotado (ver app/security/contrasenias.py).
+Funciones:
+    init_metricas(app): Registra los hooks que miden cada petición si METRICAS_HABILITADAS es verdadero.
+    medir_cloudinary(operacion): Context manager que observa la duración de la llamada y cuenta sus errores.
+    exportar(): Retorna (cuerpo, content_type) con todas las métricas.
+Varios procesos (gunicorn):
+    Si está definida la variable de entorno PROMETHEUS_MULTIPROC_DIR (ver gunicorn.conf.py), cada worker escribe
+    sus valores en archivos de ese directorio y exportar() los agrega, así cualquier worker que atienda el scrape
+    responde por todos. La variable debe existir antes de importar prometheus_client.
+"""
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_POOL = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+LATENCIA = Histogram(
+    "mj_http_request_duration_seconds", "Latencia de las peticiones HTTP",
+    ["metodo", "blueprint", "endpoint"], buckets=BUCKETS_HTTP
+)
+PETICIONES = Counter(
+    "mj_http_requests_total", "Peticiones HTTP respondidas",
+    ["metodo", "blueprint", "endpoint", "status"]
+)
+POOL_CONEXIONES = Gauge(
+    "mj_db_pool_conexiones", "Conexiones del pool de la base de datos",
+    ["estado"], multiprocess_mode="livesum"
+)
+POOL_ESPERA = Histogram(
+    "mj_db_pool_espera_seconds", "Tiempo para obtener una conexión del pool", buckets=BUCKETS_POOL
+)
+POOL_TIMEOUTS = Counter("mj_db_pool_timeouts_total", "Checkouts que agotaron el tiempo de espera del pool")
+JWT_BLOCKLIST = Counter(
+    "mj_jwt_blocklist_consultas_total", "Verificaciones de tokens revocados", ["origen"]
+)
+CLOUDINARY_DURACION = Histogram(
+    "mj_cloudinary_duracion_seconds", "Duración de las llamadas a Cloudinary", ["operacion"]
+)
+CLOUDINARY_ERRORES = Counter(
+    "mj_cloudinary_errores_total", "Llamadas a Cloudinary que fallaron", ["operacion"]
+)
+
+HASH_DURACION = Histogram(
+    "mj_contrasenias_duracion_seconds", "Duración del hash de contraseñas", ["operacion"], buckets=BUCKETS_HTTP
+)
+HASH_RECHAZOS = Counter(
+    "mj_contrasenias_rechazos_total", "Hashes de contraseñas rechazados por saturación", ["operacion"]
+)
+
+ENDPOINTS_EXCLUIDOS = {"metricas.get_metrics"}
+
+def init_metricas(app):
+    if not app.config.get("METRICAS_HABILITADAS", True):
+        return
+
+    @app.before_request
+    def iniciar_metricas():
+        g._inicio_metricas = time.perf_counter()
+
+    @app.after_request
+    def registrar_metricas(response):
+        inicio = g.pop("_inicio_metricas", None)
+        if inicio is None or request.endpoint in ENDPOINTS_EXCLUIDOS:
+            return response
+        etiquetas = (request.method, request.blueprint or "", request.endpoint or "ninguno")
+        LATENCIA.labels(*etiquetas).observe(time.perf_counter() - inicio)
+        PETICIONES.labels(*etiquetas, str(response.status_code)).inc()
+        _actualizar_pool()
+        return response
+
+def _actualizar_pool():
+    pool = db.engine.pool
+    if isinstance(pool, QueuePool):
+        POOL_CONEXIONES.labels("en_uso").set(pool.checkedout())
+        POOL_CONEXIONES.labels("inactivas").set(pool.checkedin())
+        POOL_CONEXIONES.labels("overflow").set(max(pool.overflow(), 0))
+
+@contextmanager
+def medir_cloudinary(operacion):
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        CLOUDINARY_ERRORES.labels(operacion).inc()
+        raise
+    finally:
+        CLOUDINARY_DURACION.labels(operacion).observe(time.perf_counter() - inicio)
+
+def exportar():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
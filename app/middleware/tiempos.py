@@ -0,0 +1,120 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+"""
+Medición por petición de dónde se va el tiempo, publicada en la cabecera 'Server-Timing' y en el log.
+Por cada petición muestreada se registra:
+    - total: tiempo de pared desde before_request hasta after_request (incluye la compresión).
+    - db: cantidad de sentencias SQL y su tiempo acumulado (eventos before/after_cursor_execute del Engine).
+    - llamadas externas medidas con medir_externo(nombre) (p.ej. 'cloudinary'), acumuladas por nombre.
+Ejemplo de cabecera:
+    Server-Timing: total;dur=48.2, db;dur=12.7;desc="4 consultas", cloudinary;dur=30.1
+Funciones:
+    init_tiempos(app): Registra los hooks si SERVER_TIMING_HABILITADO es verdadero.
+    medir_externo(nombre): Context manager que suma su duración a la petición en curso. Fuera de una petición
+        muestreada (o en hilos de trabajos en segundo plano) no hace nada.
+Costo:
+    Sólo una fracción SERVER_TIMING_MUESTREO (0 a 1) de las peticiones se mide. En las demás, los eventos SQL y
+    medir_externo se reducen a leer una ContextVar vacía.
+Configuración:
+    SERVER_TIMING_HABILITADO (bool), SERVER_TIMING_MUESTREO (float), SERVER_TIMING_LOG (bool: escribir una línea
+    JSON por petición medida en el logger 'app.tiempos').
+"""
+
+logger = logging.getLogger("app.tiempos")
+
+_medicion = ContextVar("medicion_peticion", default=None)
+
+class _Medicion:
+    __slots__ = ("inicio", "sql", "sql_segundos", "externos")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.sql = 0
+        self.sql_segundos = 0.0
+        self.externos = {}
+
+def init_tiempos(app):
+    if not app.config.get("SERVER_TIMING_HABILITADO", True):
+        return
+
+    muestreo = float(app.config.get("SERVER_TIMING_MUESTREO", 1.0))
+    escribir_log = bool(app.config.get("SERVER_TIMING_LOG", True))
+
+    if not event.contains(Engine, "before_cursor_execute", _antes_de_sql):
+        event.listen(Engine, "before_cursor_execute", _antes_de_sql)
+        event.listen(Engine, "after_cursor_execute", _despues_de_sql)
+        event.listen(Engine, "handle_error", _error_de_sql)
+
+    @app.before_request
+    def iniciar_medicion():
+        if muestreo >= 1 or random.random() < muestreo:
+            _medicion.set(_Medicion())
+
+    @app.after_request
+    def publicar_medicion(response):
+        medicion = _medicion.get()
+        if medicion is not None:
+            _publicar(medicion, response, escribir_log)
+        return response
+
+    @app.teardown_request
+    def terminar_medicion(exc):
+        _medicion.set(None)
+
+@contextmanager
+def medir_externo(nombre):
+    medicion = _medicion.get()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.externos[nombre] = medicion.externos.get(nombre, 0.0) + time.perf_counter() - inicio
+
+def _antes_de_sql(conn, cursor, statement, parameters, context, executemany):
+    if _medicion.get() is not None:
+        conn.info.setdefault("tiempos_sql", []).append(time.perf_counter())
+
+def _despues_de_sql(conn, cursor, statement, parameters, context, executemany):
+    medicion = _medicion.get()
+    inicios = conn.info.get("tiempos_sql")
+    if medicion is None or not inicios:
+        return
+    medicion.sql += 1
+    medicion.sql_segundos += time.perf_counter() - inicios.pop()
+
+def _error_de_sql(contexto):
+    # la sentencia falló: after_cursor_execute no se llama, se descarta su inicio
+    inicios = contexto.connection.info.get("tiempos_sql") if contexto.connection is not None else None
+    if inicios:
+        inicios.pop()
+
+def _ms(segundos):
+    return round(segundos * 1000, 1)
+
+def _publicar(medicion, response, escribir_log):
+    total = time.perf_counter() - medicion.inicio
+    metricas = [f"total;dur={_ms(total)}", f'db;dur={_ms(medicion.sql_segundos)};desc="{medicion.sql} consultas"']
+    metricas += [f"{nombre};dur={_ms(segundos)}" for nombre, segundos in medicion.externos.items()]
+    response.headers.add("Server-Timing", ", ".join(metricas))
+
+    if escribir_log:
+        logger.info(json.dumps({
+            "metodo": request.method,
+            "ruta": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "total_ms": _ms(total),
+            "sql": medicion.sql,
+            "sql_ms": _ms(medicion.sql_segundos),
+            "externos_ms": {nombre: _ms(s) for nombre, s in medicion.externos.items()},
+        }))
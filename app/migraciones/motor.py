@@ -0,0 +1,99 @@
+import importlib
+import pkgutil
+import re
+from datetime import datetime, timezone
+from sqlalchemy import inspect, select
+from sqlalchemy.schema import CreateIndex
+import app.migraciones
+from app.model.schema_version_model import SchemaVersion
+"""
+Motor de migraciones versionadas del esquema.
+Cada migración es un módulo 'vNNNN_descripcion.py' en este paquete con:
+    DESCRIPCION (str): Texto breve que queda registrado en 'schema_version'.
+    aplicar(connection): Aplica los cambios usando la conexión recibida.
+Funciones:
+    listar_migraciones(): Retorna [(version, modulo)] ordenadas por versión.
+    versiones_aplicadas(connection): Conjunto de versiones registradas en 'schema_version'.
+    migrar(engine, hasta=None): Aplica en orden las migraciones pendientes (hasta la versión indicada).
+        Cada una corre en su propia transacción junto con el registro en 'schema_version'.
+        Retorna la lista de versiones aplicadas.
+    estado(engine): Retorna [(version, descripcion, aplicada)] para todas las migraciones conocidas.
+Utilidades para las migraciones (idempotentes, verifican antes de crear):
+    crear_tabla_si_falta(connection, tabla)
+    agregar_columna_si_falta(connection, tabla, columna, ddl)
+    crear_indices_si_faltan(connection, tabla, nombres)
+Notas:
+    - Cada migración declara sus propias tablas e índices (MetaData propia) tal como eran en esa versión, para no
+      cambiar de resultado cuando cambian los modelos. Todas son idempotentes: una base creada con db.create_all()
+      queda registrada sin cambios (test_migraciones verifica que migraciones y modelos declaren los mismos índices).
+    - En MySQL las sentencias DDL confirman la transacción en curso; si una migración falla a mitad de camino,
+      al volver a ejecutarla las verificaciones de existencia saltean lo que ya se había creado.
+"""
+
+_PATRON_MODULO = re.compile(r"^v(\d{4})_\w+$")
+
+def listar_migraciones():
+    migraciones = []
+    for modulo in pkgutil.iter_modules(app.migraciones.__path__):
+        coincidencia = _PATRON_MODULO.match(modulo.name)
+        if coincidencia:
+            migraciones.append((
+                int(coincidencia.group(1)),
+                importlib.import_module(f"{app.migraciones.__name__}.{modulo.name}")
+            ))
+    return sorted(migraciones, key=lambda m: m[0])
+
+def versiones_aplicadas(connection):
+    tabla = SchemaVersion.__table__
+    if not inspect(connection).has_table(tabla.name):
+        return set()
+    return {fila[0] for fila in connection.execute(select(tabla.c.version))}
+
+def migrar(engine, hasta=None):
+    with engine.begin() as connection:
+        SchemaVersion.__table__.create(connection, checkfirst=True)
+        aplicadas = versiones_aplicadas(connection)
+
+    nuevas = []
+    for version, modulo in listar_migraciones():
+        if version in aplicadas or (hasta is not None and version > hasta):
+            continue
+        with engine.begin() as connection:
+            modulo.aplicar(connection)
+            connection.execute(SchemaVersion.__table__.insert().values(
+                version=version, descripcion=modulo.DESCRIPCION, aplicada_en=datetime.now(timezone.utc)
+            ))
+        nuevas.append(version)
+    return nuevas
+
+def estado(engine):
+    with engine.connect() as connection:
+        aplicadas = versiones_aplicadas(connection)
+    return [(version, modulo.DESCRIPCION, version in aplicadas) for version, modulo in listar_migraciones()]
+
+def crear_tabla_si_falta(connection, tabla):
+    existia = inspect(connection).has_table(tabla.name)
+    # create(checkfirst) también crea los índices declarados en la tabla
+    tabla.create(connection, checkfirst=True)
+    return not existia
+
+def agregar_columna_si_falta(connection, tabla, columna, ddl):
+    columnas = {c["name"] for c in inspect(connection).get_columns(tabla.name)}
+    if columna not in columnas:
+        connection.exec_driver_sql(f"ALTER TABLE {tabla.name} ADD COLUMN {columna} {ddl}")
+
+def _indices_existentes(connection, tabla):
+    if connection.dialect.name == "sqlite":
+        # el inspector de SQLite omite los índices por expresión (p.ej. lower(categoria))
+        filas = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (tabla.name,)
+        )
+        return {fila[0] for fila in filas}
+    return {i["name"] for i in inspect(connection).get_indexes(tabla.name)}
+
+def crear_indices_si_faltan(connection, tabla, nombres):
+    existentes = _indices_existentes(connection, tabla)
+    indices = {i.name: i for i in tabla.indexes}
+    for nombre in nombres:
+        if nombre not in existentes:
+            connection.execute(CreateIndex(indices[nombre]))
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from sqlalchemy import (
+    Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, MetaData, Numeric, String, Table, Text
+)
+from app.migraciones.motor import crear_tabla_si_falta
+"""
+Migración 1: tablas originales del proyecto (usuarios, productos, pedidos, pedido_detalle, token_blacklist).
+En bases existentes no hace nada; en una base vacía crea las tablas tal como eran antes de las migraciones
+(los índices secundarios y token_blacklist.expires_at los agregan las migraciones siguientes).
+Las tablas se declaran acá y no se toman de los modelos: así esta migración crea siempre el mismo esquema,
+aunque los modelos cambien después.
+"""
+
+DESCRIPCION = "Esquema base: usuarios, productos, pedidos, pedido_detalle, token_blacklist"
+
+metadata = MetaData()
+
+usuarios = Table(
+    "usuarios", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("nombre", String(100), nullable=False),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("contrasenia", String(250), nullable=False),
+    Column("telefono", String(20), nullable=False),
+    Column("activo", Boolean, default=True),
+    Column("rol", Enum("cliente", "admin"), nullable=False, default="cliente"),
+)
+
+productos = Table(
+    "productos", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("nombre", String(100), nullable=False),
+    Column("precio", Numeric(10, 2), nullable=False),
+    Column("stock", Integer, nullable=False),
+    Column("categoria", String(50), nullable=False),
+    Column("descripcion", Text, nullable=False),
+    Column("imagen_url", String(200), nullable=False),
+    Column("mostrar", Boolean, default=True),
+    Column("destacado", Boolean, default=False, nullable=False),
+)
+
+pedidos = Table(
+    "pedidos", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_usuario", Integer, ForeignKey("usuarios.id"), nullable=False),
+    Column("fecha", DateTime, default=lambda: datetime.now(timezone.utc)),
+    Column("total", Float, nullable=False),
+    Column("cerrado", Boolean, default=False),
+)
+
+pedido_detalle = Table(
+    "pedido_detalle", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("pedido_id", Integer, ForeignKey("pedidos.id"), nullable=False),
+    Column("producto_id", Integer, ForeignKey("productos.id"), nullable=False),
+    Column("cantidad", Integer, nullable=False),
+)
+
+token_blacklist = Table(
+    "token_blacklist", metadata,
+    Column("id", Integer, primary_key=True, nullable=False),
+    Column("jti", String(36), unique=True, nullable=False),
+    Column("created_at", DateTime, default=lambda: datetime.now(timezone.utc), nullable=False),
+)
+
+def aplicar(connection):
+    for tabla in (usuarios, productos, pedidos, pedido_detalle, token_blacklist):
+        crear_tabla_si_falta(connection, tabla)
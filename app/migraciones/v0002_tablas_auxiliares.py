@@ -0,0 +1,110 @@
+import re
+import unicodedata
+from datetime import datetime, timezone
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Enum, Index, Integer, MetaData, SmallInteger, String, Table, Text, select
+)
+from app.migraciones.motor import agregar_columna_si_falta, crear_indices_si_faltan, crear_tabla_si_falta
+"""
+Migración 2: tablas y columnas agregadas para caché, búsqueda, trabajos y purga de tokens.
+    - catalogo_version (con su única fila id=1), producto_trigramas y trabajos.
+    - token_blacklist.expires_at y los índices sobre created_at / expires_at.
+Si 'producto_trigramas' se crea en esta migración, se llena a partir de los productos existentes.
+Las tablas y el cálculo de trigramas se declaran acá (copia de app/service/busqueda_service.py a la fecha de esta
+migración) para que el resultado no cambie si después cambian los modelos o el motor de búsqueda; en ese caso el
+índice se reconstruye con 'flask reindexar-busqueda'.
+"""
+
+DESCRIPCION = "catalogo_version, producto_trigramas, trabajos y token_blacklist.expires_at"
+
+LOTE = 1000
+PESOS = {"nombre": 3, "categoria": 2, "descripcion": 1}
+
+metadata = MetaData()
+
+catalogo_version = Table(
+    "catalogo_version", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("version", BigInteger, nullable=False, default=0),
+)
+
+trabajos = Table(
+    "trabajos", metadata,
+    Column("id", String(32), primary_key=True),
+    Column("tipo", String(30), nullable=False),
+    Column("estado", Enum("pendiente", "procesando", "completado", "error"), nullable=False, default="pendiente"),
+    Column("resultado", Text, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("created_at", DateTime, default=lambda: datetime.now(timezone.utc), nullable=False),
+    Column("updated_at", DateTime, default=lambda: datetime.now(timezone.utc), nullable=False),
+)
+
+producto_trigramas = Table(
+    "producto_trigramas", metadata,
+    Column("trigrama", String(3), primary_key=True),
+    Column("producto_id", Integer, primary_key=True, autoincrement=False),
+    Column("peso", SmallInteger, nullable=False),
+    Index("ix_producto_trigramas_producto_id", "producto_id"),
+)
+
+# sólo las columnas que usa esta migración
+productos = Table(
+    "productos", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("nombre", String(100)),
+    Column("categoria", String(50)),
+    Column("descripcion", Text),
+)
+
+token_blacklist = Table(
+    "token_blacklist", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("created_at", DateTime),
+    Column("expires_at", DateTime),
+    Index("ix_token_blacklist_created_at", "created_at"),
+    Index("ix_token_blacklist_expires_at", "expires_at"),
+)
+
+def aplicar(connection):
+    crear_tabla_si_falta(connection, catalogo_version)
+    if connection.execute(select(catalogo_version.c.id).where(catalogo_version.c.id == 1)).first() is None:
+        connection.execute(catalogo_version.insert().values(id=1, version=0))
+    crear_tabla_si_falta(connection, trabajos)
+    if crear_tabla_si_falta(connection, producto_trigramas):
+        _indexar_productos_existentes(connection)
+
+    agregar_columna_si_falta(connection, token_blacklist, "expires_at", "DATETIME NULL")
+    crear_indices_si_faltan(connection, token_blacklist, [
+        "ix_token_blacklist_created_at",
+        "ix_token_blacklist_expires_at",
+    ])
+
+def _trigramas(texto):
+    texto = unicodedata.normalize("NFKD", (texto or "").lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    resultado = set()
+    for palabra in re.findall(r"\w+", texto):
+        for i in range(len(palabra) - 2):
+            resultado.add(palabra[i:i + 3])
+    return resultado
+
+def _filas_indice(producto):
+    pesos = {}
+    for campo, peso in PESOS.items():
+        for t in _trigramas(getattr(producto, campo)):
+            pesos[t] = pesos.get(t, 0) + peso
+    return [{"trigrama": t, "producto_id": producto.id, "peso": p} for t, p in pesos.items()]
+
+def _indexar_productos_existentes(connection):
+    columnas = select(productos.c.id, productos.c.nombre, productos.c.categoria, productos.c.descripcion)
+    ultimo_id = 0
+    while True:
+        filas = connection.execute(
+            columnas.where(productos.c.id > ultimo_id).order_by(productos.c.id).limit(LOTE)
+        ).all()
+        if not filas:
+            return
+        indice = [fila for producto in filas for fila in _filas_indice(producto)]
+        if indice:
+            connection.execute(producto_trigramas.insert(), indice)
+        ultimo_id = filas[-1].id
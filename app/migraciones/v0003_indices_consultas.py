@@ -0,0 +1,74 @@
+from sqlalchemy import Boolean, Column, Index, Integer, MetaData, String, Table, func
+from app.migraciones.motor import crear_indices_si_faltan
+"""
+Migración 3: índices secundarios para los filtros frecuentes de los servicios.
+La justificación de cada índice está en el docstring del modelo correspondiente.
+Las tablas se declaran acá sólo con las columnas que usan los índices, para no depender de los modelos.
+"""
+
+DESCRIPCION = "Índices de productos, pedidos, pedido_detalle y usuarios"
+
+metadata = MetaData()
+
+productos = Table(
+    "productos", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("nombre", String(100)),
+    Column("categoria", String(50)),
+    Column("mostrar", Boolean),
+    Column("destacado", Boolean),
+    Index("ix_productos_mostrar_id", "mostrar", "id"),
+    Index("ix_productos_destacado_mostrar", "destacado", "mostrar"),
+    Index("ix_productos_categoria", "categoria"),
+    Index("ix_productos_nombre", "nombre"),
+)
+# índice por expresión: se declara sobre la columna ya asociada a la tabla
+Index("ix_productos_categoria_lower", func.lower(productos.c.categoria))
+
+pedidos = Table(
+    "pedidos", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_usuario", Integer),
+    Column("cerrado", Boolean),
+    Index("ix_pedidos_id_usuario_cerrado", "id_usuario", "cerrado"),
+    Index("ix_pedidos_cerrado_id", "cerrado", "id"),
+)
+
+pedido_detalle = Table(
+    "pedido_detalle", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("pedido_id", Integer),
+    Column("producto_id", Integer),
+    Index("ix_pedido_detalle_pedido_id", "pedido_id"),
+    Index("ix_pedido_detalle_producto_id", "producto_id"),
+)
+
+usuarios = Table(
+    "usuarios", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("nombre", String(100)),
+    Column("telefono", String(20)),
+    Index("ix_usuarios_telefono", "telefono"),
+    Index("ix_usuarios_nombre", "nombre"),
+)
+
+def aplicar(connection):
+    crear_indices_si_faltan(connection, productos, [
+        "ix_productos_mostrar_id",
+        "ix_productos_destacado_mostrar",
+        "ix_productos_categoria_lower",
+        "ix_productos_categoria",
+        "ix_productos_nombre",
+    ])
+    crear_indices_si_faltan(connection, pedidos, [
+        "ix_pedidos_id_usuario_cerrado",
+        "ix_pedidos_cerrado_id",
+    ])
+    crear_indices_si_faltan(connection, pedido_detalle, [
+        "ix_pedido_detalle_pedido_id",
+        "ix_pedido_detalle_producto_id",
+    ])
+    crear_indices_si_faltan(connection, usuarios, [
+        "ix_usuarios_telefono",
+        "ix_usuarios_nombre",
+    ])
@@ -0,0 +1,26 @@
+from app.extensions import db
+
+"""
+Modelo ProductoTrigrama para la tabla 'producto_trigramas'.
+Índice invertido de trigramas sobre el nombre, la categoría y la descripción de los productos.
+Cada fila indica que un trigrama aparece en un producto y con qué peso (suma de los pesos de los campos donde aparece).
+La clave primaria (trigrama, producto_id) hace que buscar por trigrama sea una lectura por rango del índice.
+Atributos:
+    trigrama (str): Tres caracteres normalizados (minúsculas, sin acentos).
+    producto_id (int): Identificador del producto indexado. Sin clave foránea para no depender del orden del flush.
+    peso (int): Peso del trigrama en el producto (nombre=3, categoría=2, descripción=1, acumulables).
+"""
+
+class ProductoTrigrama(db.Model):
+    __tablename__ = "producto_trigramas"
+
+    trigrama = db.Column(db.String(3), primary_key=True)
+    producto_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    peso = db.Column(db.SmallInteger, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_producto_trigramas_producto_id", "producto_id"),
+    )
+
+    def __repr__(self):
+        return f"<ProductoTrigrama '{self.trigrama}' -> {self.producto_id}>"
@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from app.extensions import db
+
+"""
+Modelo CatalogoVersion para la tabla 'catalogo_version'.
+Guarda un contador que se incrementa, en una transacción corta propia, después de confirmarse cualquier escritura
+sobre 'productos' (ver app/service/cache_service.py).
+Se usa como sello barato del estado del catálogo (ETag de las rutas públicas) sin tener que consultar ni
+serializar los productos.
+Atributos:
+    id (int): Clave primaria. Siempre existe una única fila con id=1: la crea la migración 2 o, con db.create_all(),
+        el evento 'after_create' de la tabla.
+    version (int): Versión actual del catálogo.
+"""
+
+class CatalogoVersion(db.Model):
+    __tablename__ = "catalogo_version"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CatalogoVersion {self.version}>"
+
+def _crear_fila_inicial(tabla, connection, **kwargs):
+    connection.execute(tabla.insert().values(id=1, version=0))
+
+event.listen(CatalogoVersion.__table__, "after_create", _crear_fila_inicial)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Annotated, Optional
 from pydantic import BaseModel, Field
 
@@ -10,7 +10,8 @@ Clases:
         Valida los campos requeridos como nombre, precio, stock, categoría, descripción, imagen_url y mostrar.
     ProductoSalidaDTO:
         Modelo de salida para representar un producto con todos sus atributos, incluyendo el id.
-        Incluye un método de clase 'from_model' para construir la instancia a partir de un modelo de producto.
+        Incluye un método de clase 'from_model' para construir la instancia a partir de un modelo de producto,
+        y 'parcial' para armar sólo un subconjunto de campos (respuestas con '?fields=').
     ProductoUpdateDTO:
         Modelo para actualizar parcialmente un producto.
         Todos los campos son opcionales y tienen validaciones de longitud y valores mínimos/máximos.
@@ -52,6 +53,17 @@ class ProductoSalidaDTO:
             destacado=producto.destacado
         )
 
+    @staticmethod
+    def parcial(producto, campos):
+        # sólo lee los atributos pedidos: no dispara la carga de las columnas diferidas
+        datos = {campo: getattr(producto, campo) for campo in campos}
+        if "precio" in datos:
+            datos["precio"] = float(datos["precio"])
+        return datos
+
+# Campos de salida, en el orden del DTO
+CAMPOS_PRODUCTO = tuple(f.name for f in fields(ProductoSalidaDTO))
+
 # DTO para modificar
 class ProductoUpdateDTO(BaseModel):
     nombre: Optional[str] = Field(None, min_length=2, max_length=50)
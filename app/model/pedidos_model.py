@@ -14,6 +14,9 @@ Clases:
             cerrado (bool): Indica si el pedido está cerrado o no.
             detalles (list[PedidoDetalle]): Lista de detalles asociados al pedido.
             usuarios (Usuario): Relación con el usuario que realizó el pedido.
+        Índices:
+            ix_pedidos_id_usuario_cerrado (id_usuario, cerrado): Pedidos de un usuario, con o sin filtro 'cerrado'.
+            ix_pedidos_cerrado_id (cerrado, id): Listado de administración filtrado por 'cerrado', por cursor.
     PedidoDetalle:
         Representa el detalle de un producto dentro de un pedido.
         Atributos:
@@ -23,6 +26,9 @@ Clases:
             cantidad (int): Cantidad del producto en el pedido.
             pedidos (Pedido): Relación con el pedido asociado.
             productos (Producto): Relación con el producto asociado.
+        Índices:
+            ix_pedido_detalle_pedido_id (pedido_id): Carga de detalles por lote (selectinload ... IN).
+            ix_pedido_detalle_producto_id (producto_id): Pedidos que contienen un producto.
 """
 
 class Pedido(db.Model):
@@ -35,6 +41,11 @@ class Pedido(db.Model):
 
     detalles = db.relationship("PedidoDetalle", back_populates="pedidos", cascade="all, delete-orphan")
     usuarios = db.relationship("Usuario", back_populates="pedidos", lazy="select")
+
+    __table_args__ = (
+        db.Index("ix_pedidos_id_usuario_cerrado", "id_usuario", "cerrado"),
+        db.Index("ix_pedidos_cerrado_id", "cerrado", "id"),
+    )
 class PedidoDetalle(db.Model):
     __tablename__ = "pedido_detalle"
     id = db.Column(db.Integer, primary_key=True)
@@ -43,4 +54,9 @@ class PedidoDetalle(db.Model):
     cantidad = db.Column(db.Integer, nullable=False)
 
     pedidos = db.relationship("Pedido", back_populates="detalles", lazy="select")
-    productos = db.relationship("Producto")
\ No newline at end of file
+    productos = db.relationship("Producto")
+
+    __table_args__ = (
+        db.Index("ix_pedido_detalle_pedido_id", "pedido_id"),
+        db.Index("ix_pedido_detalle_producto_id", "producto_id"),
+    )
\ No newline at end of file
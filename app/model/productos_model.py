@@ -13,6 +13,12 @@ Atributos:
     mostrar (bool): Indica si el producto debe mostrarse (por defecto True).
     destacado (bool): Indica si el producto es destacado (por defecto False), no puede ser nulo.
     detalles (list): Relación con los detalles de pedidos asociados a este producto.
+Índices:
+    ix_productos_mostrar_id (mostrar, id): Listado público y de administración (mostrar=? ORDER BY id, por cursor).
+    ix_productos_destacado_mostrar (destacado, mostrar): Productos destacados visibles.
+    ix_productos_categoria_lower (lower(categoria)): Búsqueda por categoría sin distinguir mayúsculas.
+    ix_productos_categoria (categoria): Filtro exacto por categoría y listado de categorías (DISTINCT).
+    ix_productos_nombre (nombre): Búsqueda por prefijo y control de nombre repetido.
 Métodos:
     __repr__(): Representación legible del objeto Producto.
 """
@@ -32,5 +38,13 @@ class Producto(db.Model):
 
     detalles = db.relationship("PedidoDetalle", back_populates="productos", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_productos_mostrar_id", "mostrar", "id"),
+        db.Index("ix_productos_destacado_mostrar", "destacado", "mostrar"),
+        db.Index("ix_productos_categoria_lower", db.func.lower(categoria)),
+        db.Index("ix_productos_categoria", "categoria"),
+        db.Index("ix_productos_nombre", "nombre"),
+    )
+
     def __repr__(self):
         return f"<Producto {self.id} - {self.nombre} - ${self.precio}>"
\ No newline at end of file
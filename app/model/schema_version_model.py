@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from app.extensions import db
+"""
+Modelo SchemaVersion para la tabla 'schema_version'.
+Registra qué migraciones (ver app/migraciones) ya se aplicaron sobre la base de datos, una fila por versión.
+Atributos:
+    version (int): Número de la migración (prefijo 'vNNNN' del archivo), clave primaria.
+    descripcion (str): Descripción breve de la migración.
+    aplicada_en (datetime): Fecha y hora (UTC) en que se aplicó.
+"""
+
+class SchemaVersion(db.Model):
+    __tablename__ = "schema_version"
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    descripcion = db.Column(db.String(200), nullable=False)
+    aplicada_en = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"<SchemaVersion {self.version} - {self.descripcion}>"
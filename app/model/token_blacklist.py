@@ -7,6 +7,9 @@ Atributos:
     id (int): Identificador único y clave primaria de la tabla.
     jti (str): Identificador único del token JWT (JWT ID), no puede repetirse ni ser nulo.
     created_at (datetime): Fecha y hora en que el token fue añadido a la lista negra, con zona horaria UTC.
+        Indexada: la caché de revocación de cada worker lee por este campo los JTI revocados recientemente.
+    expires_at (datetime): Vencimiento del propio token (claim 'exp'), en UTC. Pasada esta fecha el token ya no es
+        válido aunque no esté en la lista, así que la fila puede purgarse. Nulo en filas anteriores a este campo.
 """
 
 class TokenBlacklist(db.Model):
@@ -14,4 +17,5 @@ class TokenBlacklist(db.Model):
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)
     jti = db.Column(db.String(36), unique=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
\ No newline at end of file
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from app.extensions import db
+
+"""
+Modelo Trabajo para la tabla 'trabajos'.
+Registra las tareas que se ejecutan en segundo plano (por ejemplo, subidas y eliminaciones en Cloudinary),
+para que cualquier worker pueda informar su estado aunque la tarea corra en otro proceso.
+Atributos:
+    id (str): Identificador del trabajo (UUID en hexadecimal), clave primaria.
+    tipo (str): Tipo de tarea (p. ej. 'subir_imagen', 'eliminar_imagen').
+    estado (Enum): 'pendiente', 'procesando', 'completado' o 'error'.
+    resultado (str): Resultado de la tarea serializado en JSON, si terminó bien.
+    error (str): Mensaje de error, si falló.
+    created_at (datetime): Fecha de creación, en UTC.
+    updated_at (datetime): Fecha del último cambio de estado, en UTC.
+"""
+
+class Trabajo(db.Model):
+    __tablename__ = "trabajos"
+
+    id = db.Column(db.String(32), primary_key=True)
+    tipo = db.Column(db.String(30), nullable=False)
+    estado = db.Column(db.Enum("pendiente", "procesando", "completado", "error"), nullable=False, default="pendiente")
+    resultado = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"<Trabajo {self.id} - {self.tipo} ({self.estado})>"
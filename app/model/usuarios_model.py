@@ -1,5 +1,5 @@
 from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.security.contrasenias import hashear, verificar
 
 """
 Modelo de datos para la entidad Usuario.
@@ -12,8 +12,13 @@ Atributos:
     activo (bool): Indica si el usuario está activo. Por defecto es True.
     rol (Enum): Rol del usuario, puede ser "cliente" o "admin". Por defecto es "cliente".
     pedidos (list): Relación uno a muchos con el modelo Pedido. Al eliminar un usuario, se eliminan sus pedidos asociados.
+Índices:
+    ix_usuarios_telefono (telefono) e ix_usuarios_nombre (nombre): Controles de teléfono y nombre repetidos
+    al registrar o editar usuarios.
 Métodos:
     __repr__(): Representación legible del objeto Usuario, mostrando id, nombre y rol.
+    check_password(contrasenia) / set_password(contrasenia): Verifican y generan el hash con el método
+        configurado, en el pool de app/security/contrasenias.py.
 """
 
 class Usuario(db.Model):
@@ -29,11 +34,16 @@ class Usuario(db.Model):
 
     pedidos = db.relationship("Pedido", back_populates="usuarios", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_usuarios_telefono", "telefono"),
+        db.Index("ix_usuarios_nombre", "nombre"),
+    )
+
     def __repr__(self):
         return f"<Usuario {self.id} - {self.nombre} ({self.rol})>"
 
     def check_password(self, contrasenia):
-        return check_password_hash(self.contrasenia, contrasenia)
+        return verificar(self.contrasenia, contrasenia)
 
     def set_password(self, contrasenia):
-        self.contrasenia = generate_password_hash(contrasenia)
\ No newline at end of file
+        self.contrasenia = hashear(contrasenia)
\ No newline at end of file
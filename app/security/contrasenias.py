@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturoTimeout
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import check_password_hash, generate_password_hash
+from app.middleware.metricas import HASH_DURACION, HASH_RECHAZOS
+from app.service.trabajos_service import ColaLlenaError
+"""
+Hash de contraseñas con algoritmo y costo configurables, fuera del hilo de la petición.
+Configuración:
+    CONTRASENIA_HASH_METODO: Método de werkzeug con su costo, p.ej. 'scrypt:32768:8:1' o 'pbkdf2:sha256:600000'.
+    CONTRASENIA_PROCESOS: Procesos del pool de hashing de cada worker (0 = se calcula en el hilo de la petición).
+    CONTRASENIA_MAX_PENDIENTES: Máximo de hashes en curso o en espera por worker; al superarlo se lanza
+        ColaLlenaError (el login responde 503) en lugar de encolar sin límite.
+    CONTRASENIA_TIMEOUT: Segundos que una petición espera su resultado; si se agotan también se lanza ColaLlenaError.
+Así el costo de un pico de logins queda acotado a CONTRASENIA_PROCESOS núcleos por worker y el resto de la API
+sigue atendiéndose; el throughput de login se ajusta con estos valores sin tocar los del resto de la app.
+Funciones:
+    init_contrasenias(app): Lee la configuración y descarta el pool anterior.
+    hashear(contrasenia): Retorna el hash con el método configurado.
+    verificar(hash, contrasenia): Indica si la contraseña corresponde al hash (acepta cualquier método de werkzeug).
+    necesita_rehash(hash): Indica si el hash se generó con otro método o costo que el configurado.
+Notas:
+    El pool se crea con 'spawn' la primera vez que se usa y se descarta en los procesos hijos de un fork
+    (gunicorn con preload), que crean el suyo.
+    Si un proceso del pool muere (p.ej. el OOM killer), el pool queda roto: se descarta, se crea otro y la operación
+    se reintenta una vez; si vuelve a fallar se lanza ColaLlenaError.
+"""
+
+_config = {"metodo": "scrypt", "prefijo": None, "procesos": 0, "max_pendientes": 32, "timeout": 10.0}
+_executor = None
+_cupos = None
+_lock = threading.Lock()
+
+def init_contrasenias(app):
+    global _executor, _cupos
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _config["metodo"] = app.config.get("CONTRASENIA_HASH_METODO", "scrypt")
+        _config["procesos"] = int(app.config.get("CONTRASENIA_PROCESOS", 0))
+        _config["max_pendientes"] = int(app.config.get("CONTRASENIA_MAX_PENDIENTES", 32))
+        _config["timeout"] = float(app.config.get("CONTRASENIA_TIMEOUT", 10))
+        # werkzeug completa el costo por defecto en el prefijo del hash ('scrypt' -> 'scrypt:32768:8:1')
+        _config["prefijo"] = generate_password_hash("", _config["metodo"]).split("$", 1)[0]
+        _executor = None
+        _cupos = threading.BoundedSemaphore(_config["max_pendientes"])
+
+def _descartar_pool():
+    global _executor, _cupos
+    _executor = None
+    _cupos = threading.BoundedSemaphore(_config["max_pendientes"])
+
+os.register_at_fork(after_in_child=_descartar_pool)
+
+def _obtener_executor():
+    global _executor, _cupos
+    with _lock:
+        if _cupos is None:
+            _cupos = threading.BoundedSemaphore(_config["max_pendientes"])
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=_config["procesos"], mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor, _cupos
+
+def _descartar_roto(executor):
+    global _executor
+    with _lock:
+        # otro hilo pudo haberlo reemplazado ya
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+def _ejecutar_en_pool(operacion, funcion, *args):
+    executor, cupos = _obtener_executor()
+    if not cupos.acquire(blocking=False):
+        HASH_RECHAZOS.labels(operacion).inc()
+        raise ColaLlenaError("Hay demasiados inicios de sesión en curso, intente más tarde")
+    try:
+        try:
+            futuro = executor.submit(funcion, *args)
+        except Exception:
+            cupos.release()
+            raise
+        # el cupo se libera cuando termina el cálculo, aunque la petición haya dejado de esperarlo
+        futuro.add_done_callback(lambda _: cupos.release())
+        try:
+            return futuro.result(timeout=_config["timeout"])
+        except FuturoTimeout:
+            HASH_RECHAZOS.labels(operacion).inc()
+            raise ColaLlenaError("El servicio de contraseñas está saturado, intente más tarde")
+    except BrokenProcessPool:
+        _descartar_roto(executor)
+        raise
+
+def _ejecutar(operacion, funcion, *args):
+    inicio = time.perf_counter()
+    try:
+        if _config["procesos"] <= 0:
+            return funcion(*args)
+        try:
+            return _ejecutar_en_pool(operacion, funcion, *args)
+        except BrokenProcessPool:
+            pass
+        try:
+            return _ejecutar_en_pool(operacion, funcion, *args)
+        except BrokenProcessPool:
+            HASH_RECHAZOS.labels(operacion).inc()
+            raise ColaLlenaError("El servicio de contraseñas no está disponible, intente más tarde")
+    finally:
+        HASH_DURACION.labels(operacion).observe(time.perf_counter() - inicio)
+
+def hashear(contrasenia):
+    return _ejecutar("hashear", generate_password_hash, contrasenia, _config["metodo"])
+
+def verificar(hash, contrasenia):
+    return _ejecutar("verificar", check_password_hash, hash, contrasenia)
+
+def necesita_rehash(hash):
+    if _config["prefijo"] is None:
+        _config["prefijo"] = generate_password_hash("", _config["metodo"]).split("$", 1)[0]
+    return hash.split("$", 1)[0] != _config["prefijo"]
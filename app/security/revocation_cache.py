@@ -0,0 +1,143 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_
+from app.extensions import db
+from app.middleware.metricas import JWT_BLOCKLIST
+from app.model.token_blacklist import TokenBlacklist
+from app.service.cache_service import LRUCache
+"""
+Caché por proceso para la verificación de tokens revocados (blocklist de JWT).
+Evita una consulta a 'token_blacklist' en cada petición autenticada: el caso común (token no revocado)
+se responde desde memoria.
+Clases:
+    BloomFilter: Filtro de Bloom sobre los JTI revocados. Si dice "no está", el token seguro no fue revocado.
+    RevocationCache: Combina el filtro con una LRU de negativos (JTI que dieron falso positivo en el filtro
+        y la DB confirmó que no están revocados).
+Atributos:
+    revocation_cache (RevocationCache): Instancia compartida por el proceso.
+Funciones:
+    init_revocation_cache(app): Configura la caché desde la configuración de la app.
+Consistencia entre workers:
+    Cada 'JWT_REVOCATION_CACHE_TTL' segundos el proceso incorpora los JTI revocados por otros workers
+    (lectura por 'created_at' con un margen de solapamiento). Un token revocado en otro worker puede seguir
+    aceptándose aquí a lo sumo ese intervalo. Los revocados en este mismo proceso se ven al instante.
+    Con TTL 0 la caché se desactiva y cada verificación consulta la DB.
+Métricas:
+    Cada verificación suma 1 a mj_jwt_blocklist_consultas_total con origen 'memoria' (resuelta por el filtro o
+    la LRU) o 'db' (requirió consultar 'token_blacklist').
+"""
+
+class BloomFilter:
+    def __init__(self, capacidad, tasa_error=0.001):
+        self.capacidad = max(int(capacidad), 1)
+        self.bits = max(int(-self.capacidad * math.log(tasa_error) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.bits / self.capacidad * math.log(2))), 1)
+        self._datos = bytearray((self.bits + 7) // 8)
+        self.cantidad = 0
+
+    def _posiciones(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, item):
+        for pos in self._posiciones(item):
+            self._datos[pos >> 3] |= 1 << (pos & 7)
+        self.cantidad += 1
+
+    def __contains__(self, item):
+        return all(self._datos[pos >> 3] & (1 << (pos & 7)) for pos in self._posiciones(item))
+
+class RevocationCache:
+    def __init__(self, ttl=5, capacidad=100000, max_negativos=10000):
+        self.ttl = ttl
+        self.capacidad = capacidad
+        self._negativos = LRUCache(max_items=max_negativos, ttl=3600)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def configurar(self, ttl, capacidad, max_negativos):
+        self.ttl = ttl
+        self.capacidad = capacidad
+        self._negativos.configurar(max_negativos, 3600)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._proximo_refresco = 0.0
+            self._desde = None
+            self._negativos.clear()
+
+    def registrar(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            self._negativos.discard(jti)
+
+    def es_revocado(self, jti):
+        if self.ttl <= 0:
+            return self._consultar_db(jti)
+
+        self._refrescar_si_corresponde()
+        if jti not in self._bloom or self._negativos.get(jti) is True:
+            JWT_BLOCKLIST.labels("memoria").inc()
+            return False
+
+        revocado = self._consultar_db(jti)
+        if not revocado:
+            self._negativos.set(jti, True)
+        return revocado
+
+    def _consultar_db(self, jti):
+        JWT_BLOCKLIST.labels("db").inc()
+        return TokenBlacklist.query.filter_by(jti=jti).first() is not None
+
+    def _refrescar_si_corresponde(self):
+        if self._bloom is not None and time.monotonic() < self._proximo_refresco:
+            return
+        with self._lock:
+            if self._bloom is not None and time.monotonic() < self._proximo_refresco:
+                return
+
+            inicio = datetime.now(timezone.utc)
+            if self._bloom is None or self._bloom.cantidad > self._bloom.capacidad:
+                # carga completa (al iniciar o cuando el filtro se llenó)
+                # los tokens ya vencidos no hace falta cargarlos: JWT los rechaza por 'exp'
+                nuevos = (
+                    db.session.query(TokenBlacklist.jti)
+                    .filter(or_(TokenBlacklist.expires_at.is_(None), TokenBlacklist.expires_at >= inicio))
+                    .all()
+                )
+                bloom = BloomFilter(max(self.capacidad, 2 * len(nuevos)))
+            else:
+                # sólo lo revocado desde el último refresco, con margen para transacciones lentas
+                bloom = self._bloom
+                margen = timedelta(seconds=max(self.ttl * 2, 30))
+                nuevos = (
+                    db.session.query(TokenBlacklist.jti)
+                    .filter(TokenBlacklist.created_at >= self._desde - margen)
+                    .all()
+                )
+
+            for (jti,) in nuevos:
+                if jti not in bloom:
+                    bloom.add(jti)
+                self._negativos.discard(jti)
+
+            self._bloom = bloom
+            self._desde = inicio
+            self._proximo_refresco = time.monotonic() + self.ttl
+
+revocation_cache = RevocationCache()
+
+def init_revocation_cache(app):
+    revocation_cache.configurar(
+        float(app.config.get("JWT_REVOCATION_CACHE_TTL", 5)),
+        int(app.config.get("JWT_REVOCATION_BLOOM_CAPACITY", 100000)),
+        int(app.config.get("JWT_REVOCATION_NEGATIVE_CACHE", 10000))
+    )
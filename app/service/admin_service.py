@@ -6,25 +6,49 @@ from app.model.pedidos_model import Pedido, PedidoDetalle
 from app.model.productos_model import Producto
 from app.extensions import db
 from app.model.usuarios_model import Usuario
+from app.service.paginacion import paginar, parse_paginacion, recorrer_por_lotes
+from app.service.busqueda_service import buscar_productos
+from app.service.consultas import (
+    CARGAR_DETALLES, consulta_pedidos, consulta_productos, consulta_usuarios, parse_booleano
+)
+from app.service.productos_service import parse_campos, serializar
+from app.service.trabajos_service import ColaLlenaError
 """
     
 Servicio de administración para la gestión de productos, usuarios y pedidos.
 Funciones:
 ----------
-- listar_productos(L_mostrar): Lista productos, filtrando por el campo 'mostrar' si se especifica.
-- obtener_productos(by, valor, L_mostrar): Busca productos por ID, nombre o categoría, con opción de filtrar por 'mostrar'.
+- listar_productos(L_mostrar, limit, cursor, fields): Lista productos, filtrando por el campo 'mostrar' si se especifica.
+  Con 'fields' sólo se consultan y devuelven esos campos (ver productos_service.parse_campos).
+- obtener_productos(by, valor, L_mostrar): Busca productos por ID, nombre (índice de trigramas, por relevancia) o categoría, con opción de filtrar por 'mostrar'.
 - featured(L_mostrar): Lista todos los productos destacados, con opción de filtrar por 'mostrar'.
 - crear_producto(request): Crea un nuevo producto a partir de los datos proporcionados.
 - editar_producto(valor, request): Edita los datos de un producto existente identificado por su ID.
 - eliminar_producto(valor): Elimina un producto por su ID.
-- listar_usuarios(L_activos): Lista usuarios, filtrando por el campo 'activo' si se especifica.
+- listar_usuarios(L_activos, limit, cursor): Lista usuarios, filtrando por el campo 'activo' si se especifica.
+- iterar_usuarios(L_activos, lote): Igual que listar_usuarios pero como generador de lotes de diccionarios (streaming).
 - obtener_usuario(id): Obtiene los datos de un usuario por su ID.
 - editar_usuario(user_id, request): Edita los datos de un usuario existente identificado por su ID.
+  Lanza ColaLlenaError si el pool de hashing de contraseñas está saturado.
 - eliminar_usuario(valor, by_id): Da de baja (activo=False) a un usuario por ID o nombre.
-- listar_pedidos(L_cerrado): Lista pedidos, filtrando por el campo 'cerrado' si se especifica.
+- listar_pedidos(L_cerrado, limit, cursor): Lista pedidos, filtrando por el campo 'cerrado' si se especifica.
+- iterar_pedidos(L_cerrado, lote): Igual que listar_pedidos pero como generador de lotes de diccionarios (streaming).
 - obtener_pedido(by, valor, L_cerrado): Busca pedidos por ID de pedido, ID de usuario o por producto en los detalles, con opción de filtrar por 'cerrado'.
 - editar_pedido(pedido_id, request): Edita los datos de un pedido existente identificado por su ID.
 - eliminar_pedido(pedido_id): Elimina un pedido por su ID.
+Los listados y búsquedas de pedidos cargan detalles y productos por lote (CARGAR_DETALLES), sin consultas N+1.
+Los filtros ('mostrar', 'activos', 'cerrado', usuario, producto, categoría) se aplican en el WHERE mediante
+las funciones de consultas.py; no se traen filas para descartarlas en Python.
+Paginación:
+-----------
+Los listados aceptan 'limit' y 'cursor' opcionales (ver paginacion.py). Si se envía alguno, se pagina por ID
+y se devuelve {"items": [...], "next_cursor": str|None} en lugar de la lista completa.
+Streaming:
+----------
+iterar_usuarios e iterar_pedidos validan los filtros al ser llamadas (lanzan ValueError antes de empezar) y
+retornan un generador que recorre la tabla por páginas keyset de 'lote' filas. Cada página se serializa y sus
+objetos se quitan de la sesión (expunge) antes de pedir la siguiente: la memoria usada no depende del tamaño
+de la tabla. Un resultado vacío produce un generador sin lotes (no lanza "No se encontraron ...").
 Excepciones:
 -------------
 Las funciones pueden lanzar ValueError o RuntimeError en caso de errores de validación, integridad de datos o problemas inesperados en la base de datos.
@@ -34,18 +58,20 @@ Las funciones pueden lanzar ValueError o RuntimeError en caso de errores de vali
     PRODUCTOS
 """
 # listar productos
-def listar_productos(L_mostrar):
+def listar_productos(L_mostrar, limit=None, cursor=None, fields=None):
     try:
-        if L_mostrar is not None:
-            if L_mostrar.lower() == 'true':
-                productos = Producto.query.filter_by(mostrar=True).all()
-            elif L_mostrar.lower() == 'false':
-                productos = Producto.query.filter_by(mostrar=False).all()
-            else:
-                raise ValueError("Error en el parámetro 'mostrar' debe ser 'true' o 'false'")
-        else:
-            productos = Producto.query.all()
-        return [ProductoSalidaDTO.from_model(u).__dict__ for u in productos]
+        limit, ultimo_id = parse_paginacion(limit, cursor)
+        campos = parse_campos(fields)
+        query = consulta_productos(mostrar=parse_booleano(L_mostrar, "mostrar"), campos=campos)
+
+        if limit is None:
+            return serializar(query.all(), campos)
+
+        productos, next_cursor = paginar(query, Producto.id, limit, ultimo_id)
+        return {
+            "items": serializar(productos, campos),
+            "next_cursor": next_cursor
+        }
     except ValueError as e:
         raise ValueError(str(e))
     except Exception as e:
@@ -56,26 +82,23 @@ def obtener_productos(by, valor, L_mostrar):
     try:
         if by not in [0, 1, 2]: raise ValueError("Error en el parámetro 'by' debe ser 0, 1 o 2")
 
+        mostrar = parse_booleano(L_mostrar, "mostrar")
+        filtro = " que coincidan con el filtro 'mostrar'" if mostrar is not None else ""
+
         if by == 1:
             producto = db.session.get(Producto, valor)
             if not producto: raise ValueError(f"Producto {valor} no fue encontrado")
+            if mostrar is not None and producto.mostrar != mostrar:
+                raise ValueError("No se encontraron productos que coincidan con el filtro 'mostrar'")
             productos = [producto]
 
         elif by == 0:
-            productos = Producto.query.filter(Producto.nombre.like(f"%{valor}%")).all()
-            if not productos: raise ValueError(f"No se encontraron productos con nombre similar a '{valor}'")
+            productos = buscar_productos(valor, mostrar=mostrar)
+            if not productos: raise ValueError(f"No se encontraron productos con nombre similar a '{valor}'{filtro}")
 
         else:  # by == 2
-            productos = Producto.query.filter_by(categoria=valor).all()
-            if not productos: raise ValueError(f"No se encontraron productos en la categoría '{valor}'")
-
-        if L_mostrar is not None:
-            if L_mostrar.lower() not in ['true', 'false']: raise ValueError("Error en el parámetro 'mostrar', debe ser 'true' o 'false'")
-
-            mostrar_activos = L_mostrar.lower() == 'true'
-            productos = [p for p in productos if p.mostrar == mostrar_activos]
-
-            if not productos: raise ValueError("No se encontraron productos que coincidan con el filtro 'mostrar'")
+            productos = consulta_productos(mostrar=mostrar, categoria_exacta=valor).all()
+            if not productos: raise ValueError(f"No se encontraron productos en la categoría '{valor}'{filtro}")
 
         return [ProductoSalidaDTO.from_model(p).__dict__ for p in productos]
     except ValueError as e:
@@ -86,15 +109,7 @@ def obtener_productos(by, valor, L_mostrar):
 # Lista todos los productos destacados
 def featured(L_mostrar):
     try:
-        query = Producto.query.filter_by(destacado=True)
-        if L_mostrar is not None:
-            if L_mostrar.lower() == 'true':
-                query = query.filter_by(mostrar=True)
-            elif L_mostrar.lower() == 'false':
-                query = query.filter_by(mostrar=False)
-            else:
-                raise ValueError("Error en el parámetro 'mostrar', debe ser 'true' o 'false'")
-        productos = query.all()
+        productos = consulta_productos(mostrar=parse_booleano(L_mostrar, "mostrar"), destacado=True).all()
         return [ProductoSalidaDTO.from_model(p).__dict__ for p in productos]
     except ValueError as e:
         raise ValueError(str(e))
@@ -221,27 +236,41 @@ def eliminar_producto(valor):
     USUARIOS
 """
 # PARA EL METODO GET
-def listar_usuarios(L_activos):
+def listar_usuarios(L_activos, limit=None, cursor=None):
     try:
-        if L_activos is not None:
-            if L_activos.lower() == 'true':
-                usuarios = Usuario.query.filter_by(activo=True).all()
-            elif L_activos.lower() == 'false':
-                usuarios = Usuario.query.filter_by(activo=False).all()
-            else:
-                raise ValueError("Error en el parámetro 'activos' debe ser 'true' o 'false'")
+        limit, ultimo_id = parse_paginacion(limit, cursor)
+        query = consulta_usuarios(parse_booleano(L_activos, "activos"))
+
+        if limit is None:
+            usuarios, next_cursor = query.all(), None
         else:
-            usuarios = Usuario.query.all()
+            usuarios, next_cursor = paginar(query, Usuario.id, limit, ultimo_id)
 
         if not usuarios:
             raise ValueError("No se encontraron usuarios")
 
-        return [UsuarioSalidaDTO.from_model(u).__dict__ for u in usuarios]
+        items = [UsuarioSalidaDTO.from_model(u).__dict__ for u in usuarios]
+        if limit is None:
+            return items
+        return {"items": items, "next_cursor": next_cursor}
     except ValueError as e:
         raise ValueError(str(e))
     except Exception as e:
         raise ValueError("Error al listar usuarios: " + str(e))
 
+# listar usuarios en streaming (lotes de diccionarios)
+def iterar_usuarios(L_activos, lote=500):
+    query = consulta_usuarios(parse_booleano(L_activos, "activos"))
+
+    def generar():
+        for usuarios in recorrer_por_lotes(query, Usuario.id, lote):
+            items = [UsuarioSalidaDTO.from_model(u).__dict__ for u in usuarios]
+            for u in usuarios:
+                db.session.expunge(u)
+            yield items
+
+    return generar()
+
 # buscar usuario por id
 def obtener_usuario(id):
     try:
@@ -299,6 +328,9 @@ def editar_usuario(user_id, request):
 
         db.session.commit()
 
+    except ColaLlenaError:
+        db.session.rollback()
+        raise
     except ValidationError as e:
         db.session.rollback()
         raise ValueError(f"Error de validación: {e.errors()}")
@@ -326,88 +358,80 @@ def eliminar_usuario(valor, by_id):
     PEDIDOS
 """
 # GET - Listar todos o filtrados
-def listar_pedidos(L_cerrado):
+def _pedido_a_dict(p):
+    return {
+        "id": p.id,
+        "id_usuario": p.id_usuario,
+        "total": p.total,
+        "fecha": p.fecha,
+        "cerrado": p.cerrado,
+        "detalles": [
+            {
+                "producto_id": d.producto_id,
+                "cantidad": d.cantidad,
+                "subtotal": d.cantidad * d.productos.precio
+            }
+            for d in p.detalles
+        ]
+    }
+
+def listar_pedidos(L_cerrado, limit=None, cursor=None):
     try:
-        if L_cerrado is not None:
-            if L_cerrado.lower() == 'true':
-                pedidos = Pedido.query.filter_by(cerrado=True).all()
-            elif L_cerrado.lower() == 'false':
-                pedidos = Pedido.query.filter_by(cerrado=False).all()
-            else:
-                raise ValueError("Error en el parámetro 'cerrado': debe ser 'true' o 'false'")
+        limit, ultimo_id = parse_paginacion(limit, cursor)
+        query = consulta_pedidos(cerrado=parse_booleano(L_cerrado, "cerrado"))
+
+        if limit is None:
+            pedidos, next_cursor = query.all(), None
         else:
-            pedidos = Pedido.query.all()
+            pedidos, next_cursor = paginar(query, Pedido.id, limit, ultimo_id)
 
         if not pedidos: raise ValueError("No se encontraron pedidos")
 
-        return [
-            {
-                "id": p.id,
-                "id_usuario": p.id_usuario,
-                "total": p.total,
-                "fecha": p.fecha,
-                "cerrado": p.cerrado,
-                "detalles": [
-                    {
-                        "producto_id": d.producto_id,
-                        "cantidad": d.cantidad,
-                        "subtotal": d.cantidad * d.productos.precio
-                    }
-                    for d in p.detalles
-                ]
-            }
-            for p in pedidos
-        ]
+        items = [_pedido_a_dict(p) for p in pedidos]
+        if limit is None:
+            return items
+        return {"items": items, "next_cursor": next_cursor}
     except Exception as e:
         raise ValueError("Error al listar pedidos: " + str(e))
 
+# listar pedidos en streaming (lotes de diccionarios)
+def iterar_pedidos(L_cerrado, lote=500):
+    query = consulta_pedidos(cerrado=parse_booleano(L_cerrado, "cerrado"))
+
+    def generar():
+        for pedidos in recorrer_por_lotes(query, Pedido.id, lote):
+            items = [_pedido_a_dict(p) for p in pedidos]
+            # expunge en cascada también quita los detalles del pedido
+            for p in pedidos:
+                db.session.expunge(p)
+            yield items
+
+    return generar()
+
 # GET - Buscar por id, usuario o producto
 def obtener_pedido(by, valor, L_cerrado):
     try:
         if by not in [0, 1, 2]: raise ValueError("Error en el parámetro 'by': debe ser 0, 1 o 2")
 
+        cerrado = parse_booleano(L_cerrado, "cerrado")
+        filtro = " con el filtro 'cerrado'" if cerrado is not None else ""
+
         if by == 1:  # por ID de pedido
-            pedido = db.session.get(Pedido, valor)
+            pedido = db.session.get(Pedido, valor, options=[CARGAR_DETALLES])
             if not pedido: raise ValueError(f"Pedido {valor} no encontrado")
+            if cerrado is not None and pedido.cerrado != cerrado:
+                raise ValueError("No se encontraron pedidos con el filtro 'cerrado'")
             pedidos = [pedido]
 
         elif by == 0:  # por ID de usuario
-            pedidos = Pedido.query.filter(Pedido.id_usuario.like(f"%{valor}%")).all()
-            if not pedidos: raise ValueError(f"No se encontraron pedidos del usuario '{valor}'")
+            pedidos = consulta_pedidos(id_usuario=valor, cerrado=cerrado).all()
+            if not pedidos: raise ValueError(f"No se encontraron pedidos del usuario '{valor}'{filtro}")
 
         else:  # por producto (en detalles)
-            pedidos = Pedido.query.join(PedidoDetalle).filter(PedidoDetalle.producto_id == valor).all()
-            if not pedidos: raise ValueError(f"No se encontraron pedidos con el producto '{valor}'")
+            pedidos = consulta_pedidos(producto_id=valor, cerrado=cerrado).all()
+            if not pedidos: raise ValueError(f"No se encontraron pedidos con el producto '{valor}'{filtro}")
 
-        # Filtrar por cerrado
-        if L_cerrado is not None:
-            if L_cerrado.lower() not in ['true', 'false']: raise ValueError("Error en el parámetro 'cerrado': debe ser 'true' o 'false'")
-
-            cerrado_bool = L_cerrado.lower() == 'true'
-            pedidos = [p for p in pedidos if p.cerrado == cerrado_bool]
-
-            if not pedidos: raise ValueError("No se encontraron pedidos con el filtro 'cerrado'")
-
-        if not pedidos: raise ValueError("No se encontraron pedidos")
-
-        return [
-            {
-                "id": p.id,
-                "id_usuario": p.id_usuario,
-                "total": p.total,
-                "fecha": p.fecha,
-                "cerrado": p.cerrado,
-                "detalles": [
-                    {
-                        "producto_id": d.producto_id,
-                        "cantidad": d.cantidad,
-                        "subtotal": d.cantidad * d.productos.precio
-                    }
-                    for d in p.detalles
-                ]
-            }
-            for p in pedidos
-        ]
+        return [_pedido_a_dict(p) for p in pedidos]
     except Exception as e:
         raise ValueError("Error al obtener pedidos: " + str(e))
 
@@ -0,0 +1,134 @@
+import math
+import re
+import unicodedata
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.model.busqueda_model import ProductoTrigrama
+from app.model.productos_model import Producto
+"""
+Motor de búsqueda de productos basado en un índice invertido de trigramas.
+Reemplaza los 'LIKE %texto%' (que recorren toda la tabla) por lecturas del índice 'producto_trigramas'.
+Funciona igual en SQLite y en MySQL porque sólo usa SQL estándar (IN, GROUP BY, HAVING).
+Funciones:
+    trigramas(texto): Normaliza el texto (minúsculas, sin acentos) y retorna el conjunto de trigramas de sus palabras.
+    indexar_productos(connection, productos): Reescribe las filas del índice de los productos indicados.
+    desindexar_productos(connection, ids): Elimina del índice los productos indicados.
+    reindexar_todo(): Reconstruye el índice completo (usado por el comando 'flask reindexar-busqueda').
+    buscar_productos(texto, mostrar=None, limite=LIMITE_RESULTADOS, opciones=()): Retorna los productos que
+        coinciden, ordenados por relevancia. 'mostrar' filtra por visibilidad si no es None; 'opciones' se aplican
+        a la consulta de productos (p.ej. load_only para traer sólo algunas columnas).
+    init_busqueda(app): Registra los eventos que mantienen el índice al día.
+Ranking:
+    Un producto coincide si contiene al menos UMBRAL_COINCIDENCIA de los trigramas de la búsqueda.
+    Se ordena por cantidad de trigramas coincidentes y luego por peso (el nombre pesa más que la descripción).
+    Búsquedas sólo con palabras de menos de 3 letras usan 'LIKE texto%' sobre el nombre (prefijo, usa índice).
+Mantenimiento:
+    Tras cada flush se reindexan los productos nuevos o con cambios en nombre/categoría/descripción
+    y se eliminan del índice los borrados, dentro de la misma transacción.
+"""
+
+PESOS = {"nombre": 3, "categoria": 2, "descripcion": 1}
+UMBRAL_COINCIDENCIA = 0.7
+LIMITE_RESULTADOS = 100
+
+def _palabras(texto):
+    texto = unicodedata.normalize("NFKD", (texto or "").lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.findall(r"\w+", texto)
+
+def trigramas(texto):
+    resultado = set()
+    for palabra in _palabras(texto):
+        for i in range(len(palabra) - 2):
+            resultado.add(palabra[i:i + 3])
+    return resultado
+
+def _filas_indice(producto):
+    pesos = {}
+    for campo, peso in PESOS.items():
+        for t in trigramas(getattr(producto, campo)):
+            pesos[t] = pesos.get(t, 0) + peso
+    return [{"trigrama": t, "producto_id": producto.id, "peso": p} for t, p in pesos.items()]
+
+def desindexar_productos(connection, ids):
+    if ids:
+        tabla = ProductoTrigrama.__table__
+        connection.execute(tabla.delete().where(tabla.c.producto_id.in_(ids)))
+
+def indexar_productos(connection, productos):
+    productos = list(productos)
+    desindexar_productos(connection, [p.id for p in productos])
+    filas = [fila for p in productos for fila in _filas_indice(p)]
+    if filas:
+        connection.execute(ProductoTrigrama.__table__.insert(), filas)
+
+def reindexar_todo(lote=1000):
+    connection = db.session.connection()
+    connection.execute(ProductoTrigrama.__table__.delete())
+    ultimo_id = 0
+    while True:
+        productos = (
+            Producto.query.filter(Producto.id > ultimo_id)
+            .order_by(Producto.id).limit(lote).all()
+        )
+        if not productos:
+            break
+        indexar_productos(connection, productos)
+        ultimo_id = productos[-1].id
+        db.session.expunge_all()
+    db.session.commit()
+
+def buscar_productos(texto, mostrar=None, limite=LIMITE_RESULTADOS, opciones=()):
+    buscados = trigramas(texto)
+
+    if not buscados:
+        # palabras muy cortas para trigramas: búsqueda por prefijo del nombre
+        query = Producto.query.options(*opciones).filter(
+            Producto.nombre.startswith(texto.strip(), autoescape=True)
+        )
+        if mostrar is not None:
+            query = query.filter(Producto.mostrar == mostrar)
+        return query.order_by(Producto.nombre).limit(limite).all()
+
+    T = ProductoTrigrama
+    coincidencias = func.count(T.trigrama)
+    minimo = math.ceil(len(buscados) * UMBRAL_COINCIDENCIA)
+    ranking = (
+        db.session.query(T.producto_id)
+        .filter(T.trigrama.in_(buscados))
+        .group_by(T.producto_id)
+        .having(coincidencias >= minimo)
+        .order_by(coincidencias.desc(), func.sum(T.peso).desc(), T.producto_id)
+    )
+    if mostrar is not None:
+        ranking = ranking.join(Producto, Producto.id == T.producto_id).filter(Producto.mostrar == mostrar)
+
+    ids = [fila[0] for fila in ranking.limit(limite).all()]
+    if not ids:
+        return []
+
+    por_id = {p.id: p for p in Producto.query.options(*opciones).filter(Producto.id.in_(ids)).all()}
+    return [por_id[i] for i in ids if i in por_id]
+
+# Mantenimiento incremental del índice
+def _campos_indexados_cambiaron(producto):
+    estado = inspect(producto)
+    return any(estado.attrs[campo].history.has_changes() for campo in PESOS)
+
+def _actualizar_indice(session, flush_context):
+    a_indexar = [obj for obj in session.new if isinstance(obj, Producto)]
+    a_indexar += [
+        obj for obj in session.dirty
+        if isinstance(obj, Producto) and _campos_indexados_cambiaron(obj)
+    ]
+    borrados = [obj.id for obj in session.deleted if isinstance(obj, Producto)]
+
+    if a_indexar or borrados:
+        connection = session.connection()
+        desindexar_productos(connection, borrados)
+        indexar_productos(connection, a_indexar)
+
+def init_busqueda(app):
+    if not event.contains(Session, "after_flush", _actualizar_indice):
+        event.listen(Session, "after_flush", _actualizar_indice)
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from itertools import chain
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.model.catalogo_model import CatalogoVersion
+from app.model.productos_model import Producto
+"""
+Caché en memoria para las consultas públicas del catálogo de productos.
+Clases:
+    LRUCache: Caché acotada por cantidad de entradas (LRU) y por tiempo de vida (TTL). Es segura entre hilos.
+Atributos:
+    catalogo_cache (LRUCache): Instancia compartida por el proceso para las consultas del catálogo.
+Funciones:
+    init_cache(app): Configura tamaño y TTL desde la configuración de la app y registra los eventos de invalidación.
+    cache_catalogo(fn): Decorador que guarda el resultado de una función de servicio en 'catalogo_cache'.
+    invalidar_catalogo(): Vacía la caché del catálogo.
+    obtener_version_catalogo(): Lee la versión actual del catálogo (una lectura por clave primaria).
+Versión del catálogo:
+    Tras confirmarse una transacción que tocó productos (flush o INSERT/UPDATE/DELETE masivo), 'catalogo_version'
+    se incrementa en una transacción propia y corta, con la conexión de la sesión ya devuelta al pool. Así la fila
+    no queda bloqueada mientras dura la escritura (los checkouts concurrentes no se serializan sobre ella ni la
+    bloquean en distinto orden que 'productos'). Al leer la versión, si cambió respecto de la última vista por este
+    proceso, la caché se vacía; así las escrituras de otros workers se reflejan en cuanto llega una petición que
+    valida la versión. Si el incremento falla se registra un aviso y el TTL acota la desactualización.
+Invalidación:
+    Cada flush de la sesión que inserta, modifica o elimina un Producto (y cada INSERT/UPDATE/DELETE masivo sobre
+    'productos') marca la sesión; al confirmarse el commit se vacía la caché. Un rollback descarta la marca.
+    Las escrituras hechas por otros procesos (otros workers de gunicorn) no se ven aquí: el TTL acota ese
+    tiempo de desactualización.
+Nota:
+    Los valores se devuelven tal cual están guardados (sin copiar). Quien los consuma no debe modificarlos.
+"""
+
+logger = logging.getLogger(__name__)
+
+_SIN_VALOR = object()
+
+class LRUCache:
+    def __init__(self, max_items=256, ttl=60):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.version = None
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configurar(self, max_items, ttl):
+        with self._lock:
+            self.max_items = max_items
+            self.ttl = ttl
+            self._datos.clear()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return _SIN_VALOR
+            expira, valor = entrada
+            if expira <= time.monotonic():
+                del self._datos[clave]
+                return _SIN_VALOR
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        if self.max_items <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def discard(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def sincronizar_version(self, version):
+        with self._lock:
+            if self.version != version:
+                self._datos.clear()
+                self.version = version
+
+    def __len__(self):
+        return len(self._datos)
+
+catalogo_cache = LRUCache()
+
+def init_cache(app):
+    catalogo_cache.configurar(
+        int(app.config.get("CATALOGO_CACHE_MAX_ITEMS", 256)),
+        float(app.config.get("CATALOGO_CACHE_TTL", 30))
+    )
+    _registrar_eventos()
+
+def cache_catalogo(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        clave = (fn.__name__, args, tuple(sorted(kwargs.items())))
+        valor = catalogo_cache.get(clave)
+        if valor is _SIN_VALOR:
+            valor = fn(*args, **kwargs)
+            catalogo_cache.set(clave, valor)
+        return valor
+    return wrapper
+
+def invalidar_catalogo():
+    catalogo_cache.clear()
+
+def obtener_version_catalogo():
+    # select de columna: no pasa por el identity map de la sesión
+    version = db.session.execute(
+        select(CatalogoVersion.version).where(CatalogoVersion.id == 1)
+    ).scalar() or 0
+    catalogo_cache.sincronizar_version(version)
+    return version
+
+def _incrementar_version(session):
+    tabla = CatalogoVersion.__table__
+    try:
+        with session.get_bind(mapper=CatalogoVersion).begin() as connection:
+            # la fila id=1 la crean la migración 2 y db.create_all()
+            connection.execute(tabla.update().where(tabla.c.id == 1).values(version=tabla.c.version + 1))
+    except SQLAlchemyError as e:
+        logger.warning("No se pudo incrementar la versión del catálogo: %s", e)
+
+# Eventos de sesión: marcar en el flush, invalidar en el commit, incrementar la versión al liberar la conexión
+def _marcar_si_toca_catalogo(session, flush_context):
+    if any(isinstance(obj, Producto) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["catalogo_modificado"] = True
+
+def _invalidar_tras_commit(session):
+    # el commit de un savepoint deja la marca para el de la transacción principal
+    if not session.in_nested_transaction() and session.info.pop("catalogo_modificado", False):
+        invalidar_catalogo()
+        session.info["catalogo_version_pendiente"] = True
+
+def _incrementar_tras_cerrar(session, transaction):
+    if transaction.parent is None and session.info.pop("catalogo_version_pendiente", False):
+        _incrementar_version(session)
+
+def _marcar_si_escritura_masiva(orm_execute_state):
+    # INSERT/UPDATE/DELETE masivos (session.execute(insert(...)), query.update(), query.delete()) no pasan por el flush
+    if (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is not None and orm_execute_state.bind_mapper.class_ is Producto:
+        orm_execute_state.session.info["catalogo_modificado"] = True
+
+def _descartar_marca(session, previous_transaction):
+    session.info.pop("catalogo_modificado", None)
+
+def _registrar_eventos():
+    if event.contains(Session, "after_flush", _marcar_si_toca_catalogo):
+        return
+    event.listen(Session, "after_flush", _marcar_si_toca_catalogo)
+    event.listen(Session, "do_orm_execute", _marcar_si_escritura_masiva)
+    event.listen(Session, "after_commit", _invalidar_tras_commit)
+    event.listen(Session, "after_transaction_end", _incrementar_tras_cerrar)
+    event.listen(Session, "after_soft_rollback", _descartar_marca)
@@ -1,5 +1,9 @@
+import io
 import cloudinary
 import cloudinary.uploader
+from app.middleware.metricas import medir_cloudinary
+from app.middleware.tiempos import medir_externo
+from app.service.trabajos_service import encolar
 
 def init_cloudinary(app):
     cloudinary.config(
@@ -22,16 +26,17 @@ def upload_image(file, folder="productos"):
     """
     try:
         # Subir a Cloudinary
-        result = cloudinary.uploader.upload(
-            file,
-            folder=folder,
-            resource_type="auto",
-            allowed_formats=['jpg', 'jpeg', 'png', 'gif', 'webp'],
-            transformation=[
-                {'width': 2000, 'height': 2000, 'crop': 'limit'},
-                {'quality': 'auto:good'}
-            ]
-        )
+        with medir_externo("cloudinary"), medir_cloudinary("upload"):
+            result = cloudinary.uploader.upload(
+                file,
+                folder=folder,
+                resource_type="auto",
+                allowed_formats=['jpg', 'jpeg', 'png', 'gif', 'webp'],
+                transformation=[
+                    {'width': 2000, 'height': 2000, 'crop': 'limit'},
+                    {'quality': 'auto:good'}
+                ]
+            )
         
         # Retornar la URL segura (HTTPS)
         return result['secure_url']
@@ -66,11 +71,46 @@ def delete_image(image_url):
             public_id = '/'.join(path_parts).rsplit('.', 1)[0]
             
             # Eliminar de Cloudinary
-            result = cloudinary.uploader.destroy(public_id)
+            with medir_externo("cloudinary"), medir_cloudinary("destroy"):
+                result = cloudinary.uploader.destroy(public_id)
             return result.get('result') == 'ok'
         
         return False
         
     except Exception as e:
         print(f"Error al eliminar imagen de Cloudinary: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def encolar_subida(file, folder="productos"):
+    """
+    Encola la subida de una imagen para hacerla en segundo plano
+
+    Args:
+        file: El archivo de imagen (FileStorage de Flask). Se copia a memoria porque
+              el stream de la petición se cierra al responder.
+        folder: Carpeta en Cloudinary donde guardar (opcional)
+
+    Returns:
+        Id del trabajo; su resultado será {'url': URL segura de la imagen}
+    """
+    contenido = io.BytesIO(file.read())
+    contenido.name = file.filename
+    return encolar("subir_imagen", _subir_en_segundo_plano, contenido, folder)
+
+def encolar_eliminacion(image_url):
+    """
+    Encola la eliminación de una imagen para hacerla en segundo plano
+
+    Returns:
+        Id del trabajo; su resultado será {'eliminada': bool}
+    """
+    return encolar("eliminar_imagen", _eliminar_en_segundo_plano, image_url)
+
+def _subir_en_segundo_plano(contenido, folder):
+    return {"url": upload_image(contenido, folder=folder)}
+
+def _eliminar_en_segundo_plano(image_url):
+    eliminada = delete_image(image_url)
+    if not eliminada:
+        raise ValueError("No se pudo eliminar la imagen")
+    return {"eliminada": True}
@@ -0,0 +1,81 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import load_only, selectinload
+from app.model.pedidos_model import Pedido, PedidoDetalle
+from app.model.productos_model import Producto
+from app.model.usuarios_model import Usuario
+"""
+Capa de armado de consultas compartida por los servicios.
+Cada función recibe filtros opcionales (None = sin filtrar) y retorna una Query de SQLAlchemy a la que sólo se le
+agregan las condiciones pedidas, de modo que todo filtro se resuelve con un WHERE (y un índice, ver los modelos)
+en lugar de traer filas para descartarlas en Python. Las Query retornadas se pueden seguir componiendo
+(order_by, paginar, limit, options...).
+Funciones:
+    parse_booleano(valor, parametro): Convierte 'true'/'false' (texto de la URL) en bool; None si no se envió.
+        Lanza ValueError si el valor no es válido.
+    opciones_campos(campos): Opciones de consulta (load_only) para traer sólo esas columnas de Producto;
+        el resto queda diferido. Lista vacía si 'campos' es None.
+    consulta_productos(mostrar, destacado, categoria, categoria_exacta, campos): Productos filtrados.
+        'categoria' compara sin distinguir mayúsculas (índice sobre lower(categoria)); 'categoria_exacta' compara
+        tal cual. 'campos' limita las columnas traídas.
+    consulta_usuarios(activo): Usuarios filtrados por 'activo'.
+    consulta_pedidos(id_usuario, producto_id, cerrado, con_detalles): Pedidos filtrados por usuario (igualdad
+        sobre la clave foránea), por producto incluido en sus detalles (subconsulta sobre pedido_detalle, sin
+        duplicar pedidos) y por 'cerrado'. Con 'con_detalles' carga detalles y productos por lote.
+Atributos:
+    CARGAR_DETALLES: opción de consulta que trae detalles y productos con SELECT ... IN por lote,
+        de modo que serializar N pedidos cuesta 3 consultas en lugar de 1 + N + N×M.
+"""
+
+CARGAR_DETALLES = selectinload(Pedido.detalles).selectinload(PedidoDetalle.productos)
+
+def parse_booleano(valor, parametro):
+    if valor is None:
+        return None
+    if valor.lower() == "true":
+        return True
+    if valor.lower() == "false":
+        return False
+    raise ValueError(f"Error en el parámetro '{parametro}': debe ser 'true' o 'false'")
+
+def opciones_campos(campos):
+    if campos is None:
+        return []
+    return [load_only(*(getattr(Producto, c) for c in campos))]
+
+def consulta_productos(mostrar=None, destacado=None, categoria=None, categoria_exacta=None, campos=None):
+    query = Producto.query
+    if mostrar is not None:
+        query = query.filter(Producto.mostrar == mostrar)
+    if destacado is not None:
+        query = query.filter(Producto.destacado == destacado)
+    if categoria is not None:
+        query = query.filter(func.lower(Producto.categoria) == categoria.lower())
+    if categoria_exacta is not None:
+        query = query.filter(Producto.categoria == categoria_exacta)
+    return query.options(*opciones_campos(campos))
+
+def consulta_usuarios(activo=None):
+    query = Usuario.query
+    if activo is not None:
+        query = query.filter(Usuario.activo == activo)
+    return query
+
+def consulta_pedidos(id_usuario=None, producto_id=None, cerrado=None, con_detalles=True):
+    query = Pedido.query
+    if con_detalles:
+        query = query.options(CARGAR_DETALLES)
+    if id_usuario is not None:
+        query = query.filter(Pedido.id_usuario == _entero(id_usuario, "usuario"))
+    if producto_id is not None:
+        query = query.filter(Pedido.id.in_(
+            select(PedidoDetalle.pedido_id).where(PedidoDetalle.producto_id == _entero(producto_id, "producto"))
+        ))
+    if cerrado is not None:
+        query = query.filter(Pedido.cerrado == cerrado)
+    return query
+
+def _entero(valor, parametro):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Error en el parámetro '{parametro}': debe ser un número entero")
@@ -0,0 +1,157 @@
+import os
+import tempfile
+import threading
+import time
+from PIL import Image
+from werkzeug.security import safe_join
+"""
+Servicio de variantes redimensionadas de las imágenes subidas ('static/uploads').
+Cada variante (ancho + formato) se genera una sola vez con Pillow y se guarda en disco en una carpeta
+'.variantes' junto al original (p.ej. 'foto.jpg' a 320 px en webp -> '.variantes/foto.jpg_w320.webp'); las
+siguientes peticiones la sirven directamente desde ahí.
+Funciones:
+    configurar(anchos, max_bytes): Define los anchos permitidos y el tamaño máximo total de la caché en disco.
+    normalizar_parametros(ancho, formato): Valida los parámetros de la URL ('w', 'fmt'). El ancho se redondea
+        hacia arriba al siguiente ancho permitido, para acotar la cantidad de variantes posibles.
+    obtener_variante(base, subpath, ancho, formato): Retorna (directorio, nombre, mimetype) de la variante,
+        generándola si no existe o si el original es más nuevo. Lanza FileNotFoundError si no existe el original.
+Caché en disco:
+    Al servir una variante se actualiza su fecha de modificación (como mucho una vez por minuto), que se usa como
+    "último uso". Cuando el total supera 'max_bytes' se eliminan las variantes menos usadas (LRU).
+    El total se lleva sumando cada variante generada; el árbol de 'uploads' sólo se recorre para desalojar o para
+    recontar cada _INTERVALO_RECUENTO segundos (las variantes que generan otros workers no se suman acá).
+"""
+
+FORMATOS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "jpg": ("JPEG", "image/jpeg", "jpg"),
+    "png": ("PNG", "image/png", "png"),
+}
+CARPETA_VARIANTES = ".variantes"
+_MARGEN_TOQUE = 60
+_INTERVALO_RECUENTO = 300
+
+_config = {
+    "anchos": (160, 320, 480, 640, 960, 1280, 1920),
+    "max_bytes": 200 * 1024 * 1024,
+}
+_lock_desalojo = threading.Lock()
+_totales = {}  # base -> {"bytes": total de las variantes, "recuento": time.monotonic() del último recorrido}
+
+def configurar(anchos, max_bytes):
+    _config["anchos"] = tuple(sorted(int(a) for a in anchos))
+    _config["max_bytes"] = int(max_bytes)
+    with _lock_desalojo:
+        _totales.clear()
+
+def normalizar_parametros(ancho, formato):
+    if ancho is not None:
+        try:
+            ancho = int(ancho)
+        except ValueError:
+            raise ValueError("Error en el parámetro 'w': debe ser un número entero")
+        if ancho <= 0:
+            raise ValueError("Error en el parámetro 'w': debe ser mayor que 0")
+        ancho = next((a for a in _config["anchos"] if a >= ancho), _config["anchos"][-1])
+
+    if formato is not None:
+        formato = formato.lower()
+        if formato not in FORMATOS:
+            raise ValueError("Error en el parámetro 'fmt': debe ser " + ", ".join(sorted(FORMATOS)))
+
+    return ancho, formato
+
+def obtener_variante(base, subpath, ancho, formato):
+    original = safe_join(base, subpath)
+    if original is None or not os.path.isfile(original):
+        raise FileNotFoundError(subpath)
+
+    directorio_original, archivo = os.path.split(original)
+    extension = os.path.splitext(archivo)[1]
+    if formato is None:
+        formato = extension.lstrip(".").lower()
+        if formato not in FORMATOS:
+            raise ValueError("Formato de imagen no soportado para variantes")
+    formato_pil, mimetype, extension_variante = FORMATOS[formato]
+
+    directorio = os.path.join(directorio_original, CARPETA_VARIANTES)
+    # el nombre conserva la extensión del original: 'foto.jpg' y 'foto.png' no comparten variantes
+    nombre = f"{archivo}_w{ancho or 0}.{extension_variante}"
+    ruta = os.path.join(directorio, nombre)
+
+    tamanio_anterior = 0
+    try:
+        estado = os.stat(ruta)
+        if estado.st_mtime >= os.stat(original).st_mtime:
+            if time.time() - estado.st_mtime > _MARGEN_TOQUE:
+                os.utime(ruta)
+            return directorio, nombre, mimetype
+        tamanio_anterior = estado.st_size
+    except FileNotFoundError:
+        pass
+
+    _generar(original, directorio, ruta, ancho, formato_pil)
+    _contabilizar(base, ruta, tamanio_anterior)
+    return directorio, nombre, mimetype
+
+def _generar(original, directorio, ruta, ancho, formato_pil):
+    os.makedirs(directorio, exist_ok=True)
+    with Image.open(original) as imagen:
+        if ancho and imagen.width > ancho:
+            alto = max(round(imagen.height * ancho / imagen.width), 1)
+            imagen = imagen.resize((ancho, alto), Image.LANCZOS)
+        if formato_pil == "JPEG" and imagen.mode not in ("RGB", "L"):
+            imagen = imagen.convert("RGB")
+
+        # se escribe a un temporal y se renombra: otro worker nunca ve un archivo a medio escribir
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as salida:
+                imagen.save(salida, formato_pil, quality=82)
+            os.replace(temporal, ruta)
+        except Exception:
+            os.unlink(temporal)
+            raise
+
+def _contabilizar(base, ruta, tamanio_anterior):
+    with _lock_desalojo:
+        cuenta = _totales.get(base)
+        if cuenta is not None and time.monotonic() - cuenta["recuento"] <= _INTERVALO_RECUENTO:
+            try:
+                cuenta["bytes"] += os.path.getsize(ruta) - tamanio_anterior
+            except FileNotFoundError:
+                cuenta = None
+            if cuenta is not None and cuenta["bytes"] <= _config["max_bytes"]:
+                return
+        _totales[base] = {"bytes": _desalojar(base, conservar=ruta), "recuento": time.monotonic()}
+
+def _desalojar(base, conservar=None):
+    # se llama con _lock_desalojo tomado; retorna el total que queda en disco
+    variantes = []
+    reservado = 0
+    for raiz, carpetas, archivos in os.walk(base):
+        if os.path.basename(raiz) != CARPETA_VARIANTES:
+            continue
+        for archivo in archivos:
+            ruta = os.path.join(raiz, archivo)
+            try:
+                estado = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            if ruta == conservar:
+                # la variante recién generada se va a servir ahora: no se desaloja
+                reservado = estado.st_size
+                continue
+            variantes.append((estado.st_mtime, estado.st_size, ruta))
+
+    total = reservado + sum(tamanio for _, tamanio, _ in variantes)
+    for _, tamanio, ruta in sorted(variantes):
+        if total <= _config["max_bytes"]:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total -= tamanio
+    return total
@@ -0,0 +1,70 @@
+import base64
+import binascii
+"""
+Utilidades de paginación por cursor (keyset) para los listados.
+En lugar de OFFSET, cada página se pide con "WHERE pk > último_pk ORDER BY pk LIMIT n", por lo que el costo
+de cada página no depende de cuántas filas haya antes. El cursor es opaco para el cliente.
+Funciones:
+    parse_paginacion(limit, cursor): Valida los parámetros 'limit' y 'cursor' recibidos como texto.
+        Retorna (limit, ultimo_id) o (None, None) si no se pidió paginar.
+    paginar(query, columna, limit, ultimo_id): Aplica el filtro keyset y retorna (filas, next_cursor).
+    codificar_cursor(valor) / decodificar_cursor(cursor): Convierte la clave primaria en un cursor opaco y viceversa.
+    recorrer_por_lotes(query, columna, lote): Generador que recorre toda la consulta en páginas keyset de 'lote'
+        filas. Lo usan los listados en streaming para no cargar la tabla completa en memoria.
+Constantes:
+    LIMIT_POR_DEFECTO (int): Tamaño de página si se envía 'cursor' sin 'limit'.
+    LIMIT_MAXIMO (int): Tamaño de página máximo permitido.
+"""
+
+LIMIT_POR_DEFECTO = 50
+LIMIT_MAXIMO = 1000
+
+def codificar_cursor(valor):
+    return base64.urlsafe_b64encode(str(valor).encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(cursor + relleno).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Error en el parámetro 'cursor': cursor inválido")
+
+def parse_paginacion(limit, cursor):
+    if limit is None and cursor is None:
+        return None, None
+
+    if limit is None:
+        limit = LIMIT_POR_DEFECTO
+    else:
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("Error en el parámetro 'limit': debe ser un número entero")
+        if limit < 1 or limit > LIMIT_MAXIMO:
+            raise ValueError(f"Error en el parámetro 'limit': debe estar entre 1 y {LIMIT_MAXIMO}")
+
+    ultimo_id = decodificar_cursor(cursor) if cursor else None
+    return limit, ultimo_id
+
+def paginar(query, columna, limit, ultimo_id):
+    if ultimo_id is not None:
+        query = query.filter(columna > ultimo_id)
+
+    # se pide una fila de más para saber si existe una página siguiente
+    filas = query.order_by(columna).limit(limit + 1).all()
+    if len(filas) > limit:
+        filas = filas[:limit]
+        return filas, codificar_cursor(getattr(filas[-1], columna.key))
+    return filas, None
+
+def recorrer_por_lotes(query, columna, lote):
+    ultimo_id = None
+    while True:
+        filtrada = query if ultimo_id is None else query.filter(columna > ultimo_id)
+        filas = filtrada.order_by(columna).limit(lote).all()
+        if not filas:
+            return
+        ultimo_id = getattr(filas[-1], columna.key)
+        yield filas
+        if len(filas) < lote:
+            return
@@ -1,9 +1,11 @@
 from pydantic import ValidationError
-from app.model.dto.Pedidos_dto import PedidoUpdateDTO
+from app.model.dto.Pedidos_dto import PedidoDetalleDTO, PedidoUpdateDTO
 from app.model.pedidos_model import Pedido, PedidoDetalle
 from app.model.productos_model import Producto
 from app.extensions import db
 from app.service.usuarios_service import obtener
+from app.service.productos_service import StockInsuficienteError, reservar_stock
+from app.service.consultas import CARGAR_DETALLES, consulta_pedidos, parse_booleano
 """
 Servicio para la gestión de pedidos.
 Funciones:
@@ -19,11 +21,14 @@ obtener(by, valor, L_cerrado)
     Excepciones:
         ValueError: Si hay errores de parámetros o no se encuentran pedidos.
 crear(data)
-    Crea un nuevo pedido validando existencia y stock de productos.
+    Crea un nuevo pedido reservando el stock de todas las líneas con un único UPDATE condicional
+    (ver productos_service.reservar_stock).
     Parámetros:
-        data (dict): Debe contener 'id_usuario' y lista de productos con 'producto_id' y 'cantidad'.
+        data (dict): Debe contener 'id_usuario' y lista de productos con 'producto_id' y 'cantidad' (enteros, o
+            texto convertible a entero; se validan con PedidoDetalleDTO).
     Excepciones:
-        ValueError: Si hay errores de stock, productos inexistentes o problemas al crear el pedido.
+        StockInsuficienteError (ValueError): Si falta stock o hay productos inexistentes; incluye 'faltantes'.
+        ValueError: Si hay cantidades inválidas o problemas al crear el pedido.
 editar(pedido_id, request)
     Edita un pedido existente, permitiendo modificar usuario, cerrado y detalles.
     Parámetros:
@@ -45,6 +50,11 @@ eliminar(pedido_id)
         pedido_id (int): ID del pedido a eliminar.
     Excepciones:
         ValueError: Si el pedido no existe o hay errores al eliminar.
+Carga de relaciones:
+    Los pedidos se consultan con CARGAR_DETALLES (ver consultas.py), que trae detalles y productos por lote.
+Filtros:
+    El usuario, el producto y 'cerrado' se resuelven en el WHERE (consultas.consulta_pedidos): sólo se traen
+    los pedidos que se devuelven.
 """
 
 # GET - Buscar por id, usuario o producto
@@ -52,29 +62,23 @@ def obtener(by, valor, L_cerrado):
     try:
         if by not in [0, 1, 2]: raise ValueError("Error en el parámetro 'by': debe ser 0, 1 o 2")
 
+        cerrado = parse_booleano(L_cerrado, "cerrado")
+        filtro = " con el filtro 'cerrado'" if cerrado is not None else ""
+
         if by == 1:  # por ID de pedido
-            pedido = db.session.get(Pedido, valor)
+            pedido = db.session.get(Pedido, valor, options=[CARGAR_DETALLES])
             if not pedido: raise ValueError(f"Pedido {valor} no encontrado")
+            if cerrado is not None and pedido.cerrado != cerrado:
+                raise ValueError("No se encontraron pedidos con el filtro 'cerrado'")
             pedidos = [pedido]
 
         elif by == 0:  # por ID de usuario
-            pedidos = Pedido.query.filter(Pedido.id_usuario.like(f"%{valor}%")).all()
-            if not pedidos: raise ValueError(f"No se encontraron pedidos del usuario '{valor}'")
+            pedidos = consulta_pedidos(id_usuario=valor, cerrado=cerrado).all()
+            if not pedidos: raise ValueError(f"No se encontraron pedidos del usuario '{valor}'{filtro}")
 
         else:  # por producto (en detalles)
-            pedidos = Pedido.query.join(PedidoDetalle).filter(PedidoDetalle.producto_id == valor).all()
-            if not pedidos: raise ValueError(f"No se encontraron pedidos con el producto '{valor}'")
-
-        # Filtrar por cerrado
-        if L_cerrado is not None:
-            if L_cerrado.lower() not in ['true', 'false']: raise ValueError("Error en el parámetro 'cerrado': debe ser 'true' o 'false'")
-
-            cerrado_bool = L_cerrado.lower() == 'true'
-            pedidos = [p for p in pedidos if p.cerrado == cerrado_bool]
-
-            if not pedidos: raise ValueError("No se encontraron pedidos con el filtro 'cerrado'")
-
-        if not pedidos: raise ValueError("No se encontraron pedidos")
+            pedidos = consulta_pedidos(producto_id=valor, cerrado=cerrado).all()
+            if not pedidos: raise ValueError(f"No se encontraron pedidos con el producto '{valor}'{filtro}")
 
         return [
             {
@@ -97,54 +101,63 @@ def obtener(by, valor, L_cerrado):
     except Exception as e:
         raise ValueError("Error al obtener pedidos: " + str(e))
 
+def _validar_linea(item):
+    producto_id = item.get("producto_id")
+    cantidad = item.get("cantidad")
+    try:
+        if isinstance(producto_id, bool): raise ValueError
+        producto_id = PedidoDetalleDTO(producto_id=producto_id).producto_id
+    except (ValidationError, ValueError):
+        raise ValueError(f"Producto inválido: {producto_id}")
+    try:
+        if isinstance(cantidad, bool): raise ValueError
+        linea = PedidoDetalleDTO(producto_id=producto_id, cantidad=cantidad)
+    except (ValidationError, ValueError):
+        raise ValueError(f"Cantidad inválida para el producto {producto_id}")
+    if linea.producto_id is None or linea.cantidad is None:
+        raise ValueError("Cada producto debe indicar 'producto_id' y 'cantidad'")
+    return linea
+
 # POST - Crear nuevo pedido con validacion de stock
 def crear(data):
     try:
         id_usuario = data["id_usuario"]
         productos_data = data["productos"]
 
-        # Primero validar que todos los productos existan y tengan stock suficiente
-        productos_validados = []
-        for item in productos_data:
-            producto = db.session.get(Producto, item["producto_id"])
-            if not producto:
-                raise ValueError(f"Producto {item['producto_id']} no encontrado")
+        # Validar las líneas con el DTO: ids y cantidades quedan como int aunque lleguen como texto ("1")
+        lineas = [_validar_linea(item) for item in productos_data]
 
-            # Validar stock disponible
-            if producto.stock < item["cantidad"]:
-                raise ValueError(f"Stock insuficiente para '{producto.nombre}'. Disponible: {producto.stock}, solicitado: {item['cantidad']}")
+        # Agrupar cantidades por producto (un mismo producto puede venir en varias líneas)
+        cantidades = {}
+        for linea in lineas:
+            cantidades[linea.producto_id] = cantidades.get(linea.producto_id, 0) + linea.cantidad
 
-            productos_validados.append({
-                "producto": producto,
-                "cantidad": item["cantidad"]
-            })
+        # Descontar todo el stock en una sola sentencia condicional (atómica frente a compras concurrentes)
+        reservar_stock(cantidades)
 
-        # crear el pedido y descontar stock
+        precios = {
+            p.id: p.precio for p in
+            db.session.query(Producto.id, Producto.precio).filter(Producto.id.in_(cantidades.keys()))
+        }
+
+        # crear el pedido con sus detalles
         pedido = Pedido(id_usuario=id_usuario, total=0)
         total = 0
 
-        for item in productos_validados:
-            producto = item["producto"]
-            cantidad = item["cantidad"]
-
-            subtotal = producto.precio * cantidad
-            total += subtotal
-
-            producto.stock -= cantidad
-
-            if producto.stock <= 0:
-                producto.mostrar = False
-
-            detalle = PedidoDetalle(
-                producto_id=producto.id,
-                cantidad=cantidad
-            )
-            pedido.detalles.append(detalle)
+        for linea in lineas:
+            total += precios[linea.producto_id] * linea.cantidad
+            pedido.detalles.append(PedidoDetalle(
+                producto_id=linea.producto_id,
+                cantidad=linea.cantidad
+            ))
 
         pedido.total = total
         db.session.add(pedido)
         db.session.commit()
 
+    except StockInsuficienteError:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         raise ValueError("Error al crear pedido: " + str(e))
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from app.extensions import db
+from app.middleware.metricas import POOL_ESPERA, POOL_TIMEOUTS
+"""
+Pool de conexiones a la base de datos configurable por entorno y con estadísticas en vivo.
+Clases:
+    InstrumentedQueuePool: QueuePool que mide cuánto tarda cada checkout en obtener una conexión (esperando una
+        libre o abriendo una nueva) y cuenta los timeouts por pool agotado. Ambos valores se publican también
+        en las métricas de Prometheus (mj_db_pool_espera_seconds, mj_db_pool_timeouts_total).
+Funciones:
+    opciones_pool(config): Arma las opciones de create_engine (pool_size, max_overflow, pool_timeout,
+        pool_recycle, pool_pre_ping) a partir de las claves DB_POOL_* de la configuración.
+    init_pool(app): Completa SQLALCHEMY_ENGINE_OPTIONS con esas opciones (salvo SQLite, que no usa QueuePool).
+        Debe llamarse antes de db.init_app.
+    calentar_pool(app): Abre DB_POOL_PREFILL conexiones (como mucho el tamaño del pool) y las devuelve al pool,
+        para que las primeras peticiones del worker no paguen el handshake TCP/TLS con MySQL. Retorna cuántas abrió;
+        un error sólo se registra en el log. Lo llama el hook 'post_worker_init' de gunicorn.conf.py en cada worker,
+        ya cargada la app: con preload_app, las conexiones abiertas en el master se descartarían en el fork.
+    estadisticas_pool(engine=None): Retorna un diccionario con el estado del pool del proceso actual.
+Notas:
+    Las estadísticas son por proceso: cada worker de gunicorn tiene su propio pool (el resultado incluye el 'pid').
+    Tras un fork (gunicorn con preload_app) el hijo descarta las conexiones heredadas sin cerrarlas, de modo que
+    no comparte sockets con el proceso padre. El hook de fork se registra una sola vez por proceso y recorre las
+    apps inicializadas con init_pool mediante referencias débiles (no las mantiene vivas).
+"""
+
+logger = logging.getLogger(__name__)
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_estadisticas = threading.Lock()
+        self._local = threading.local()
+        self.reiniciar_estadisticas()
+
+    def reiniciar_estadisticas(self):
+        with self._lock_estadisticas:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.espera_total = 0.0
+            self.espera_max = 0.0
+
+    def _do_get(self):
+        # QueuePool._do_get se llama a sí mismo al reintentar: sólo se mide la llamada externa
+        if getattr(self._local, "midiendo", False):
+            return super()._do_get()
+
+        self._local.midiendo = True
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except PoolTimeoutError:
+            with self._lock_estadisticas:
+                self.timeouts += 1
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            self._local.midiendo = False
+        espera = time.perf_counter() - inicio
+
+        with self._lock_estadisticas:
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+        POOL_ESPERA.observe(espera)
+        return conexion
+
+def opciones_pool(config):
+    return {
+        "pool_size": int(config.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(config.get("DB_MAX_OVERFLOW", 5)),
+        "pool_timeout": float(config.get("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(config.get("DB_POOL_RECYCLE", 300)),
+        "pool_pre_ping": bool(config.get("DB_POOL_PRE_PING", True)),
+    }
+
+def _usa_sqlite(app):
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+    return uri is None or make_url(uri).get_backend_name() == "sqlite"
+
+_apps = weakref.WeakSet()
+
+def _descartar_heredadas():
+    for app in list(_apps):
+        if "sqlalchemy" not in app.extensions:  # init_pool sin db.init_app (p.ej. en tests)
+            continue
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_descartar_heredadas)
+
+def init_pool(app):
+    if _usa_sqlite(app):
+        return
+    opciones = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    for clave, valor in opciones_pool(app.config).items():
+        opciones.setdefault(clave, valor)
+    opciones.setdefault("poolclass", InstrumentedQueuePool)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = opciones
+    _apps.add(app)
+
+def calentar_pool(app):
+    cantidad = int(app.config.get("DB_POOL_PREFILL", 0) or 0)
+    if cantidad <= 0 or _usa_sqlite(app):
+        return 0
+
+    with app.app_context():
+        pool = db.engine.pool
+        if not isinstance(pool, QueuePool):
+            return 0
+        # el tamaño real del pool: SQLALCHEMY_ENGINE_OPTIONS["pool_size"] tiene prioridad sobre DB_POOL_SIZE
+        cantidad = min(cantidad, pool.size())
+        conexiones = []
+        try:
+            for _ in range(cantidad):
+                conexiones.append(db.engine.connect())
+        except Exception as e:
+            logger.warning("No se pudo precalentar el pool de conexiones: %s", e)
+        finally:
+            for conexion in conexiones:
+                conexion.close()
+        return len(conexiones)
+
+def estadisticas_pool(engine=None):
+    pool = (engine or db.engine).pool
+    datos = {"pid": os.getpid(), "clase": type(pool).__name__, "estado": pool.status()}
+    if not isinstance(pool, QueuePool):
+        return datos
+
+    datos.update({
+        "tamano": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+        "en_uso": pool.checkedout(),
+        "inactivas": pool.checkedin(),
+        # overflow() es negativo mientras no se abrieron todas las conexiones base
+        "overflow": max(pool.overflow(), 0),
+    })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._lock_estadisticas:
+            checkouts = pool.checkouts
+            datos.update({
+                "checkouts": checkouts,
+                "timeouts": pool.timeouts,
+                "espera_media_ms": round(pool.espera_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "espera_max_ms": round(pool.espera_max * 1000, 3),
+            })
+    return datos
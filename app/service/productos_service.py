@@ -1,16 +1,22 @@
-from app.model.dto.Productos_dto import ProductoSalidaDTO
+from sqlalchemy import case, update
+from app.model.dto.Productos_dto import CAMPOS_PRODUCTO, ProductoSalidaDTO
 from app.model.productos_model import Producto
 from app.extensions import db
+from app.service.cache_service import cache_catalogo
+from app.service.paginacion import paginar, parse_paginacion
+from app.service.busqueda_service import buscar_productos
+from app.service.consultas import consulta_productos, opciones_campos
 """
 Servicio para la gestión de productos.
 Funciones:
 -----------
-listar():
+listar(limit=None, cursor=None, fields=None):
     Obtiene una lista de todos los productos visibles (mostrar=True).
     Devuelve una lista de diccionarios con los datos de cada producto.
-obtener(by, valor):
+    Si se indica 'limit' y/o 'cursor', pagina por ID y devuelve {"items": [...], "next_cursor": str|None}.
+obtener(by, valor, fields=None):
     Busca productos según el criterio especificado:
-        - by=0: Busca productos cuyo nombre contenga el valor dado (case-insensitive).
+        - by=0: Busca productos por nombre, categoría o descripción usando el índice de trigramas (ordenados por relevancia).
         - by=1: Busca producto por ID (devuelve aunque esté oculto).
         - by=2: Busca productos por categoría (case-insensitive).
     Devuelve una lista de diccionarios con los datos de los productos encontrados.
@@ -18,60 +24,115 @@ obtener(by, valor):
 categorias_list():
     Obtiene una lista de todas las categorías distintas de los productos.
     Devuelve una lista de strings con los nombres de las categorías.
-featured():
+featured(fields=None):
     Lista todos los productos destacados (destacado=True y mostrar=True).
     Devuelve una lista de diccionarios con los datos de los productos destacados.
+parse_campos(fields):
+    Valida el parámetro 'fields' ("id,nombre,precio"). Retorna None si no se envió o una tupla con los campos
+    en el orden del DTO, siempre incluyendo 'id'. Lanza ValueError con campos vacíos o desconocidos.
+serializar(productos, campos):
+    Convierte los productos a diccionarios completos (ProductoSalidaDTO) o sólo con los campos pedidos.
 actualizar_stock(producto_id, cantidad):
     Actualiza el stock de un producto identificado por su ID.
     Si el stock es menor o igual a 0, el producto se oculta (mostrar=False).
     Si el stock es mayor a 0, el producto se muestra (mostrar=True).
     Devuelve un diccionario con los datos actualizados del producto.
     Lanza ValueError si el producto no existe o si ocurre un error al actualizar.
+reservar_stock(cantidades):
+    Descuenta el stock de varios productos con un único UPDATE condicional (stock >= cantidad pedida),
+    ocultando (mostrar=False) en la misma sentencia los que quedan en 0. No confirma la transacción.
+    'cantidades' es un dict {producto_id: cantidad}. Si algún producto no existe o no alcanza el stock,
+    revierte la transacción en curso y lanza StockInsuficienteError con el detalle de cada faltante.
+Campos parciales ('fields'):
+    listar, obtener y featured aceptan 'fields' para devolver sólo algunos campos. La consulta selecciona sólo
+    esas columnas (p.ej. sin 'descripcion'), y la respuesta contiene sólo esas claves.
+Caché:
+    listar(), categorias_list() y featured() se sirven desde 'catalogo_cache' (ver cache_service), que se
+    invalida automáticamente al confirmar cualquier escritura sobre productos.
 """
 
+class StockInsuficienteError(ValueError):
+    def __init__(self, faltantes):
+        self.faltantes = faltantes
+        super().__init__(". ".join(
+            f"Producto {f['producto_id']} no encontrado" if f["nombre"] is None else
+            f"Stock insuficiente para '{f['nombre']}'. Disponible: {f['disponible']}, solicitado: {f['solicitado']}"
+            for f in faltantes
+        ))
+
+# Campos parciales (?fields=)
+def parse_campos(fields):
+    if fields is None:
+        return None
+    pedidos = {c.strip() for c in fields.split(",") if c.strip()}
+    if not pedidos:
+        raise ValueError("Error en el parámetro 'fields': debe indicar al menos un campo")
+    desconocidos = pedidos - set(CAMPOS_PRODUCTO)
+    if desconocidos:
+        raise ValueError(
+            f"Error en el parámetro 'fields': campos desconocidos {', '.join(sorted(desconocidos))}. "
+            f"Permitidos: {', '.join(CAMPOS_PRODUCTO)}"
+        )
+    # 'id' siempre se incluye: identifica al producto y hace falta para el cursor
+    pedidos.add("id")
+    return tuple(c for c in CAMPOS_PRODUCTO if c in pedidos)
+
+def serializar(productos, campos):
+    if campos is None:
+        return [ProductoSalidaDTO.from_model(p).__dict__ for p in productos]
+    return [ProductoSalidaDTO.parcial(p, campos) for p in productos]
+
 # PARA EL METODO GET
-def listar():
+@cache_catalogo
+def listar(limit=None, cursor=None, fields=None):
     try:
-        productos = Producto.query.filter_by(mostrar=True).all()
-
-        return [ProductoSalidaDTO.from_model(u).__dict__ for u in productos]
+        limit, ultimo_id = parse_paginacion(limit, cursor)
+        campos = parse_campos(fields)
+        query = consulta_productos(mostrar=True, campos=campos)
+
+        if limit is None:
+            return serializar(query.all(), campos)
+
+        productos, next_cursor = paginar(query, Producto.id, limit, ultimo_id)
+        return {
+            "items": serializar(productos, campos),
+            "next_cursor": next_cursor
+        }
     except ValueError as e:
         raise ValueError(str(e))
     except Exception as e:
         raise ValueError("Error al listar productos: " + str(e))
 
 # buscar productos por id, por nombre o categoria
-def obtener(by, valor):
+def obtener(by, valor, fields=None):
     try:
         if by not in [0, 1, 2]: raise ValueError("Error en el parámetro 'by' debe ser 0, 1 o 2")
+        campos = parse_campos(fields)
 
         if by == 1:
-            producto = db.session.get(Producto, valor)
+            producto = db.session.get(Producto, valor, options=opciones_campos(campos))
             if not producto: raise ValueError(f"Producto {valor} no fue encontrado")
             # IMPORTANTE: Al buscar por ID, devolver el producto aunque esté oculto
             # Esto permite ver detalles de pedidos con productos que ya no están disponibles
-            return [ProductoSalidaDTO.from_model(producto).__dict__]
+            return serializar([producto], campos)
 
+        # Solo se filtra por mostrar=True cuando NO se busca por ID (en el WHERE)
         elif by == 0:
-            productos = Producto.query.filter(Producto.nombre.like(f"%{valor}%")).all()
+            productos = buscar_productos(valor, mostrar=True, opciones=opciones_campos(campos))
             if not productos: raise ValueError(f"No se encontraron productos con nombre similar a '{valor}'")
 
         else:  # by == 2
-            productos = Producto.query.filter(db.func.lower(Producto.categoria) == valor.lower()).all()
+            productos = consulta_productos(mostrar=True, categoria=valor, campos=campos).all()
             if not productos: raise ValueError(f"No se encontraron productos en la categoría '{valor}'")
 
-        # Solo filtrar por mostrar=True cuando NO se busca por ID
-        productos = [p for p in productos if p.mostrar == True]
-
-        if not productos: raise ValueError("No se encontraron productos")
-
-        return [ProductoSalidaDTO.from_model(p).__dict__ for p in productos]
+        return serializar(productos, campos)
     except ValueError as e:
         raise ValueError(str(e))
     except Exception as e:
         raise ValueError("Error al listar productos: " + str(e))
 
 # buscar todas las categorias de los productos
+@cache_catalogo
 def categorias_list():
     try:
         categorias = db.session.query(Producto.categoria).distinct().all()
@@ -80,12 +141,12 @@ def categorias_list():
         raise ValueError("Error al listar categorías: " + str(e))
 
 # Lista todos los productos destacados
-def featured():
+@cache_catalogo
+def featured(fields=None):
     try:
-        query = Producto.query.filter_by(destacado=True)
-        query = query.filter_by(mostrar=True)
-        productos = query.all()
-        return [ProductoSalidaDTO.from_model(p).__dict__ for p in productos]
+        campos = parse_campos(fields)
+        productos = consulta_productos(mostrar=True, destacado=True, campos=campos).all()
+        return serializar(productos, campos)
     except ValueError as e:
         raise ValueError(str(e))
     except Exception as e:
@@ -112,4 +173,42 @@ def actualizar_stock(producto_id, cantidad):
 
     except Exception as e:
         db.session.rollback()
-        raise ValueError("Error al actualizar stock: " + str(e))
\ No newline at end of file
+        raise ValueError("Error al actualizar stock: " + str(e))
+
+# Reservar stock de varios productos de forma atómica
+def reservar_stock(cantidades):
+    if not cantidades:
+        raise ValueError("No se indicaron productos")
+
+    solicitado = case(cantidades, value=Producto.id, else_=0)
+    stmt = (
+        update(Producto)
+        .where(Producto.id.in_(cantidades.keys()), Producto.stock >= solicitado)
+        # 'mostrar' va primero: MySQL evalúa el SET de izquierda a derecha con los valores ya actualizados
+        .ordered_values(
+            (Producto.mostrar, case((Producto.stock - solicitado <= 0, False), else_=Producto.mostrar)),
+            (Producto.stock, Producto.stock - solicitado),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    resultado = db.session.execute(stmt)
+    if resultado.rowcount == len(cantidades):
+        return
+
+    # Faltó stock en al menos un producto: deshacer lo descontado y leer el estado real para informarlo
+    db.session.rollback()
+    existentes = {
+        p.id: p for p in
+        Producto.query.filter(Producto.id.in_(cantidades.keys())).execution_options(populate_existing=True).all()
+    }
+    faltantes = []
+    for producto_id, cantidad in cantidades.items():
+        producto = existentes.get(producto_id)
+        if producto is None:
+            faltantes.append({"producto_id": producto_id, "nombre": None, "disponible": 0, "solicitado": cantidad})
+        elif producto.stock < cantidad:
+            faltantes.append({"producto_id": producto_id, "nombre": producto.nombre,
+                              "disponible": producto.stock, "solicitado": cantidad})
+    if not faltantes:
+        raise ValueError("El stock cambió durante la reserva, intente nuevamente")
+    raise StockInsuficienteError(faltantes)
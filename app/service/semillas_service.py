@@ -0,0 +1,156 @@
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert
+from app.extensions import db
+from app.model.pedidos_model import Pedido, PedidoDetalle
+from app.model.productos_model import Producto
+from app.model.usuarios_model import Usuario
+from app.security.contrasenias import hashear
+from app.service.busqueda_service import reindexar_todo
+"""
+Generación de datos sintéticos a gran escala (comando 'flask seed' y benchmarks/bench_carga.py, bench_servicios.py).
+Los datos se insertan con INSERT masivos por lotes (executemany de SQLAlchemy Core, sin pasar por el ORM), de modo
+que un millón de pedidos se carga en minutos. Al final se reconstruye el índice de búsqueda (el mantenimiento
+incremental de trigramas sólo ve los flush del ORM).
+Funciones:
+    sembrar(usuarios, productos, pedidos, semilla, lote, contrasenia, admins, indexar, stock): Agrega los registros a los
+        que ya haya (los ids continúan desde el máximo actual) y retorna un diccionario con las cantidades y el
+        primer id de cada tabla. Con la misma semilla y la misma base de partida genera los mismos datos.
+        Con 'stock' todos los productos reciben ese stock (los benchmarks lo usan para no agotarlo).
+    email_usuario(id) / nombre_producto(numero): Email y nombre que recibe cada registro generado.
+    usuario_inactivo(numero) / producto_oculto(numero): Indican qué registros (numerados desde 1 dentro de una
+        ejecución) se generan inactivos u ocultos; sirven para que un benchmark elija sólo usuarios que pueden iniciar
+        sesión y productos que se pueden comprar.
+Mezcla generada:
+    - Usuarios: los primeros 'admins' son administradores; 1 de cada 25 queda inactivo. Todos comparten la
+      contraseña 'contrasenia' (se hashea una sola vez).
+    - Productos: categorías de CATEGORIAS, precios con distribución log-normal, 1 de cada 7 oculto (1 de cada 21
+      además sin stock) y 1 de cada 25 destacado.
+    - Pedidos: de 1 a 5 productos distintos visibles, fechas en el último año, los de más de 30 días cerrados;
+      el total es la suma de precio × cantidad de sus detalles.
+"""
+
+CATEGORIAS = [
+    "Remeras", "Camisas", "Pantalones", "Jeans", "Buzos", "Camperas", "Vestidos", "Polleras",
+    "Zapatillas", "Botas", "Sandalias", "Medias", "Ropa interior", "Mallas", "Accesorios",
+    "Carteras", "Mochilas", "Gorras", "Bufandas", "Cinturones",
+]
+TIPOS = ["Clásico", "Urbano", "Deportivo", "Básico", "Premium", "Oversize", "Slim", "Vintage", "Estampado", "Liso"]
+COLORES = ["negro", "blanco", "azul", "rojo", "verde", "gris", "beige", "bordó", "celeste", "marrón"]
+NOMBRES = ["Sofía", "Mateo", "Valentina", "Benjamín", "Martina", "Thiago", "Catalina", "Santiago", "Emma", "Joaquín"]
+APELLIDOS = ["González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Romero"]
+
+CONTRASENIA_POR_DEFECTO = "seed1234"
+
+def email_usuario(id):
+    return f"usuario{id}@seed.test"
+
+def nombre_producto(numero):
+    categoria = CATEGORIAS[numero % len(CATEGORIAS)]
+    return f"{categoria} {TIPOS[numero % len(TIPOS)]} {COLORES[numero // len(TIPOS) % len(COLORES)]} {numero}"
+
+def usuario_inactivo(numero):
+    return numero % 25 == 0
+
+def producto_oculto(numero):
+    return numero % 7 == 0
+
+def _siguiente_id(columna):
+    return (db.session.query(func.max(columna)).scalar() or 0) + 1
+
+def _insertar_por_lotes(modelo, filas, lote):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) == lote:
+            db.session.execute(insert(modelo), bloque)
+            bloque = []
+    if bloque:
+        db.session.execute(insert(modelo), bloque)
+
+def sembrar(usuarios=1000, productos=2000, pedidos=10000, semilla=None, lote=5000,
+            contrasenia=CONTRASENIA_POR_DEFECTO, admins=1, indexar=True, stock=None):
+    if usuarios < 1 and pedidos > 0:
+        raise ValueError("Se necesita al menos un usuario para generar pedidos")
+    aleatorio = random.Random(semilla)
+    primer_usuario = _siguiente_id(Usuario.id)
+    primer_producto = _siguiente_id(Producto.id)
+    primer_pedido = _siguiente_id(Pedido.id)
+
+    hash_contrasenia = hashear(contrasenia)
+    _insertar_por_lotes(Usuario, (
+        {
+            "id": primer_usuario + n - 1,
+            "nombre": f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)}",
+            "email": email_usuario(primer_usuario + n - 1),
+            "contrasenia": hash_contrasenia,
+            "telefono": f"+54911{(primer_usuario + n - 1) % 10 ** 8:08d}",
+            "activo": not usuario_inactivo(n),
+            "rol": "admin" if n <= admins else "cliente",
+        }
+        for n in range(1, usuarios + 1)
+    ), lote)
+
+    precios = {}
+    def filas_productos():
+        for n in range(1, productos + 1):
+            precio = round(min(aleatorio.lognormvariate(9, 0.8), 10 ** 7), 2)
+            oculto = producto_oculto(n)
+            precios[primer_producto + n - 1] = precio
+            yield {
+                "id": primer_producto + n - 1,
+                "nombre": nombre_producto(n),
+                "precio": precio,
+                "stock": stock if stock is not None else 0 if n % 21 == 0 else aleatorio.randint(1, 500),
+                "categoria": CATEGORIAS[n % len(CATEGORIAS)],
+                "descripcion": f"{nombre_producto(n)}. Talles del S al XXL, {aleatorio.choice(COLORES)}.",
+                "imagen_url": f"https://res.cloudinary.com/demo/image/upload/productos/{primer_producto + n - 1}.jpg",
+                "mostrar": not oculto,
+                "destacado": n % 25 == 0 and not oculto,
+            }
+    _insertar_por_lotes(Producto, filas_productos(), lote)
+
+    visibles = [id for id in precios if not producto_oculto(id - primer_producto + 1)]
+    if pedidos > 0 and not visibles:
+        # sin productos nuevos: los pedidos usan los productos visibles que ya haya
+        precios = dict(db.session.query(Producto.id, Producto.precio).filter(Producto.mostrar.is_(True)).limit(10000))
+        visibles = list(precios)
+        if not visibles:
+            raise ValueError("No hay productos visibles para generar pedidos")
+
+    ahora = datetime.now(timezone.utc).replace(tzinfo=None)
+    detalles = []
+    def filas_pedidos():
+        for n in range(pedidos):
+            id_pedido = primer_pedido + n
+            lineas = [(p, aleatorio.randint(1, 3)) for p in aleatorio.sample(visibles, min(aleatorio.randint(1, 5), len(visibles)))]
+            detalles.extend({"pedido_id": id_pedido, "producto_id": p, "cantidad": c} for p, c in lineas)
+            fecha = ahora - timedelta(seconds=aleatorio.randint(0, 365 * 24 * 3600))
+            yield {
+                "id": id_pedido,
+                "id_usuario": primer_usuario + aleatorio.randrange(usuarios),
+                "fecha": fecha,
+                "total": round(sum(float(precios[p]) * c for p, c in lineas), 2),
+                "cerrado": ahora - fecha > timedelta(days=30),
+            }
+
+    # los detalles se insertan a medida que se completa cada lote de pedidos (no se acumulan en memoria)
+    bloque = []
+    for fila in filas_pedidos():
+        bloque.append(fila)
+        if len(bloque) == lote:
+            db.session.execute(insert(Pedido), bloque)
+            _insertar_por_lotes(PedidoDetalle, detalles, lote)
+            bloque, detalles[:] = [], []
+    if bloque:
+        db.session.execute(insert(Pedido), bloque)
+        _insertar_por_lotes(PedidoDetalle, detalles, lote)
+
+    db.session.commit()
+    if indexar and productos:
+        reindexar_todo(lote)
+
+    return {
+        "usuarios": usuarios, "productos": productos, "pedidos": pedidos,
+        "primer_usuario": primer_usuario, "primer_producto": primer_producto, "primer_pedido": primer_pedido,
+    }
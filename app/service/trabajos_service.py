@@ -0,0 +1,107 @@
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.extensions import db
+from app.model.trabajos_model import Trabajo
+"""
+Cola de trabajos en segundo plano con un pool de hilos acotado.
+El estado de cada trabajo se guarda en la tabla 'trabajos', por lo que cualquier worker de gunicorn puede
+responder por él; la ejecución ocurre en el proceso que lo encoló.
+Funciones:
+    init_trabajos(app): Configura la cantidad de hilos y el máximo de trabajos en espera.
+    encolar(tipo, funcion, *args): Registra el trabajo como 'pendiente' y lo envía al pool. Retorna su id.
+        Lanza ColaLlenaError si ya hay 'TRABAJOS_MAX_PENDIENTES' trabajos sin terminar en este proceso.
+    obtener_trabajo(trabajo_id): Retorna el estado del trabajo como diccionario. Lanza ValueError si no existe.
+    esperar(trabajo_id, timeout): Espera a que termine un trabajo encolado por este proceso (útil en tests y CLI).
+Notas:
+    'funcion' se ejecuta dentro de un contexto de la app y su resultado debe poder serializarse a JSON.
+"""
+
+class ColaLlenaError(RuntimeError):
+    pass
+
+_config = {"hilos": 2, "max_pendientes": 20}
+_executor = None
+_cupos = None
+_futuros = {}
+_lock = threading.Lock()
+
+def init_trabajos(app):
+    global _executor, _cupos
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _config["hilos"] = int(app.config.get("TRABAJOS_HILOS", 2))
+        _config["max_pendientes"] = int(app.config.get("TRABAJOS_MAX_PENDIENTES", 20))
+        _executor = None
+        _cupos = threading.BoundedSemaphore(_config["max_pendientes"])
+
+def _obtener_executor():
+    global _executor, _cupos
+    with _lock:
+        if _cupos is None:
+            _cupos = threading.BoundedSemaphore(_config["max_pendientes"])
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_config["hilos"], thread_name_prefix="trabajos")
+        return _executor
+
+def _serializar(trabajo):
+    return {
+        "trabajo_id": trabajo.id,
+        "tipo": trabajo.tipo,
+        "estado": trabajo.estado,
+        "resultado": json.loads(trabajo.resultado) if trabajo.resultado is not None else None,
+        "error": trabajo.error
+    }
+
+def _actualizar(trabajo_id, **campos):
+    trabajo = db.session.get(Trabajo, trabajo_id)
+    for campo, valor in campos.items():
+        setattr(trabajo, campo, valor)
+    db.session.commit()
+
+def _ejecutar(app, trabajo_id, funcion, args):
+    with app.app_context():
+        try:
+            _actualizar(trabajo_id, estado="procesando")
+            resultado = funcion(*args)
+            _actualizar(trabajo_id, estado="completado", resultado=json.dumps(resultado))
+        except Exception as e:
+            db.session.rollback()
+            _actualizar(trabajo_id, estado="error", error=str(e))
+        finally:
+            db.session.remove()
+            _cupos.release()
+
+def encolar(tipo, funcion, *args):
+    executor = _obtener_executor()
+    if not _cupos.acquire(blocking=False):
+        raise ColaLlenaError("Hay demasiados trabajos en espera, intente más tarde")
+
+    try:
+        trabajo = Trabajo(id=uuid.uuid4().hex, tipo=tipo, estado="pendiente")
+        db.session.add(trabajo)
+        db.session.commit()
+        trabajo_id = trabajo.id
+
+        app = current_app._get_current_object()
+        futuro = executor.submit(_ejecutar, app, trabajo_id, funcion, args)
+        _futuros[trabajo_id] = futuro
+        futuro.add_done_callback(lambda _: _futuros.pop(trabajo_id, None))
+        return trabajo_id
+    except Exception:
+        db.session.rollback()
+        _cupos.release()
+        raise
+
+def obtener_trabajo(trabajo_id):
+    trabajo = db.session.get(Trabajo, trabajo_id, populate_existing=True)
+    if not trabajo: raise ValueError("Trabajo no encontrado")
+    return _serializar(trabajo)
+
+def esperar(trabajo_id, timeout=None):
+    futuro = _futuros.get(trabajo_id)
+    if futuro is not None:
+        futuro.result(timeout=timeout)
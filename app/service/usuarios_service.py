@@ -1,15 +1,29 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token
 from pydantic import ValidationError
+from sqlalchemy import or_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.model.token_blacklist import TokenBlacklist
 from app.model.dto.Usuarios_dto import UsuarioEntradaDTO, UsuarioSalidaDTO, UsuarioUpdateDTO, validar_telefono_ar
 from app.model.usuarios_model import Usuario
 from app.extensions import db
+from app.security.contrasenias import necesita_rehash
+from app.security.revocation_cache import revocation_cache
+from app.service.trabajos_service import ColaLlenaError
 """
 Módulo de servicios para la gestión de usuarios.
 Funciones:
 - obtener(id): Busca y retorna un usuario por su ID. Lanza ValueError si no se encuentra.
 - check_password(email, contrasenia): Verifica las credenciales del usuario y retorna tokens JWT si son correctas. Lanza ValueError en caso de error de validación, usuario inactivo/no encontrado o contraseña incorrecta.
-- logout_token(jti): Revoca un token JWT añadiendo su JTI a la lista negra.
+  Si el hash guardado usa otro método o costo que CONTRASENIA_HASH_METODO, lo regenera con la contraseña recibida.
+  Lanza ColaLlenaError si el pool de hashing está saturado (también crear y editar).
+- logout_token(jti, exp): Revoca un token JWT añadiendo su JTI y su vencimiento ('exp', epoch) a la lista negra
+  con un único INSERT idempotente, y lo registra en la caché de revocación del proceso.
+- purgar_tokens_expirados(lote): Elimina por lotes las filas de la lista negra cuyos tokens ya vencieron. Retorna cuántas borró.
+- iniciar_purga_periodica(app, intervalo): Lanza un hilo que ejecuta la purga cada 'intervalo' segundos.
 - crear(request): Crea un nuevo usuario a partir de los datos recibidos en el request. Valida unicidad de email, teléfono y nombre de usuario, y que se acepte el uso de datos. Lanza ValueError en caso de error de validación o si ya existen los datos.
 Excepciones:
 - ValueError: Se lanza en caso de errores de validación, datos duplicados o problemas al interactuar con la base de datos.
@@ -36,6 +50,9 @@ def check_password(email, contrasenia):
         if not usuario.check_password(contrasenia):
             raise ValueError("Contraseña incorrecta")
 
+        if necesita_rehash(usuario.contrasenia):
+            _rehashear(usuario, contrasenia)
+
         access_token = create_access_token(
             identity=str(usuario.id),
             additional_claims={"rol": usuario.rol}
@@ -50,6 +67,8 @@ def check_password(email, contrasenia):
             "refresh": refresh_token
         }
 
+    except ColaLlenaError:
+        raise
     except ValidationError as e:
         raise ValueError(f"Error de validación: {e.errors()}")
     except ValueError as e:
@@ -57,12 +76,78 @@ def check_password(email, contrasenia):
     except Exception as e:
         raise ValueError(f"Error al comprobar la contraseña: {str(e)}")
 
-def logout_token(jti: str):
-    if TokenBlacklist.query.filter_by(jti=jti).first():
-        return  # ya revocado
-
-    db.session.add(TokenBlacklist(jti=jti))
+def _rehashear(usuario, contrasenia):
+    # una falla al actualizar el hash no impide el login: se reintenta en el próximo
+    try:
+        usuario.set_password(contrasenia)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning("No se pudo actualizar el hash del usuario %s: %s", usuario.id, e)
+
+def logout_token(jti: str, exp: int | None = None):
+    valores = {
+        "jti": jti,
+        "created_at": datetime.now(timezone.utc),
+        "expires_at": datetime.fromtimestamp(exp, timezone.utc) if exp is not None else None
+    }
+
+    # INSERT que ignora el duplicado (ya revocado) sin hacer un SELECT previo
+    dialecto = db.session.get_bind().dialect.name
+    if dialecto == "mysql":
+        stmt = mysql_insert(TokenBlacklist).values(**valores)
+        stmt = stmt.on_duplicate_key_update(jti=stmt.inserted.jti)
+    elif dialecto == "sqlite":
+        stmt = sqlite_insert(TokenBlacklist).values(**valores).on_conflict_do_nothing(index_elements=["jti"])
+    else:
+        if TokenBlacklist.query.filter_by(jti=jti).first():
+            revocation_cache.registrar(jti)
+            return  # ya revocado
+        stmt = TokenBlacklist.__table__.insert().values(**valores)
+
+    db.session.execute(stmt)
     db.session.commit()
+    revocation_cache.registrar(jti)
+
+# eliminar de la lista negra los tokens ya vencidos
+def purgar_tokens_expirados(lote=1000):
+    ahora = datetime.now(timezone.utc)
+    # filas sin 'expires_at' (previas a ese campo): vencen a más tardar con la duración del refresh token
+    vencimiento_maximo = current_app.config.get("JWT_REFRESH_TOKEN_EXPIRES", timedelta(days=7))
+    vencidos = or_(
+        TokenBlacklist.expires_at < ahora,
+        (TokenBlacklist.expires_at.is_(None)) & (TokenBlacklist.created_at < ahora - vencimiento_maximo)
+    )
+
+    total = 0
+    try:
+        while True:
+            ids = [fila[0] for fila in db.session.query(TokenBlacklist.id).filter(vencidos).limit(lote).all()]
+            if not ids:
+                break
+            TokenBlacklist.query.filter(TokenBlacklist.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            total += len(ids)
+        return total
+    except Exception as e:
+        db.session.rollback()
+        raise ValueError("Error al purgar tokens vencidos: " + str(e))
+
+def iniciar_purga_periodica(app, intervalo):
+    def ejecutar():
+        while not detener.wait(intervalo):
+            with app.app_context():
+                try:
+                    purgar_tokens_expirados(app.config.get("TOKEN_PURGE_BATCH_SIZE", 1000))
+                except ValueError as e:
+                    app.logger.warning(str(e))
+                finally:
+                    db.session.remove()
+
+    detener = threading.Event()
+    hilo = threading.Thread(target=ejecutar, name="purga-tokens", daemon=True)
+    hilo.start()
+    return detener
 
 # crear usuario
 def crear(request):
@@ -90,6 +175,8 @@ def crear(request):
 
         db.session.add(nuevo_usuario) # prepara la insercion
         db.session.commit() # ejecuta la insercion en la base de datos
+    except ColaLlenaError:
+        raise
     except ValidationError as e:
         raise ValueError(f"Error de validación: {e.errors()}")
     except ValueError as e:
@@ -143,6 +230,9 @@ def editar(id, request, es_admin=False):
         db.session.commit()
         return UsuarioSalidaDTO.from_model(usuario).__dict__
 
+    except ColaLlenaError:
+        db.session.rollback()
+        raise
     except ValidationError as e:
         raise ValueError(f"Error de validación: {e.errors()}")
     except ValueError as e:
@@ -285,4 +285,60 @@ def test_eliminar_pedido_ok(app_context, sample_pedido):
 
 def test_eliminar_pedido_no_existe(app_context):
     with pytest.raises(ValueError, match="Pedido no encontrado"):
-        eliminar_pedido(999)
\ No newline at end of file
+        eliminar_pedido(999)
+
+# ------------------------
+# TEST paginación de listados
+# ------------------------
+
+def test_listar_productos_paginado(app_context, sample_product):
+    res = listar_productos(None, "1", None)
+    assert [p["id"] for p in res["items"]] == [sample_product.id]
+    assert res["next_cursor"] is None
+
+def test_listar_usuarios_paginado(app_context, sample_user):
+    otro = Usuario(nombre="otro", email="otro@test.com", telefono="+5491199999999")
+    otro.set_password("pass")
+    db.session.add(otro)
+    db.session.commit()
+
+    primera = listar_usuarios(None, "1", None)
+    segunda = listar_usuarios(None, "1", primera["next_cursor"])
+    assert [u["id"] for u in primera["items"]] == [sample_user.id]
+    assert [u["id"] for u in segunda["items"]] == [otro.id]
+    assert segunda["next_cursor"] is None
+
+def test_listar_pedidos_paginado(app_context, sample_pedido):
+    res = listar_pedidos(None, "10", None)
+    assert [p["id"] for p in res["items"]] == [sample_pedido.id]
+    assert res["next_cursor"] is None
+
+def test_listar_pedidos_limit_invalido(app_context, sample_pedido):
+    with pytest.raises(ValueError, match="Error en el parámetro 'limit'"):
+        listar_pedidos(None, "abc", None)
+
+# ------------------------
+# TEST consultas N+1 en pedidos
+# ------------------------
+
+def test_listar_pedidos_consultas_constantes(app_context, varios_pedidos, contar_consultas):
+    res = listar_pedidos(None)
+    assert len(res) == 5
+    assert len(contar_consultas) == 3
+
+def test_listar_pedidos_paginado_consultas_constantes(app_context, varios_pedidos, contar_consultas):
+    res = listar_pedidos(None, "3", None)
+    assert len(res["items"]) == 3
+    assert len(contar_consultas) == 3
+
+def test_obtener_pedido_por_producto_consultas_constantes(app_context, varios_pedidos, contar_consultas):
+    producto_id = Producto.query.filter_by(nombre="Prod0").first().id
+    contar_consultas.clear()
+    res = obtener_pedido(2, producto_id, None)
+    assert res[0]["detalles"][0]["subtotal"] == 10
+    assert len(contar_consultas) == 3
+
+def test_listar_productos_fields(app_context, sample_product):
+    assert listar_productos(None, None, None, "nombre") == [{"id": sample_product.id, "nombre": "TestProducto"}]
+    with pytest.raises(ValueError, match="Error en el parámetro 'fields'"):
+        listar_productos(None, None, None, "precio,foo")
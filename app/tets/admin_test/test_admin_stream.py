@@ -0,0 +1,53 @@
+import pytest
+import json
+from app.extensions import db
+from app.model.pedidos_model import Pedido
+from app.service.admin_service import iterar_pedidos, iterar_usuarios, listar_pedidos
+
+# ------------------------
+# TEST streaming de listados
+# ------------------------
+
+def test_iterar_pedidos_por_lotes(varios_pedidos):
+    lotes = list(iterar_pedidos(None, lote=2))
+    assert [len(l) for l in lotes] == [2, 2, 1]
+    ids = [p["id"] for l in lotes for p in l]
+    assert ids == sorted(ids)
+    assert [p for l in lotes for p in l] == listar_pedidos(None)
+
+def test_iterar_pedidos_libera_objetos(varios_pedidos):
+    for _ in iterar_pedidos(None, lote=2):
+        pass
+    assert not any(isinstance(obj, Pedido) for obj in db.session)
+
+def test_iterar_pedidos_filtro_invalido_antes_de_empezar(app_context):
+    with pytest.raises(ValueError):
+        iterar_pedidos("tal vez")
+
+def test_iterar_usuarios_vacio(app_context):
+    assert list(iterar_usuarios("false")) == []
+
+def test_get_pedidos_stream_ndjson(client, admin_headers, varios_pedidos):
+    response = client.get("/admin/pedidos?stream=ndjson", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lineas = [json.loads(l) for l in response.get_data(as_text=True).splitlines()]
+    assert len(lineas) == 5
+    assert all(len(p["detalles"]) == 2 for p in lineas)
+
+def test_get_pedidos_stream_json(client, admin_headers, varios_pedidos):
+    response = client.get("/admin/pedidos?stream=json", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    pedidos = json.loads(response.get_data(as_text=True))
+    assert len(pedidos) == 5
+    assert pedidos == client.get("/admin/pedidos", headers=admin_headers).get_json()
+
+def test_get_usuarios_stream_json_vacio(client, admin_headers, app_context):
+    response = client.get("/admin/usuarios?stream=json&activos=false", headers=admin_headers)
+    assert response.status_code == 200
+    assert json.loads(response.get_data(as_text=True)) == []
+
+def test_stream_formato_invalido(client, admin_headers, app_context):
+    response = client.get("/admin/pedidos?stream=xml", headers=admin_headers)
+    assert response.status_code == 400
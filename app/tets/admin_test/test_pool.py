@@ -0,0 +1,110 @@
+import gc
+import weakref
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, exc
+from app.service import pool_service
+from app.extensions import db
+from app.service.pool_service import InstrumentedQueuePool, calentar_pool, estadisticas_pool, init_pool
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    yield engine
+    engine.dispose()
+
+# ------------------------
+# TEST InstrumentedQueuePool
+# ------------------------
+
+def test_estadisticas_en_uso_e_inactivas(engine):
+    with engine.connect():
+        with engine.connect():
+            datos = estadisticas_pool(engine)
+            assert datos["en_uso"] == 2
+            assert datos["overflow"] == 1
+    datos = estadisticas_pool(engine)
+    assert datos["clase"] == "InstrumentedQueuePool"
+    assert datos["en_uso"] == 0
+    assert datos["inactivas"] == 1
+    assert datos["checkouts"] == 2
+    assert datos["espera_max_ms"] >= datos["espera_media_ms"] >= 0
+
+def test_timeout_con_pool_agotado(engine):
+    with engine.connect(), engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    datos = estadisticas_pool(engine)
+    assert datos["timeouts"] == 1
+    assert datos["checkouts"] == 2  # el checkout fallido no cuenta
+
+def test_recreate_conserva_la_clase(engine):
+    assert isinstance(engine.pool.recreate(), InstrumentedQueuePool)
+
+# ------------------------
+# TEST configuración
+# ------------------------
+
+def test_init_pool_mysql_completa_opciones():
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="mysql+pymysql://u:p@localhost/db",
+        SQLALCHEMY_ENGINE_OPTIONS={"connect_args": {"ssl": {}}, "pool_size": 20},
+        DB_MAX_OVERFLOW=3, DB_POOL_PRE_PING=False
+    )
+    init_pool(app)
+    opciones = app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+    assert opciones["poolclass"] is InstrumentedQueuePool
+    assert opciones["pool_size"] == 20  # lo explícito tiene prioridad
+    assert opciones["max_overflow"] == 3
+    assert opciones["pool_pre_ping"] is False
+    assert opciones["connect_args"] == {"ssl": {}}
+
+def test_init_pool_no_retiene_la_app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "mysql+pymysql://u:p@localhost/db"
+    init_pool(app)
+    assert app in pool_service._apps
+    pool_service._descartar_heredadas()  # app sin db.init_app: se omite
+
+    referencia = weakref.ref(app)
+    del app
+    gc.collect()
+    assert referencia() is None
+
+def test_init_pool_sqlite_no_modifica():
+    app_sqlite = Flask(__name__)
+    app_sqlite.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    init_pool(app_sqlite)
+    assert "SQLALCHEMY_ENGINE_OPTIONS" not in app_sqlite.config
+
+def test_calentar_pool_usa_el_tamano_real_del_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(pool_service, "_usa_sqlite", lambda app: False)
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'prefill.db'}",
+        SQLALCHEMY_ENGINE_OPTIONS={"pool_size": 3}, DB_POOL_SIZE=1, DB_POOL_PREFILL=5
+    )
+    init_pool(app)
+    db.init_app(app)
+
+    assert calentar_pool(app) == 3
+    with app.app_context():
+        assert estadisticas_pool()["inactivas"] == 3
+        db.engine.dispose()
+
+# ------------------------
+# TEST endpoint
+# ------------------------
+
+def test_get_pool(client, admin_headers):
+    response = client.get("/admin/db/pool", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert "pid" in data and "clase" in data
+
+def test_get_pool_requiere_admin(client):
+    assert client.get("/admin/db/pool").status_code == 401
@@ -0,0 +1,69 @@
+import io
+import pytest
+from app.service.trabajos_service import ColaLlenaError, encolar, esperar, init_trabajos, obtener_trabajo
+
+def _imagen():
+    return {"image": (io.BytesIO(b"fake-jpg-bytes"), "foto.jpg")}
+
+# ------------------------
+# TEST subida asincrónica
+# ------------------------
+
+def test_subida_asincronica_devuelve_trabajo(client, admin_headers, cloudinary_stub):
+    response = client.post("/admin/upload-image?async=true", data=_imagen(),
+                           headers=admin_headers, content_type="multipart/form-data")
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data["estado"] == "pendiente"
+    assert data["url_estado"] == f"/admin/trabajos/{data['trabajo_id']}"
+
+    esperar(data["trabajo_id"], timeout=5)
+
+    estado = client.get(data["url_estado"], headers=admin_headers).get_json()
+    assert estado["estado"] == "completado"
+    assert estado["resultado"]["url"].endswith("/productos/stub.jpg")
+    assert cloudinary_stub[0][:2] == ("upload", b"fake-jpg-bytes")
+
+def test_subida_sincronica_sigue_igual(client, admin_headers, cloudinary_stub):
+    response = client.post("/admin/upload-image", data=_imagen(),
+                           headers=admin_headers, content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert response.get_json()["url"].endswith("/productos/stub.jpg")
+
+def test_eliminacion_asincronica_con_error(client, admin_headers, cloudinary_stub):
+    response = client.delete(
+        "/admin/delete-image?async=true", headers=admin_headers,
+        json={"url": "https://res.cloudinary.com/test_cloud/image/upload/v1/productos/no-existe.jpg"}
+    )
+    assert response.status_code == 202
+    trabajo_id = response.get_json()["trabajo_id"]
+    esperar(trabajo_id, timeout=5)
+
+    estado = client.get(f"/admin/trabajos/{trabajo_id}", headers=admin_headers).get_json()
+    assert estado["estado"] == "error"
+    assert estado["error"] == "No se pudo eliminar la imagen"
+    assert cloudinary_stub == [("destroy", "productos/no-existe")]
+
+def test_trabajo_inexistente(client, admin_headers):
+    response = client.get("/admin/trabajos/no-existe", headers=admin_headers)
+    assert response.status_code == 404
+
+# ------------------------
+# TEST cola acotada
+# ------------------------
+
+def test_cola_llena(app, app_context):
+    import threading
+    liberar = threading.Event()
+    app.config["TRABAJOS_MAX_PENDIENTES"] = 1
+    init_trabajos(app)
+    try:
+        trabajo_id = encolar("bloqueante", liberar.wait, 5)
+        with pytest.raises(ColaLlenaError):
+            encolar("otro", lambda: None)
+        liberar.set()
+        esperar(trabajo_id, timeout=5)
+        assert obtener_trabajo(trabajo_id)["estado"] == "completado"
+    finally:
+        app.config.pop("TRABAJOS_MAX_PENDIENTES")
+        init_trabajos(app)
@@ -0,0 +1,115 @@
+import os
+import signal
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.security import contrasenias
+from app.security.contrasenias import hashear, init_contrasenias, necesita_rehash, verificar
+from app.service.trabajos_service import ColaLlenaError
+from app.service.usuarios_service import check_password
+
+@pytest.fixture
+def configurar_hash(app):
+    """Aplica la configuración de hashing indicada y restaura la de los tests al terminar."""
+    originales = {clave: app.config.get(clave) for clave in
+                  ("CONTRASENIA_HASH_METODO", "CONTRASENIA_PROCESOS", "CONTRASENIA_MAX_PENDIENTES")}
+
+    def configurar(**valores):
+        app.config.update(**valores)
+        init_contrasenias(app)
+
+    yield configurar
+    for clave, valor in originales.items():
+        if valor is None:
+            app.config.pop(clave, None)
+        else:
+            app.config[clave] = valor
+    init_contrasenias(app)
+
+def test_metodo_y_costo_configurables(configurar_hash):
+    configurar_hash(CONTRASENIA_HASH_METODO="pbkdf2:sha256:1000")
+    hash = hashear("secreta")
+    assert hash.startswith("pbkdf2:sha256:1000$")
+    assert verificar(hash, "secreta") and not verificar(hash, "otra")
+    assert not necesita_rehash(hash)
+    assert necesita_rehash(generate_password_hash("secreta", "pbkdf2:sha256:2000"))
+    assert necesita_rehash(generate_password_hash("secreta", "scrypt"))
+
+def test_login_actualiza_hash_con_otro_metodo(configurar_hash, sample_user):
+    configurar_hash(CONTRASENIA_HASH_METODO="pbkdf2:sha256:1000")
+    assert necesita_rehash(sample_user.contrasenia)  # el fixture usa el método por defecto (scrypt)
+
+    check_password(sample_user.email, "1234")
+    db.session.refresh(sample_user)
+    assert sample_user.contrasenia.startswith("pbkdf2:sha256:1000$")
+    assert sample_user.check_password("1234")
+
+def test_login_fallido_no_actualiza_hash(configurar_hash, sample_user):
+    original = sample_user.contrasenia
+    configurar_hash(CONTRASENIA_HASH_METODO="pbkdf2:sha256:1000")
+    with pytest.raises(ValueError):
+        check_password(sample_user.email, "incorrecta")
+    db.session.refresh(sample_user)
+    assert sample_user.contrasenia == original
+
+def test_hash_en_pool_de_procesos(configurar_hash):
+    configurar_hash(CONTRASENIA_HASH_METODO="pbkdf2:sha256:1000", CONTRASENIA_PROCESOS=1)
+    hash = hashear("secreta")
+    assert verificar(hash, "secreta")
+    assert contrasenias._executor is not None
+
+def test_cola_llena_responde_503(configurar_hash, client, sample_user):
+    configurar_hash(CONTRASENIA_PROCESOS=1, CONTRASENIA_MAX_PENDIENTES=1)
+    _, cupos = contrasenias._obtener_executor()
+    cupos.acquire()  # ocupa el único cupo, como un hash en curso
+    try:
+        with pytest.raises(ColaLlenaError):
+            hashear("secreta")
+        response = client.post("/auth/login", json={"email": sample_user.email, "contrasenia": "1234"})
+        assert response.status_code == 503
+    finally:
+        cupos.release()
+
+def test_pool_roto_se_recrea(configurar_hash):
+    configurar_hash(CONTRASENIA_HASH_METODO="pbkdf2:sha256:1000", CONTRASENIA_PROCESOS=1)
+    hash = hashear("secreta")
+    roto = contrasenias._executor
+    for proceso in list(roto._processes.values()):
+        os.kill(proceso.pid, signal.SIGKILL)
+        proceso.join(timeout=10)
+
+    assert verificar(hash, "secreta")
+    assert contrasenias._executor is not None and contrasenias._executor is not roto
+
+def test_pool_roto_dos_veces_responde_503(configurar_hash, client, sample_user, monkeypatch):
+    configurar_hash(CONTRASENIA_PROCESOS=1)
+
+    class PoolRoto:
+        def submit(self, *args):
+            raise BrokenProcessPool("proceso terminado")
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(contrasenias, "ProcessPoolExecutor", lambda **kwargs: PoolRoto())
+    with pytest.raises(ColaLlenaError):
+        hashear("secreta")
+    response = client.post("/auth/login", json={"email": sample_user.email, "contrasenia": "1234"})
+    assert response.status_code == 503
+
+def test_cambiar_contrasenia_con_cola_llena_responde_503(configurar_hash, app, client, sample_user, admin_headers):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(sample_user.id))}"}
+    configurar_hash(CONTRASENIA_PROCESOS=1, CONTRASENIA_MAX_PENDIENTES=1)
+    _, cupos = contrasenias._obtener_executor()
+    cupos.acquire()
+    try:
+        response = client.put("/usuarios/me", json={"contrasenia": "nueva1234"}, headers=headers)
+        assert response.status_code == 503
+        response = client.put(f"/admin/usuarios/{sample_user.id}", json={"contrasenia": "nueva1234"},
+                              headers=admin_headers)
+        assert response.status_code == 503
+    finally:
+        cupos.release()
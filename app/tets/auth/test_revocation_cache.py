@@ -0,0 +1,78 @@
+from app.extensions import db
+from app.model.token_blacklist import TokenBlacklist
+from app.security.revocation_cache import BloomFilter, RevocationCache
+from app.service.usuarios_service import logout_token
+
+# ------------------------
+# TEST BloomFilter
+# ------------------------
+
+def test_bloom_sin_falsos_negativos():
+    bloom = BloomFilter(1000)
+    jtis = [f"jti-{i}" for i in range(1000)]
+    for jti in jtis:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in jtis)
+
+def test_bloom_tasa_de_falsos_positivos_baja():
+    bloom = BloomFilter(1000, tasa_error=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    falsos = sum(f"otro-{i}" in bloom for i in range(10000))
+    assert falsos < 300
+
+# ------------------------
+# TEST RevocationCache
+# ------------------------
+
+def test_no_revocado_no_consulta_db(app_context, contar_consultas):
+    cache = RevocationCache(ttl=60)
+    cache.es_revocado("primero")  # carga inicial del filtro
+    contar_consultas.clear()
+
+    assert cache.es_revocado("no-revocado") is False
+    assert contar_consultas == []
+
+def test_revocado_localmente_se_ve_al_instante(app_context):
+    cache = RevocationCache(ttl=60)
+    assert cache.es_revocado("abc") is False
+    db.session.add(TokenBlacklist(jti="abc"))
+    db.session.commit()
+    cache.registrar("abc")
+    assert cache.es_revocado("abc") is True
+
+def test_revocado_por_otro_worker_se_ve_al_refrescar(app_context, monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr("app.security.revocation_cache.time.monotonic", lambda: ahora[0])
+    cache = RevocationCache(ttl=5)
+    assert cache.es_revocado("remoto") is False
+
+    # otro proceso inserta en la DB sin pasar por esta caché
+    db.session.add(TokenBlacklist(jti="remoto"))
+    db.session.commit()
+    assert cache.es_revocado("remoto") is False
+
+    ahora[0] += 6
+    assert cache.es_revocado("remoto") is True
+
+def test_falso_positivo_queda_en_negativos(app_context, monkeypatch, contar_consultas):
+    cache = RevocationCache(ttl=60)
+    cache.es_revocado("x")
+    monkeypatch.setattr(BloomFilter, "__contains__", lambda self, item: True)
+    contar_consultas.clear()
+
+    assert cache.es_revocado("falso-positivo") is False
+    assert cache.es_revocado("falso-positivo") is False
+    assert len(contar_consultas) == 1
+
+def test_ttl_cero_consulta_siempre(app_context, contar_consultas):
+    cache = RevocationCache(ttl=0)
+    cache.es_revocado("a")
+    cache.es_revocado("a")
+    assert len(contar_consultas) == 2
+
+def test_logout_token_registra_en_cache(app_context):
+    from app.security.revocation_cache import revocation_cache
+    revocation_cache.es_revocado("inicial")
+    logout_token("revocado-por-logout")
+    assert revocation_cache.es_revocado("revocado-por-logout") is True
@@ -1,9 +1,12 @@
 import pytest
+from sqlalchemy import event
 from app.app import create_app
 from app.extensions import db
 from app.model.usuarios_model import Usuario
 from app.model.productos_model import Producto
 from app.model.dto.Usuarios_dto import validar_telefono_ar
+from app.service.cache_service import invalidar_catalogo
+from app.security.revocation_cache import revocation_cache
 from werkzeug.security import generate_password_hash
 from PIL import Image
 from pathlib import Path
@@ -31,6 +34,8 @@ def app_context(app):
     """
     with app.app_context():
         db.create_all()
+        invalidar_catalogo()
+        revocation_cache.reset()
         yield
         db.session.remove()
         db.drop_all()
@@ -84,10 +89,76 @@ def sample_pedido(app_context, sample_user, sample_product):
     db.session.commit()
     return pedido
 
+@pytest.fixture
+def varios_pedidos(app_context, sample_user):
+    """
+    Crea 5 pedidos con 2 productos distintos cada uno y limpia la sesión,
+    para que las consultas posteriores partan sin nada cargado. Retorna el id del usuario.
+    """
+    from app.model.pedidos_model import Pedido, PedidoDetalle
+
+    productos = [
+        Producto(nombre=f"Prod{i}", precio=10 + i, stock=100, categoria="Cat",
+                 descripcion="d", imagen_url="img")
+        for i in range(10)
+    ]
+    db.session.add_all(productos)
+    db.session.flush()
+
+    for i in range(5):
+        pedido = Pedido(id_usuario=sample_user.id, total=0)
+        for producto in productos[i * 2:i * 2 + 2]:
+            pedido.detalles.append(PedidoDetalle(producto_id=producto.id, cantidad=1))
+        db.session.add(pedido)
+    db.session.commit()
+    usuario_id = sample_user.id
+    db.session.expunge_all()
+    return usuario_id
+
+@pytest.fixture
+def contar_consultas(app_context):
+    """Lista con cada sentencia SQL ejecutada mientras dura el test."""
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", registrar)
+    yield consultas
+    event.remove(db.engine, "before_cursor_execute", registrar)
+
 @pytest.fixture
 def client(app, app_context):
     return app.test_client()
 
+@pytest.fixture
+def admin_headers(app):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"rol": "admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def cloudinary_stub(monkeypatch):
+    """
+    Reemplaza el uploader de Cloudinary por un stub local que no sale a la red.
+    Retorna la lista de llamadas recibidas: ("upload", contenido, opciones) / ("destroy", public_id).
+    """
+    import cloudinary.uploader
+    llamadas = []
+
+    def upload(file, **opciones):
+        llamadas.append(("upload", file.read(), opciones))
+        return {"secure_url": f"https://res.cloudinary.com/test_cloud/image/upload/v1/{opciones.get('folder')}/stub.jpg"}
+
+    def destroy(public_id, **opciones):
+        llamadas.append(("destroy", public_id))
+        return {"result": "ok" if public_id != "productos/no-existe" else "not found"}
+
+    monkeypatch.setattr(cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(cloudinary.uploader, "destroy", destroy)
+    return llamadas
+
 @pytest.fixture
 def disable_jwt_blacklist(app, monkeypatch):
     monkeypatch.setattr(
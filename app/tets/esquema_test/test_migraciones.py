@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+from app.extensions import db
+from app.migraciones.motor import estado, listar_migraciones, migrar
+
+def _indices(engine):
+    with engine.connect() as conn:
+        filas = conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_autoindex%'"
+        )
+        return {fila[0] for fila in filas}
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+# Esquema tal como estaba antes de las migraciones (sin índices secundarios ni expires_at)
+ESQUEMA_ANTERIOR = [
+    """CREATE TABLE usuarios (id INTEGER PRIMARY KEY, nombre VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NOT NULL UNIQUE, contrasenia VARCHAR(250) NOT NULL, telefono VARCHAR(20) NOT NULL,
+        activo BOOLEAN, rol VARCHAR(7) NOT NULL)""",
+    """CREATE TABLE productos (id INTEGER PRIMARY KEY, nombre VARCHAR(100) NOT NULL, precio NUMERIC(10, 2) NOT NULL,
+        stock INTEGER NOT NULL, categoria VARCHAR(50) NOT NULL, descripcion TEXT NOT NULL,
+        imagen_url VARCHAR(200) NOT NULL, mostrar BOOLEAN, destacado BOOLEAN NOT NULL)""",
+    """CREATE TABLE pedidos (id INTEGER PRIMARY KEY, id_usuario INTEGER NOT NULL REFERENCES usuarios (id),
+        fecha DATETIME, total FLOAT NOT NULL, cerrado BOOLEAN)""",
+    """CREATE TABLE pedido_detalle (id INTEGER PRIMARY KEY, pedido_id INTEGER NOT NULL REFERENCES pedidos (id),
+        producto_id INTEGER NOT NULL REFERENCES productos (id), cantidad INTEGER NOT NULL)""",
+    """CREATE TABLE token_blacklist (id INTEGER PRIMARY KEY, jti VARCHAR(36) NOT NULL UNIQUE,
+        created_at DATETIME NOT NULL)""",
+    """INSERT INTO productos (nombre, precio, stock, categoria, descripcion, imagen_url, mostrar, destacado)
+        VALUES ('Yerba Mate', 10, 5, 'Almacen', 'Paquete de 1kg', 'img', 1, 0)""",
+]
+
+def test_migrar_base_vacia_aplica_todo(engine):
+    versiones = [v for v, _ in listar_migraciones()]
+    assert migrar(engine) == versiones
+    assert all(aplicada for _, _, aplicada in estado(engine))
+
+    tablas = set(inspect(engine).get_table_names())
+    assert {"productos", "pedidos", "producto_trigramas", "trabajos", "catalogo_version", "schema_version"} <= tablas
+
+def test_migrar_es_idempotente(engine):
+    migrar(engine)
+    assert migrar(engine) == []
+
+def test_migrar_hasta_una_version(engine):
+    assert migrar(engine, hasta=1) == [1]
+    pendientes = [v for v, _, aplicada in estado(engine) if not aplicada]
+    assert pendientes and 1 not in pendientes
+    assert "trabajos" not in inspect(engine).get_table_names()
+
+def test_migrar_base_existente(engine):
+    with engine.begin() as conn:
+        for sentencia in ESQUEMA_ANTERIOR:
+            conn.exec_driver_sql(sentencia)
+
+    migrar(engine)
+
+    columnas = {c["name"] for c in inspect(engine).get_columns("token_blacklist")}
+    assert "expires_at" in columnas
+    assert {"ix_productos_mostrar_id", "ix_productos_categoria_lower", "ix_pedidos_id_usuario_cerrado",
+            "ix_pedido_detalle_producto_id", "ix_usuarios_telefono", "ix_token_blacklist_expires_at"} <= _indices(engine)
+    with engine.connect() as conn:
+        # el índice de búsqueda se llena con los productos que ya existían
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM producto_trigramas").scalar() > 0
+
+def test_migraciones_y_modelos_declaran_los_mismos_indices(engine, app_context):
+    migrar(engine)
+    assert _indices(engine) == _indices(db.engine)
+
+def test_migraciones_y_modelos_declaran_las_mismas_columnas(engine, app_context):
+    migrar(engine)
+    for tabla in db.metadata.sorted_tables:
+        columnas = {c["name"] for c in inspect(engine).get_columns(tabla.name)}
+        assert columnas == {c["name"] for c in inspect(db.engine).get_columns(tabla.name)}, tabla.name
+
+def test_migrar_crea_la_fila_de_version_del_catalogo(engine, app_context):
+    migrar(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT id, version FROM catalogo_version").all() == [(1, 0)]
+    with db.engine.connect() as conn:  # db.create_all() la crea con el evento 'after_create'
+        assert conn.exec_driver_sql("SELECT id, version FROM catalogo_version").all() == [(1, 0)]
+
+def test_comando_migrar(app, app_context):
+    runner = app.test_cli_runner()
+    resultado = runner.invoke(args=["migrar"])
+    assert resultado.exit_code == 0
+    assert "aplicada" in resultado.output
+
+    resultado = runner.invoke(args=["estado-migraciones"])
+    assert "pendiente" not in resultado.output
+    assert runner.invoke(args=["migrar"]).output.strip() == "El esquema ya está actualizado"
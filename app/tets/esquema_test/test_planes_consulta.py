@@ -0,0 +1,64 @@
+import re
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.service import admin_service, pedidos_service, productos_service, usuarios_service
+
+# Tablas que no deben recorrerse completas cuando la consulta filtra
+TABLAS_CALIENTES = {"productos", "pedidos", "pedido_detalle", "usuarios"}
+
+@pytest.fixture
+def sentencias(app_context, varios_pedidos):
+    capturadas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            capturadas.append((statement, parameters))
+
+    db.session.expunge_all()
+    event.listen(db.engine, "before_cursor_execute", registrar)
+    yield capturadas
+    event.remove(db.engine, "before_cursor_execute", registrar)
+
+def _recorridos_completos(statement, parameters):
+    """Retorna las tablas calientes que el plan de SQLite recorre completas (SCAN sin índice)."""
+    with db.engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    recorridas = set()
+    for fila in plan:
+        coincidencia = re.match(r"SCAN (\w+)(?: AS \w+)?$", fila[-1])
+        if coincidencia and coincidencia.group(1) in TABLAS_CALIENTES:
+            recorridas.add(coincidencia.group(1))
+    return recorridas
+
+CONSULTAS = {
+    "listar productos visibles": lambda ids: productos_service.listar(),
+    "listar productos paginado": lambda ids: productos_service.listar("2", None),
+    "productos destacados": lambda ids: productos_service.featured(),
+    "productos por categoría": lambda ids: productos_service.obtener(2, "cat"),
+    "admin productos ocultos": lambda ids: admin_service.listar_productos("false"),
+    "admin pedidos cerrados": lambda ids: admin_service.listar_pedidos("false"),
+    "admin pedidos por producto": lambda ids: admin_service.obtener_pedido(2, ids["producto"], None),
+    "pedidos por producto": lambda ids: pedidos_service.obtener(2, ids["producto"], None),
+    "pedidos por usuario": lambda ids: pedidos_service.obtener(0, ids["usuario"], "false"),
+    "admin pedidos por usuario": lambda ids: admin_service.obtener_pedido(0, ids["usuario"], "true"),
+    "registro de usuario": lambda ids: usuarios_service.crear({
+        "nombre": "otro", "email": "otro@test.com", "telefono": "1123456780",
+        "contrasenia": "abcdef", "acepta_uso_datos": True,
+    }),
+}
+
+@pytest.mark.parametrize("nombre", CONSULTAS)
+def test_consultas_usan_indices(sentencias, varios_pedidos, nombre):
+    from app.model.pedidos_model import PedidoDetalle
+    ids = {"producto": db.session.query(PedidoDetalle.producto_id).first()[0], "usuario": varios_pedidos}
+    sentencias.clear()
+
+    try:
+        CONSULTAS[nombre](ids)
+    except ValueError:
+        pass  # sólo interesa el plan de las consultas que se ejecutaron
+    assert sentencias, "no se ejecutó ninguna consulta"
+
+    for statement, parameters in sentencias:
+        assert not _recorridos_completos(statement, parameters), statement
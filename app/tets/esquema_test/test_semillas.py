@@ -0,0 +1,61 @@
+import pytest
+from werkzeug.security import check_password_hash
+from app.extensions import db
+from app.model.pedidos_model import Pedido, PedidoDetalle
+from app.model.productos_model import Producto
+from app.model.usuarios_model import Usuario
+from app.service.busqueda_service import buscar_productos
+from app.service.cache_service import obtener_version_catalogo
+from app.service.semillas_service import email_usuario, nombre_producto, sembrar
+
+def test_sembrar_cantidades_y_mezcla(app_context):
+    resultado = sembrar(usuarios=50, productos=100, pedidos=200, semilla=1, lote=30)
+    assert resultado["primer_usuario"] == resultado["primer_producto"] == resultado["primer_pedido"] == 1
+
+    assert Usuario.query.count() == 50
+    assert Usuario.query.filter_by(rol="admin").count() == 1
+    assert Usuario.query.filter_by(activo=False).count() == 2  # 25 y 50
+    assert Producto.query.filter_by(mostrar=False).count() == 14
+    assert Producto.query.filter_by(destacado=True).count() == 4
+    assert Pedido.query.count() == 200
+    assert Pedido.query.filter_by(cerrado=True).count() > 0
+
+    ocultos = {p.id for p in Producto.query.filter_by(mostrar=False)}
+    for pedido in Pedido.query.limit(20):
+        detalles = pedido.detalles
+        assert 1 <= len(detalles) <= 5
+        assert not {d.producto_id for d in detalles} & ocultos
+        assert pedido.total == pytest.approx(sum(float(d.productos.precio) * d.cantidad for d in detalles))
+
+    usuario = db.session.get(Usuario, 2)
+    assert usuario.email == email_usuario(2)
+    assert check_password_hash(usuario.contrasenia, "seed1234")
+
+def test_sembrar_es_reproducible_y_agrega(app_context):
+    sembrar(usuarios=5, productos=10, pedidos=20, semilla=7)
+    primera = [(p.id_usuario, p.total) for p in Pedido.query.order_by(Pedido.id)]
+
+    resultado = sembrar(usuarios=5, productos=10, pedidos=20, semilla=7)
+    assert (resultado["primer_usuario"], resultado["primer_producto"], resultado["primer_pedido"]) == (6, 11, 21)
+    segunda = [(p.id_usuario - 5, p.total) for p in Pedido.query.filter(Pedido.id > 20).order_by(Pedido.id)]
+    assert len(segunda) == 20
+    assert PedidoDetalle.query.count() >= 40
+    assert [u for u, _ in segunda] == [u for u, _ in primera]
+
+def test_sembrar_indexa_e_invalida_catalogo(app_context):
+    version = obtener_version_catalogo()
+    sembrar(usuarios=1, productos=3, pedidos=0, semilla=1)
+    assert obtener_version_catalogo() > version
+    assert [p.id for p in buscar_productos(nombre_producto(2))][:1] == [2]
+
+def test_sembrar_sin_productos_visibles(app_context):
+    with pytest.raises(ValueError):
+        sembrar(usuarios=1, productos=0, pedidos=1)
+
+def test_comando_seed(app, app_context):
+    resultado = app.test_cli_runner().invoke(
+        args=["seed", "--usuarios", "10", "--productos", "20", "--pedidos", "30", "--escala", "0.5", "--semilla", "3"]
+    )
+    assert resultado.exit_code == 0, resultado.output
+    assert "Generados 5 usuarios" in resultado.output
+    assert (Usuario.query.count(), Producto.query.count(), Pedido.query.count()) == (5, 10, 15)
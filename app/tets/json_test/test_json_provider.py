@@ -0,0 +1,72 @@
+import uuid
+import pytest
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from app.app import create_app
+from app.json_provider import OrjsonProvider
+from app.tets.conftest import TestingConfig
+
+pytest.importorskip("orjson")
+
+@dataclass
+class Item:
+    nombre: str
+    id: int
+
+DATOS = {
+    "pedidos": [{"fecha": datetime(2024, 5, 1, 13, 30), "total": Decimal("1234.50"), "id": 7}],
+    "items": [Item("mate", 2)],
+    "ids": {3: "tres", 1: "uno"},
+    "codigo": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "vacio": None,
+    "precio": 10.5,
+}
+
+def test_salida_igual_al_proveedor_de_flask(app):
+    """Test que orjson produce exactamente los mismos bytes que el proveedor estándar (texto ASCII)"""
+    estandar = DefaultJSONProvider(app)
+    rapido = OrjsonProvider(app)
+    assert rapido.loads(rapido.dumps(DATOS)) == estandar.loads(estandar.dumps(DATOS))
+
+    with app.app_context():
+        assert rapido.response(DATOS).get_data() == estandar.response(DATOS).get_data()
+
+def test_formatos_de_tipos_especiales(app):
+    """Test del formato de fechas, Decimal y dataclasses"""
+    salida = OrjsonProvider(app).loads(OrjsonProvider(app).dumps(DATOS))
+    assert salida["pedidos"][0]["fecha"] == "Wed, 01 May 2024 13:30:00 GMT"
+    assert salida["pedidos"][0]["total"] == "1234.50"
+    assert salida["items"] == [{"id": 2, "nombre": "mate"}]
+    assert salida["ids"] == {"1": "uno", "3": "tres"}
+
+def test_argumentos_de_json_dumps_se_delegan(app):
+    """Test que los argumentos propios de json.dumps usan el proveedor estándar"""
+    assert OrjsonProvider(app).dumps({"b": 1, "a": 2}, indent=2) == '{\n  "a": 2,\n  "b": 1\n}'
+
+def test_tipo_no_serializable(app):
+    """Test que un tipo desconocido sigue lanzando TypeError"""
+    with pytest.raises(TypeError):
+        OrjsonProvider(app).dumps({"x": object()})
+
+def test_init_json_segun_configuracion():
+    """Test que JSON_PROVIDER elige el proveedor"""
+    assert isinstance(create_app(TestingConfig).json, OrjsonProvider)
+
+    class Config(TestingConfig):
+        JSON_PROVIDER = "default"
+    assert not isinstance(create_app(Config).json, OrjsonProvider)
+
+def test_loads_invalido_lanza_value_error(app):
+    """Test que un JSON inválido lanza ValueError (request.get_json lo convierte en 400)"""
+    with pytest.raises(ValueError):
+        OrjsonProvider(app).loads("{no es json")
+
+def test_jsonify_usa_orjson(client, sample_product):
+    """Test que las respuestas de los blueprints salen por el proveedor orjson"""
+    assert isinstance(client.application.json, OrjsonProvider)
+    response = client.get("/productos")
+    assert response.status_code == 200
+    assert response.data.endswith(b"\n")
+    assert response.get_json()[0]["nombre"] == sample_product.nombre
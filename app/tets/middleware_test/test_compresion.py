@@ -0,0 +1,94 @@
+import gzip
+import json
+import pytest
+from flask import Response, jsonify, stream_with_context
+from app.app import create_app
+from app.tets.conftest import TestingConfig
+
+@pytest.fixture
+def app_compresion():
+    app = create_app(TestingConfig)
+
+    @app.route("/_test/grande")
+    def grande():
+        respuesta = jsonify([{"id": i, "nombre": f"producto {i}"} for i in range(500)])
+        respuesta.set_etag("abc")
+        return respuesta
+
+    @app.route("/_test/chico")
+    def chico():
+        return jsonify({"ok": True})
+
+    @app.route("/_test/stream")
+    def stream():
+        def generar():
+            for i in range(1000):
+                yield json.dumps({"id": i}) + "\n"
+        return Response(stream_with_context(generar()), mimetype="application/x-ndjson")
+
+    @app.route("/_test/no-transform")
+    def no_transform():
+        respuesta = jsonify([{"id": i} for i in range(500)])
+        respuesta.cache_control.no_transform = True
+        return respuesta
+
+    return app
+
+def test_comprime_json_grande_con_gzip(app_compresion):
+    """Test que un JSON grande se comprime con gzip si el cliente lo acepta"""
+    client = app_compresion.test_client()
+    response = client.get("/_test/grande", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    cuerpo = json.loads(gzip.decompress(response.data))
+    assert len(cuerpo) == 500
+
+def test_etag_pasa_a_debil(app_compresion):
+    """Test que el ETag de una respuesta comprimida es débil"""
+    client = app_compresion.test_client()
+    response = client.get("/_test/grande", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["ETag"] == 'W/"abc"'
+
+def test_sin_accept_encoding_no_comprime(app_compresion):
+    """Test que sin Accept-Encoding la respuesta viaja sin comprimir"""
+    client = app_compresion.test_client()
+    response = client.get("/_test/grande", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert len(response.get_json()) == 500
+
+def test_respuesta_chica_no_se_comprime(app_compresion):
+    """Test que las respuestas por debajo del umbral no se comprimen"""
+    client = app_compresion.test_client()
+    response = client.get("/_test/chico", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == {"ok": True}
+
+def test_no_transform_se_respeta(app_compresion):
+    """Test que Cache-Control: no-transform evita la compresión"""
+    client = app_compresion.test_client()
+    response = client.get("/_test/no-transform", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+def test_stream_se_comprime_por_trozos(app_compresion):
+    """Test que una respuesta en streaming se comprime sin Content-Length"""
+    client = app_compresion.test_client()
+    response = client.get("/_test/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    lineas = gzip.decompress(response.data).decode().splitlines()
+    assert len(lineas) == 1000
+    assert json.loads(lineas[-1]) == {"id": 999}
+
+def test_compresion_deshabilitada():
+    """Test que COMPRESION_HABILITADA=False no registra el hook"""
+    class Config(TestingConfig):
+        COMPRESION_HABILITADA = False
+    app = create_app(Config)
+
+    @app.route("/_test/grande")
+    def grande():
+        return jsonify([{"id": i} for i in range(500)])
+
+    response = app.test_client().get("/_test/grande", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,67 @@
+import json
+import logging
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+from app.middleware.consultas_lentas import init_consultas_lentas
+from app.service.pedidos_service import obtener
+
+@pytest.fixture
+def lentas(app, caplog):
+    """Habilita el registro con el umbral indicado y retorna una función que lee las líneas registradas."""
+    def configurar(umbral_ms):
+        app.config.update(SQL_LENTAS_HABILITADO=True, SQL_LENTAS_UMBRAL_MS=umbral_ms)
+        init_consultas_lentas(app)
+        caplog.clear()
+
+    def registros():
+        return [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.consultas_lentas"]
+
+    caplog.set_level(logging.WARNING, logger="app.consultas_lentas")
+    yield configurar, registros
+    app.config.update(SQL_LENTAS_HABILITADO=False)
+    init_consultas_lentas(app)
+
+def test_registra_funcion_forma_y_plan(lentas, varios_pedidos):
+    configurar, registros = lentas
+    configurar(0)
+    obtener(0, varios_pedidos, "false")
+
+    pedidos = next(r for r in registros() if "FROM pedidos" in r["sql"])
+    assert pedidos["funcion"] == "pedidos_service.obtener"
+    assert pedidos["endpoint"] is None
+    assert pedidos["parametros"] == ["int"]  # el id de usuario, sin su valor
+    assert any("ix_pedidos" in str(fila) for fila in pedidos["explain"])
+
+def test_plan_una_vez_por_texto(lentas, varios_pedidos):
+    configurar, registros = lentas
+    configurar(0)
+    obtener(0, varios_pedidos, None)
+    obtener(0, varios_pedidos, None)
+
+    pedidos = [r for r in registros() if "FROM pedidos" in r["sql"]]
+    assert len(pedidos) == 2
+    assert pedidos[0]["sql_hash"] == pedidos[1]["sql_hash"]
+    assert pedidos[0]["explain"] is not None
+    assert pedidos[1]["explain"] is None
+
+def test_endpoint_de_la_peticion(lentas, client, sample_product):
+    configurar, registros = lentas
+    configurar(0)
+    client.get("/productos")
+    assert any(r["endpoint"] == "productos.get" for r in registros())
+
+def test_bajo_el_umbral_no_registra(lentas, varios_pedidos):
+    configurar, registros = lentas
+    configurar(60_000)
+    obtener(0, varios_pedidos, None)
+    assert registros() == []
+
+def test_sentencia_fallida_no_desbalancea(lentas, app_context):
+    configurar, registros = lentas
+    configurar(0)
+    with pytest.raises(Exception):
+        db.session.execute(text("SELECT * FROM tabla_inexistente"))
+    db.session.rollback()
+    db.session.execute(text("SELECT 1"))
+    assert [r["sql"] for r in registros()] == ["SELECT 1"]
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+import pytest
+from prometheus_client import REGISTRY
+from app.app import create_app
+from app.middleware.metricas import medir_cloudinary
+from app.security.revocation_cache import revocation_cache
+from app.tets.conftest import TestingConfig
+
+def _valor(nombre, **etiquetas):
+    return REGISTRY.get_sample_value(nombre, etiquetas) or 0
+
+def test_cuenta_peticiones_por_endpoint(client):
+    etiquetas = {"metodo": "GET", "blueprint": "productos", "endpoint": "productos.get"}
+    antes = _valor("mj_http_requests_total", status="200", **etiquetas)
+    antes_latencia = _valor("mj_http_request_duration_seconds_count", **etiquetas)
+
+    assert client.get("/productos").status_code == 200
+    assert _valor("mj_http_requests_total", status="200", **etiquetas) == antes + 1
+    assert _valor("mj_http_request_duration_seconds_count", **etiquetas) == antes_latencia + 1
+
+def test_ruta_inexistente_sin_endpoint(client):
+    antes = _valor("mj_http_requests_total", metodo="GET", blueprint="", endpoint="ninguno", status="404")
+    client.get("/no-existe")
+    assert _valor("mj_http_requests_total", metodo="GET", blueprint="", endpoint="ninguno", status="404") == antes + 1
+
+def test_get_metrics_formato_prometheus(client):
+    client.get("/productos")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    cuerpo = response.get_data(as_text=True)
+    assert "# TYPE mj_http_request_duration_seconds histogram" in cuerpo
+    assert 'endpoint="productos.get"' in cuerpo
+    # el propio scrape no se mide
+    assert 'endpoint="metricas.get_metrics"' not in cuerpo
+
+def test_get_metrics_con_token():
+    app = create_app(type("Config", (TestingConfig,), {"METRICAS_TOKEN": "secreto"}))
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer secreto"}).status_code == 200
+
+def test_get_metrics_en_produccion_exige_token():
+    app = create_app(type("Config", (TestingConfig,), {"ENV": "production"}))
+    assert app.test_client().get("/metrics").status_code == 404
+
+    app = create_app(type("Config", (TestingConfig,), {"ENV": "production", "METRICAS_TOKEN": "secreto"}))
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer secreto"}).status_code == 200
+
+def test_medir_cloudinary_cuenta_errores():
+    antes = _valor("mj_cloudinary_errores_total", operacion="upload")
+    antes_llamadas = _valor("mj_cloudinary_duracion_seconds_count", operacion="upload")
+    with pytest.raises(RuntimeError):
+        with medir_cloudinary("upload"):
+            raise RuntimeError("sin red")
+    assert _valor("mj_cloudinary_errores_total", operacion="upload") == antes + 1
+    assert _valor("mj_cloudinary_duracion_seconds_count", operacion="upload") == antes_llamadas + 1
+
+def test_blocklist_cuenta_origen(app_context):
+    antes = _valor("mj_jwt_blocklist_consultas_total", origen="memoria")
+    assert revocation_cache.es_revocado("jti-desconocido") is False
+    assert _valor("mj_jwt_blocklist_consultas_total", origen="memoria") == antes + 1
+
+RAIZ = Path(__file__).resolve().parents[3]
+
+def test_agrega_varios_procesos(tmp_path):
+    entorno = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = textwrap.dedent("""
+        from app.middleware.metricas import CLOUDINARY_ERRORES
+        CLOUDINARY_ERRORES.labels("destroy").inc(2)
+    """)
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=entorno, cwd=RAIZ, check=True)
+
+    scrape = textwrap.dedent("""
+        from app.middleware.metricas import exportar
+        print(exportar()[0].decode())
+    """)
+    salida = subprocess.run([sys.executable, "-c", scrape], env=entorno, cwd=RAIZ, check=True,
+                            capture_output=True, text=True).stdout
+    assert 'mj_cloudinary_errores_total{operacion="destroy"} 4.0' in salida
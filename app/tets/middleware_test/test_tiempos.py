@@ -0,0 +1,69 @@
+import json
+import logging
+import re
+from flask import jsonify
+from sqlalchemy import text
+from app.app import create_app
+from app.extensions import db
+from app.middleware.tiempos import medir_externo
+from app.tets.conftest import TestingConfig
+
+def _crear_app(**config):
+    app = create_app(type("Config", (TestingConfig,), config))
+
+    @app.route("/_test/consultas")
+    def consultas():
+        for _ in range(3):
+            db.session.execute(text("SELECT 1"))
+        with medir_externo("cloudinary"):
+            pass
+        return jsonify({"ok": True})
+
+    @app.route("/_test/falla-sql")
+    def falla_sql():
+        try:
+            db.session.execute(text("SELECT * FROM tabla_inexistente"))
+        except Exception:
+            db.session.rollback()
+        db.session.execute(text("SELECT 1"))
+        return jsonify({"ok": True})
+
+    return app
+
+def _metricas(response):
+    return dict(re.findall(r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"]))
+
+def test_server_timing_cuenta_sql_y_externos():
+    response = _crear_app().test_client().get("/_test/consultas")
+    metricas = _metricas(response)
+    assert set(metricas) == {"total", "db", "cloudinary"}
+    assert 'desc="3 consultas"' in response.headers["Server-Timing"]
+    assert float(metricas["total"]) >= float(metricas["db"])
+
+def test_server_timing_sentencia_fallida_no_desbalancea():
+    client = _crear_app().test_client()
+    response = client.get("/_test/falla-sql")
+    assert 'desc="1 consultas"' in response.headers["Server-Timing"]
+    assert 'desc="3 consultas"' in client.get("/_test/consultas").headers["Server-Timing"]
+
+def test_muestreo_cero_no_mide():
+    response = _crear_app(SERVER_TIMING_MUESTREO=0).test_client().get("/_test/consultas")
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+def test_deshabilitado():
+    response = _crear_app(SERVER_TIMING_HABILITADO=False).test_client().get("/_test/consultas")
+    assert "Server-Timing" not in response.headers
+
+def test_linea_de_log_estructurada(caplog):
+    with caplog.at_level(logging.INFO, logger="app.tiempos"):
+        _crear_app().test_client().get("/_test/consultas")
+    registro = json.loads(caplog.records[-1].getMessage())
+    assert registro["ruta"] == "/_test/consultas"
+    assert registro["status"] == 200
+    assert registro["sql"] == 3
+    assert "cloudinary" in registro["externos_ms"]
+
+def test_medir_externo_fuera_de_peticion():
+    with medir_externo("cloudinary"):
+        pass
@@ -1,7 +1,9 @@
 import pytest
 from app.model.pedidos_model import Pedido
+from app.model.productos_model import Producto
 from app.extensions import db
 from app.service.pedidos_service import crear, editar, eliminar, obtener
+from app.service.productos_service import StockInsuficienteError
 
 # ------------------------
 # Tests obtener()
@@ -27,6 +29,28 @@ def test_obtener_by_invalido(app_context):
     with pytest.raises(ValueError, match="Error en el parámetro 'by'"):
         obtener(3, 1, None)
 
+def test_obtener_por_usuario_no_mezcla_ids_parecidos(app_context, sample_user, sample_pedido):
+    from app.model.usuarios_model import Usuario
+    # con LIKE '%1%' el usuario 1 traía también los pedidos del usuario 11
+    otro = Usuario(id=int(f"{sample_user.id}{sample_user.id}"), nombre="otro", email="otro@test.com",
+                   telefono="+5491123456780", contrasenia="x", activo=True, rol="cliente")
+    db.session.add(otro)
+    db.session.add(Pedido(id_usuario=otro.id, total=0))
+    db.session.commit()
+
+    res = obtener(0, sample_user.id, None)
+    assert [p["id_usuario"] for p in res] == [sample_user.id]
+
+def test_obtener_filtra_cerrado_en_sql(app_context, sample_pedido, contar_consultas):
+    with pytest.raises(ValueError, match="filtro 'cerrado'"):
+        obtener(0, sample_pedido.id_usuario, "true")
+    assert "cerrado" in contar_consultas[-1].split("WHERE", 1)[1]
+    assert len(obtener(0, sample_pedido.id_usuario, "false")) == 1
+
+def test_obtener_cerrado_invalido(app_context, sample_pedido):
+    with pytest.raises(ValueError, match="'cerrado'"):
+        obtener(0, sample_pedido.id_usuario, "quizas")
+
 # ------------------------
 # Tests crear()
 # ------------------------
@@ -100,4 +124,78 @@ def test_eliminar_ok(app_context, sample_pedido):
 
 def test_eliminar_no_existe(app_context):
     with pytest.raises(ValueError, match="Pedido no encontrado"):
-        eliminar(999)
\ No newline at end of file
+        eliminar(999)
+
+# ------------------------
+# Tests consultas N+1
+# ------------------------
+
+def test_obtener_por_usuario_consultas_constantes(app_context, varios_pedidos, contar_consultas):
+    res = obtener(0, varios_pedidos, None)
+    assert len(res) == 5
+    assert all(len(p["detalles"]) == 2 for p in res)
+    # pedidos + detalles + productos, sin importar la cantidad de pedidos
+    assert len(contar_consultas) == 3
+
+# ------------------------
+# Tests reserva de stock en crear()
+# ------------------------
+
+def test_crear_descuenta_y_oculta_sin_stock(app_context, sample_user, sample_product):
+    crear({"id_usuario": sample_user.id, "productos": [{"producto_id": sample_product.id, "cantidad": 10}]})
+
+    producto = db.session.get(Producto, sample_product.id)
+    assert producto.stock == 0
+    assert producto.mostrar is False
+
+def test_crear_agrupa_lineas_del_mismo_producto(app_context, sample_user, sample_product):
+    crear({"id_usuario": sample_user.id, "productos": [
+        {"producto_id": sample_product.id, "cantidad": 4},
+        {"producto_id": sample_product.id, "cantidad": 5},
+    ]})
+    assert db.session.get(Producto, sample_product.id).stock == 1
+
+def test_crear_stock_insuficiente_no_descuenta_nada(app_context, sample_user, sample_product):
+    otro = Producto(nombre="Otro", precio=5, stock=1, categoria="C",
+                    descripcion="d", imagen_url="img")
+    db.session.add(otro)
+    db.session.commit()
+    otro_id, producto_id = otro.id, sample_product.id
+
+    with pytest.raises(StockInsuficienteError) as error:
+        crear({"id_usuario": sample_user.id, "productos": [
+            {"producto_id": producto_id, "cantidad": 2},
+            {"producto_id": otro_id, "cantidad": 3},
+        ]})
+
+    assert error.value.faltantes == [
+        {"producto_id": otro_id, "nombre": "Otro", "disponible": 1, "solicitado": 3}
+    ]
+    assert db.session.get(Producto, producto_id).stock == 10
+    assert Pedido.query.count() == 0
+
+def test_crear_cantidad_invalida(app_context, sample_user, sample_product):
+    with pytest.raises(ValueError, match="Cantidad inválida"):
+        crear({"id_usuario": sample_user.id, "productos": [{"producto_id": sample_product.id, "cantidad": -1}]})
+
+def test_crear_acepta_ids_como_texto(app_context, sample_user, sample_product):
+    crear({"id_usuario": sample_user.id, "productos": [
+        {"producto_id": str(sample_product.id), "cantidad": 2},
+        {"producto_id": sample_product.id, "cantidad": "1"},
+    ]})
+
+    pedido = Pedido.query.one()
+    assert [(d.producto_id, d.cantidad) for d in pedido.detalles] == [(sample_product.id, 2), (sample_product.id, 1)]
+    assert pedido.total == pytest.approx(float(sample_product.precio) * 3)
+    assert db.session.get(Producto, sample_product.id).stock == 7
+
+def test_crear_producto_id_no_numerico(app_context, sample_user, sample_product):
+    with pytest.raises(ValueError, match="Producto inválido"):
+        crear({"id_usuario": sample_user.id, "productos": [{"producto_id": "abc", "cantidad": 1}]})
+
+def test_crear_una_sola_sentencia_de_stock(app_context, sample_user, varios_pedidos, contar_consultas):
+    ids = [p.id for p in Producto.query.all()]
+    contar_consultas.clear()
+    crear({"id_usuario": varios_pedidos, "productos": [{"producto_id": i, "cantidad": 1} for i in ids]})
+    updates = [c for c in contar_consultas if c.startswith("UPDATE productos")]
+    assert len(updates) == 1
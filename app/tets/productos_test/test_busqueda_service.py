@@ -0,0 +1,76 @@
+from app.model.busqueda_model import ProductoTrigrama
+from app.model.productos_model import db, Producto
+from app.service.busqueda_service import buscar_productos, reindexar_todo, trigramas
+
+def _producto(nombre, categoria="Varios", descripcion="sin descripcion", mostrar=True):
+    p = Producto(nombre=nombre, precio=1, stock=1, categoria=categoria,
+                 descripcion=descripcion, imagen_url="img", mostrar=mostrar)
+    db.session.add(p)
+    db.session.commit()
+    return p
+
+# ------------------------
+# TEST trigramas()
+# ------------------------
+
+def test_trigramas_normaliza_acentos_y_mayusculas():
+    assert trigramas("Cañón") == {"can", "ano", "non"}
+
+def test_trigramas_por_palabra():
+    assert trigramas("ab cde") == {"cde"}
+
+# ------------------------
+# TEST mantenimiento del índice
+# ------------------------
+
+def test_indexa_al_crear(app_context, sample_product):
+    assert ProductoTrigrama.query.filter_by(producto_id=sample_product.id, trigrama="tes").count() == 1
+
+def test_reindexa_al_editar(app_context, sample_product):
+    sample_product.nombre = "Zapatilla"
+    db.session.commit()
+    assert buscar_productos("zapatilla")[0].id == sample_product.id
+    assert ProductoTrigrama.query.filter_by(producto_id=sample_product.id, trigrama="tes").count() == 0
+
+def test_desindexa_al_eliminar(app_context, sample_product):
+    producto_id = sample_product.id
+    db.session.delete(sample_product)
+    db.session.commit()
+    assert ProductoTrigrama.query.filter_by(producto_id=producto_id).count() == 0
+
+def test_reindexar_todo(app_context, sample_product):
+    ProductoTrigrama.query.delete()
+    db.session.commit()
+    reindexar_todo()
+    assert buscar_productos("test")[0].id == sample_product.id
+
+# ------------------------
+# TEST buscar_productos()
+# ------------------------
+
+def test_busca_en_categoria_y_descripcion(app_context):
+    p1 = _producto("Remera", categoria="Indumentaria")
+    p2 = _producto("Taza", descripcion="ideal para regalar indumentaria")
+    assert [p.id for p in buscar_productos("indumentaria")] == [p1.id, p2.id]
+
+def test_nombre_pesa_mas_que_descripcion(app_context):
+    en_descripcion = _producto("Taza", descripcion="mate de calabaza")
+    en_nombre = _producto("Mate imperial")
+    assert [p.id for p in buscar_productos("mate")] == [en_nombre.id, en_descripcion.id]
+
+def test_tolera_errores_de_tipeo(app_context):
+    p = _producto("Auriculares inalambricos")
+    assert buscar_productos("auriculres")[0].id == p.id
+
+def test_filtra_por_mostrar(app_context):
+    _producto("Lampara oculta", mostrar=False)
+    visible = _producto("Lampara visible")
+    assert [p.id for p in buscar_productos("lampara", mostrar=True)] == [visible.id]
+
+def test_sin_coincidencias(app_context, sample_product):
+    assert buscar_productos("inexistente") == []
+
+def test_texto_corto_busca_por_prefijo(app_context):
+    p = _producto("TV 42 pulgadas")
+    _producto("Mesa TV")
+    assert [x.id for x in buscar_productos("tv")] == [p.id]
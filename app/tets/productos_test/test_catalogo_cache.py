@@ -0,0 +1,151 @@
+from sqlalchemy import event
+from app.model.productos_model import db, Producto
+from app.model.catalogo_model import CatalogoVersion
+from app.service.cache_service import LRUCache, catalogo_cache, obtener_version_catalogo
+from app.service.productos_service import categorias_list, featured, listar, actualizar_stock
+from app.service.admin_service import crear_producto, editar_producto, eliminar_producto
+from app.service.pedidos_service import crear
+
+# ------------------------
+# TEST LRUCache
+# ------------------------
+
+def test_lru_descarta_el_menos_usado():
+    cache = LRUCache(max_items=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+def test_lru_expira_por_ttl(monkeypatch):
+    cache = LRUCache(max_items=2, ttl=10)
+    ahora = [1000.0]
+    monkeypatch.setattr("app.service.cache_service.time.monotonic", lambda: ahora[0])
+    cache.set("a", 1)
+    ahora[0] += 11
+    assert len(cache) == 1
+    cache.get("a")
+    assert len(cache) == 0
+
+# ------------------------
+# TEST lecturas cacheadas
+# ------------------------
+
+def test_listar_usa_cache(app_context, sample_product, contar_consultas):
+    primero = listar()
+    contar_consultas.clear()
+    assert listar() is primero
+    assert contar_consultas == []  # no consulta la DB
+    assert len(catalogo_cache) == 1
+
+def test_categorias_y_destacados_usan_cache(app_context, sample_product):
+    categorias_list()
+    featured()
+    assert len(catalogo_cache) == 2
+
+# ------------------------
+# TEST invalidación por escrituras
+# ------------------------
+
+def test_invalida_al_crear_producto(app_context, sample_product):
+    assert len(listar()) == 1
+    crear_producto({
+        "nombre": "Otro", "precio": 10, "stock": 5, "categoria": "Cat",
+        "descripcion": "d", "imagen_url": "url"
+    })
+    assert len(listar()) == 2
+
+def test_invalida_al_editar_producto(app_context, sample_product):
+    assert featured() == []
+    editar_producto(sample_product.id, {"destacado": True})
+    assert [p["id"] for p in featured()] == [sample_product.id]
+
+def test_invalida_al_eliminar_producto(app_context, sample_product):
+    assert categorias_list() == ["Categoria1"]
+    eliminar_producto(sample_product.id)
+    assert categorias_list() == []
+
+def test_invalida_al_actualizar_stock(app_context, sample_product):
+    assert len(listar()) == 1
+    actualizar_stock(sample_product.id, 0)
+    assert listar() == []
+
+def test_invalida_al_crear_pedido(app_context, sample_user, sample_product):
+    assert listar()[0]["stock"] == 10
+    crear({"id_usuario": sample_user.id, "productos": [{"producto_id": sample_product.id, "cantidad": 3}]})
+    assert listar()[0]["stock"] == 7
+
+def test_invalida_con_borrado_masivo(app_context, sample_product):
+    assert len(listar()) == 1
+    Producto.query.delete()
+    db.session.commit()
+    assert listar() == []
+
+def test_rollback_no_invalida(app_context, sample_product):
+    listar()
+    producto = db.session.get(Producto, sample_product.id)
+    producto.stock = 1
+    db.session.flush()
+    db.session.rollback()
+    assert len(catalogo_cache) == 1
+
+# ------------------------
+# TEST versión del catálogo
+# ------------------------
+
+def test_version_se_incrementa_con_escrituras(app_context, sample_product):
+    version = obtener_version_catalogo()
+    editar_producto(sample_product.id, {"stock": 3})
+    assert obtener_version_catalogo() == version + 1
+
+def test_version_no_cambia_con_rollback(app_context, sample_product):
+    version = obtener_version_catalogo()
+    producto = db.session.get(Producto, sample_product.id)
+    producto.stock = 1
+    db.session.flush()
+    db.session.rollback()
+    assert obtener_version_catalogo() == version
+
+def test_version_se_incrementa_despues_del_commit(app_context, sample_product, contar_consultas):
+    version = obtener_version_catalogo()
+    al_confirmar = []
+
+    def registrar_commit(session):
+        al_confirmar.append(len(contar_consultas))
+
+    event.listen(db.session, "after_commit", registrar_commit)
+    try:
+        producto = db.session.get(Producto, sample_product.id)
+        producto.stock = 1
+        db.session.flush()
+        db.session.query(Producto).filter(Producto.id == sample_product.id).update({"precio": 50})
+        db.session.commit()
+    finally:
+        event.remove(db.session, "after_commit", registrar_commit)
+
+    # la transacción de la escritura no toca 'catalogo_version': se incrementa una sola vez, después del commit
+    incrementos = [i for i, sql in enumerate(contar_consultas) if sql.startswith("UPDATE catalogo_version")]
+    assert len(incrementos) == 1 and incrementos[0] >= al_confirmar[0]
+    assert obtener_version_catalogo() == version + 1
+
+def test_version_tras_savepoint_se_incrementa_con_el_commit_principal(app_context, sample_product):
+    version = obtener_version_catalogo()
+    with db.session.begin_nested():
+        db.session.get(Producto, sample_product.id).stock = 2
+    assert obtener_version_catalogo() == version
+    db.session.commit()
+    assert obtener_version_catalogo() == version + 1
+
+def test_cambio_de_version_externo_vacia_cache(app_context, sample_product):
+    obtener_version_catalogo()  # la última versión vista puede venir de otro test
+    listar()
+    obtener_version_catalogo()
+    assert len(catalogo_cache) == 1
+    # simula la escritura de otro worker: solo cambia la versión en la DB
+    db.session.execute(CatalogoVersion.__table__.update().values(version=CatalogoVersion.version + 1))
+    db.session.commit()
+    obtener_version_catalogo()
+    assert len(catalogo_cache) == 0
@@ -0,0 +1,57 @@
+from app.service.admin_service import editar_producto
+from app.service.pedidos_service import crear
+
+# ------------------------
+# TEST ETag / If-None-Match
+# ------------------------
+
+def test_get_productos_devuelve_etag(client, sample_product):
+    response = client.get("/productos")
+    assert response.status_code == 200
+    assert response.headers.get("ETag")
+    assert response.headers.get("Cache-Control") == "no-cache"
+
+def test_get_productos_304_si_no_cambio(client, sample_product):
+    etag = client.get("/productos").headers["ETag"]
+
+    response = client.get("/productos", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+def test_get_productos_304_con_etag_debil(client, sample_product):
+    # una respuesta comprimida lleva el ETag débil; el cliente lo devuelve tal cual
+    etag = client.get("/productos").headers["ETag"]
+
+    response = client.get("/productos", headers={"If-None-Match": "W/" + etag})
+    assert response.status_code == 304
+
+def test_etag_distinto_por_ruta(client, sample_product):
+    etag_listado = client.get("/productos").headers["ETag"]
+    etag_destacados = client.get("/productos/destacado").headers["ETag"]
+    assert etag_listado != etag_destacados
+
+    response = client.get("/productos/destacado", headers={"If-None-Match": etag_listado})
+    assert response.status_code == 200
+
+def test_etag_cambia_al_editar_producto(client, sample_product):
+    etag = client.get("/productos").headers["ETag"]
+    editar_producto(sample_product.id, {"precio": 50})
+
+    response = client.get("/productos", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()[0]["precio"] == 50
+
+def test_etag_cambia_al_crear_pedido(client, sample_user, sample_product):
+    etag = client.get(f"/productos/{sample_product.id}").headers["ETag"]
+    crear({"id_usuario": sample_user.id, "productos": [{"producto_id": sample_product.id, "cantidad": 1}]})
+
+    response = client.get(f"/productos/{sample_product.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()[0]["stock"] == 9
+
+def test_error_no_lleva_etag(client):
+    response = client.get("/productos/999")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
@@ -97,4 +97,74 @@ def test_featured_ok(app_context):
     result = featured()
     # Solo retorna los que tienen mostrar=True
     assert len(result) == 1
-    assert result[0]["nombre"] == "A"
\ No newline at end of file
+    assert result[0]["nombre"] == "A"
+
+# ------------------------
+# TEST listar() paginado
+# ------------------------
+
+def _crear_productos(n):
+    db.session.add_all([
+        Producto(nombre=f"P{i}", precio=1, stock=1, categoria="X",
+                 descripcion="d", imagen_url="img", mostrar=True)
+        for i in range(n)
+    ])
+    db.session.commit()
+
+def test_listar_paginado_recorre_todo(app_context):
+    _crear_productos(5)
+    pagina = listar("2", None)
+    ids = [p["id"] for p in pagina["items"]]
+    while pagina["next_cursor"]:
+        pagina = listar("2", pagina["next_cursor"])
+        ids += [p["id"] for p in pagina["items"]]
+    assert ids == sorted(ids)
+    assert len(ids) == 5
+
+def test_listar_paginado_ultima_pagina_sin_cursor(app_context):
+    _crear_productos(2)
+    pagina = listar("2", None)
+    assert len(pagina["items"]) == 2
+    assert pagina["next_cursor"] is None
+
+def test_listar_paginado_parametros_invalidos(app_context):
+    with pytest.raises(ValueError, match="Error en el parámetro 'limit'"):
+        listar("0", None)
+    with pytest.raises(ValueError, match="Error en el parámetro 'cursor'"):
+        listar("2", "no-es-un-cursor!")
+
+# ------------------------
+# TEST campos parciales (fields)
+# ------------------------
+
+def test_listar_fields_devuelve_solo_esos_campos(app_context, sample_product):
+    resultado = listar(None, None, "nombre,precio")
+    assert resultado == [{"id": sample_product.id, "nombre": "TestProducto", "precio": 100.0}]
+
+def test_listar_fields_no_consulta_columnas_no_pedidas(contar_consultas, sample_product):
+    db.session.expunge_all()
+    contar_consultas.clear()
+    listar(None, None, "nombre,precio,imagen_url,stock")
+    select = [c for c in contar_consultas if c.lstrip().upper().startswith("SELECT") and "productos" in c]
+    assert len(select) == 1
+    assert "descripcion" not in select[0]
+
+def test_listar_fields_paginado(app_context):
+    _crear_productos(3)
+    pagina = listar("2", None, "nombre")
+    assert [set(p) for p in pagina["items"]] == [{"id", "nombre"}] * 2
+    assert pagina["next_cursor"]
+
+def test_obtener_fields(app_context, sample_product):
+    assert obtener(1, sample_product.id, "stock") == [{"id": sample_product.id, "stock": 10}]
+    assert set(obtener(2, "categoria1", "nombre,categoria")[0]) == {"id", "nombre", "categoria"}
+
+    sample_product.destacado = True
+    db.session.commit()
+    assert featured("nombre") == [{"id": sample_product.id, "nombre": "TestProducto"}]
+
+def test_fields_invalidos(app_context, sample_product):
+    with pytest.raises(ValueError, match="campos desconocidos contrasenia"):
+        listar(None, None, "nombre,contrasenia")
+    with pytest.raises(ValueError, match="al menos un campo"):
+        listar(None, None, " , ")
@@ -1,3 +1,10 @@
+import gzip
+import os
+import pytest
+from io import BytesIO
+from PIL import Image
+from app.service import imagenes_service
+
 def test_serve_image_existente(client):
     """Test servir una imagen - solo verificamos que la ruta existe"""
     response = client.get('/uploads/productos/test.jpg')
@@ -24,4 +31,177 @@ def test_serve_diferentes_formatos(client):
 def test_serve_ruta_con_subdirectorios(client):
     """Test que maneja rutas con path traversal"""
     response = client.get('/uploads/../../../etc/passwd')
-    assert response.status_code != 200
\ No newline at end of file
+    assert response.status_code != 200
+
+# Variantes redimensionadas
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    carpeta = tmp_path / "productos"
+    carpeta.mkdir()
+    Image.new("RGB", (1000, 500), "red").save(carpeta / "foto.jpg", "JPEG")
+    monkeypatch.setattr("app.controller.static_controller.UPLOAD_BASE", str(tmp_path))
+    return tmp_path
+
+def test_variante_redimensiona_y_cachea(client, uploads):
+    """Test que ?w=&fmt= genera la variante una vez y la guarda en disco"""
+    response = client.get('/uploads/productos/foto.jpg?w=300&fmt=webp')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/webp'
+    imagen = Image.open(BytesIO(response.data))
+    assert imagen.size == (320, 160)  # se redondea al siguiente ancho permitido
+    response.close()
+
+    variante = uploads / "productos" / ".variantes" / "foto.jpg_w320.webp"
+    assert variante.exists()
+    generada = variante.stat().st_mtime_ns
+
+    response = client.get('/uploads/productos/foto.jpg?w=320&fmt=webp')
+    assert response.status_code == 200
+    response.close()
+    assert variante.stat().st_mtime_ns == generada
+
+def test_variante_no_agranda(client, uploads):
+    """Test que no se generan imágenes más grandes que el original"""
+    response = client.get('/uploads/productos/foto.jpg?w=1920')
+    assert response.status_code == 200
+    assert Image.open(BytesIO(response.data)).size == (1000, 500)
+    response.close()
+
+def test_variante_parametros_invalidos(client, uploads):
+    """Test que 'w' y 'fmt' inválidos retornan 400"""
+    assert client.get('/uploads/productos/foto.jpg?w=abc').status_code == 400
+    assert client.get('/uploads/productos/foto.jpg?w=-5').status_code == 400
+    assert client.get('/uploads/productos/foto.jpg?fmt=gif').status_code == 400
+
+def test_variante_original_inexistente(client, uploads):
+    """Test que pedir una variante de un archivo inexistente retorna 404"""
+    assert client.get('/uploads/productos/nada.jpg?w=320').status_code == 404
+
+def test_variante_desalojo_lru(client, uploads, monkeypatch):
+    """Test que al superar el tamaño máximo se eliminan las variantes menos usadas"""
+    monkeypatch.setitem(imagenes_service._config, "max_bytes", 1)
+    client.get('/uploads/productos/foto.jpg?w=160').close()
+    response = client.get('/uploads/productos/foto.jpg?w=320')
+    assert response.status_code == 200
+    response.close()
+
+    variantes = os.listdir(uploads / "productos" / ".variantes")
+    assert "foto.jpg_w160.jpg" not in variantes
+    assert "foto.jpg_w320.jpg" in variantes
+
+def test_variante_no_recorre_uploads_bajo_el_limite(client, uploads, monkeypatch):
+    """Test que el total de la caché se lleva sumando: sólo se recorre el árbol en el recuento inicial"""
+    recorridos = []
+    walk = os.walk
+    monkeypatch.setattr(imagenes_service.os, "walk", lambda *args, **kwargs: recorridos.append(args) or walk(*args, **kwargs))
+    for ancho in (160, 320, 480):
+        response = client.get(f'/uploads/productos/foto.jpg?w={ancho}')
+        assert response.status_code == 200
+        response.close()
+    assert len(recorridos) == 1
+
+def test_variante_originales_con_igual_nombre(client, uploads):
+    """Test que 'foto.jpg' y 'foto.png' generan variantes distintas"""
+    Image.new("RGB", (1000, 500), "blue").save(uploads / "productos" / "foto.png", "PNG")
+
+    colores = []
+    for archivo in ("foto.jpg", "foto.png"):
+        response = client.get(f'/uploads/productos/{archivo}?w=320&fmt=webp')
+        assert response.status_code == 200
+        colores.append(Image.open(BytesIO(response.data)).convert("RGB").getpixel((10, 10)))
+        response.close()
+
+    assert colores[0][0] > 200 and colores[1][2] > 200  # rojo y azul, no la misma variante
+    assert sorted(os.listdir(uploads / "productos" / ".variantes")) == ["foto.jpg_w320.webp", "foto.png_w320.webp"]
+
+# Caché HTTP, rangos, precomprimidos y descarga delegada
+
+@pytest.fixture
+def archivos(tmp_path, monkeypatch):
+    carpeta = tmp_path / "productos"
+    carpeta.mkdir()
+    (carpeta / "datos.txt").write_bytes(b"0123456789" * 100)
+    (carpeta / "foto_3f2a9c0d1e4b5a6f.jpg").write_bytes(b"contenido con hash")
+    monkeypatch.setattr("app.controller.static_controller.UPLOAD_BASE", str(tmp_path))
+    return carpeta
+
+def test_cache_control_inmutable_para_nombres_con_hash(client, archivos):
+    """Test que los archivos con hash en el nombre se marcan como inmutables"""
+    response = client.get('/uploads/productos/foto_3f2a9c0d1e4b5a6f.jpg')
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 31536000
+    response.close()
+
+    response = client.get('/uploads/productos/datos.txt')
+    assert not response.cache_control.immutable
+    assert response.cache_control.max_age == 3600
+    assert response.headers.get('ETag')
+    response.close()
+
+def test_range_retorna_206(client, archivos):
+    """Test que una petición con Range devuelve sólo ese tramo"""
+    response = client.get('/uploads/productos/datos.txt', headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206
+    assert response.data == b"0123456789"
+    assert response.headers['Content-Range'] == 'bytes 10-19/1000'
+    response.close()
+
+    response = client.get('/uploads/productos/datos.txt', headers={'Range': 'bytes=5000-'})
+    assert response.status_code == 416
+    response.close()
+
+def test_condicional_retorna_304(client, archivos):
+    """Test que If-None-Match con el ETag vigente devuelve 304"""
+    response = client.get('/uploads/productos/datos.txt')
+    etag = response.headers['ETag']
+    response.close()
+    response = client.get('/uploads/productos/datos.txt', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+def test_precomprimido_segun_accept_encoding(client, archivos):
+    """Test que se sirve el hermano .gz sólo si el cliente acepta gzip"""
+    original = (archivos / "datos.txt").read_bytes()
+    (archivos / "datos.txt.gz").write_bytes(gzip.compress(original))
+
+    response = client.get('/uploads/productos/datos.txt', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/plain'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == original
+    response.close()
+
+    response = client.get('/uploads/productos/datos.txt', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == original
+    response.close()
+
+def test_precomprimido_desactualizado_se_ignora(client, archivos):
+    """Test que un .gz más viejo que el original no se usa"""
+    (archivos / "datos.txt.gz").write_bytes(gzip.compress(b"viejo"))
+    os.utime(archivos / "datos.txt.gz", (0, 0))
+
+    response = client.get('/uploads/productos/datos.txt', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    response.close()
+
+def test_modo_x_accel(app, client, archivos):
+    """Test que en modo x-accel se delega la descarga a nginx sin cuerpo"""
+    app.config['STATIC_SENDFILE'] = 'x-accel'
+    try:
+        response = client.get('/uploads/productos/datos.txt')
+    finally:
+        app.config['STATIC_SENDFILE'] = ''
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == '/_uploads/productos/datos.txt'
+    assert response.data == b''
+
+def test_modo_x_sendfile(app, client, archivos):
+    """Test que con USE_X_SENDFILE se responde sólo con la cabecera X-Sendfile"""
+    app.config['USE_X_SENDFILE'] = True
+    try:
+        response = client.get('/uploads/productos/datos.txt')
+    finally:
+        app.config['USE_X_SENDFILE'] = False
+    assert response.headers['X-Sendfile'] == str(archivos / "datos.txt")
+    assert response.data == b''
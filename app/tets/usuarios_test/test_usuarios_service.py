@@ -1,6 +1,8 @@
 import pytest
+from datetime import datetime, timedelta, timezone
+from app.model.token_blacklist import TokenBlacklist
 from app.model.usuarios_model import db, Usuario
-from app.service.usuarios_service import obtener, crear, check_password
+from app.service.usuarios_service import obtener, crear, check_password, logout_token, purgar_tokens_expirados
 
 # ------------------------
 # TEST obtener()
@@ -95,4 +97,38 @@ def test_check_password_usuario_inactivo(app_context, sample_user):
     db.session.commit()
 
     with pytest.raises(ValueError, match="Usuario no encontrado"):
-        check_password("mike@test.com", "1234")
\ No newline at end of file
+        check_password("mike@test.com", "1234")
+
+# ------------------------
+# TEST logout_token() / purgar_tokens_expirados()
+# ------------------------
+
+def test_logout_token_guarda_vencimiento(app_context):
+    exp = int((datetime.now(timezone.utc) + timedelta(hours=1)).timestamp())
+    logout_token("jti-1", exp)
+    fila = TokenBlacklist.query.filter_by(jti="jti-1").first()
+    assert fila.expires_at.replace(tzinfo=timezone.utc).timestamp() == exp
+
+def test_logout_token_idempotente(app_context, contar_consultas):
+    logout_token("jti-2")
+    logout_token("jti-2")
+    assert not any(c.startswith("SELECT") for c in contar_consultas)
+    assert TokenBlacklist.query.filter_by(jti="jti-2").count() == 1
+
+def test_purgar_tokens_expirados(app_context):
+    ahora = datetime.now(timezone.utc)
+    logout_token("vencido-1", int((ahora - timedelta(minutes=1)).timestamp()))
+    logout_token("vencido-2", int((ahora - timedelta(days=1)).timestamp()))
+    logout_token("vigente", int((ahora + timedelta(hours=1)).timestamp()))
+    db.session.add(TokenBlacklist(jti="viejo-sin-exp", created_at=ahora - timedelta(days=30)))
+    db.session.add(TokenBlacklist(jti="nuevo-sin-exp"))
+    db.session.commit()
+
+    assert purgar_tokens_expirados(lote=1) == 3
+    restantes = {t.jti for t in TokenBlacklist.query.all()}
+    assert restantes == {"vigente", "nuevo-sin-exp"}
+
+def test_comando_purgar_tokens(app, app_context):
+    logout_token("vencido", int((datetime.now(timezone.utc) - timedelta(minutes=1)).timestamp()))
+    resultado = app.test_cli_runner().invoke(args=["purgar-tokens", "--lote", "10"])
+    assert "Tokens vencidos eliminados: 1" in resultado.output
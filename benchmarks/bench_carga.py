@@ -0,0 +1,286 @@
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from urllib.parse import quote, urlsplit
+from sqlalchemy.engine import make_url
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.app import create_app
+from app.extensions import db
+from app.migraciones.motor import migrar
+from app.model.usuarios_model import Usuario
+from app.service.paginacion import codificar_cursor
+from app.service.semillas_service import (
+    CATEGORIAS, CONTRASENIA_POR_DEFECTO, email_usuario, nombre_producto, producto_oculto, sembrar, usuario_inactivo
+)
+"""
+Prueba de carga reproducible de toda la API.
+Crea la app con create_app contra una base local sembrada con semillas_service (el mismo generador que
+'flask seed'; archivo SQLite por defecto, o la URI de SQLAlchemy que se pase con --db, p.ej. un MySQL local), la levanta en un servidor HTTP multihilo y la recorre con --concurrencia
+usuarios virtuales durante --duracion segundos. Con --url no se levanta nada: se apunta a un servidor ya en marcha
+(p.ej. gunicorn con otra clase de worker o de pool) que debe usar la misma base (--db) que se sembró.
+Mezcla de tráfico (pesos relativos, ver ESCENARIOS):
+    - catálogo anónimo: listado paginado, por id, por categoría, destacados y búsqueda por nombre.
+    - login y refresh de token.
+    - POST /pedidos y GET /pedidos/me de clientes autenticados.
+    - listados de administración (productos, usuarios y pedidos paginados).
+Cada usuario virtual inicia sesión al empezar (como cliente o, con probabilidad --admins, como administrador) y
+elige escenarios al azar según los pesos; con --semilla la secuencia es la misma en cada corrida.
+Resultado (JSON por stdout o en --salida): parámetros de la corrida, throughput total y, por escenario, cantidad de
+peticiones, errores (status >= 400 o fallas de red), peticiones por segundo y latencias p50/p95/p99/max en ms.
+Uso:
+    python benchmarks/bench_carga.py [--concurrencia 16] [--duracion 30] [--db sqlite:///carga.db]
+        [--url http://127.0.0.1:8000] [--productos 2000] [--usuarios 200] [--pedidos 5000] [--sin-sembrar]
+"""
+
+ESCENARIOS = {
+    "GET /productos": 20,
+    "GET /productos/<id>": 15,
+    "GET /productos/categoria/<categoria>": 10,
+    "GET /productos/destacado": 8,
+    "GET /productos/<nombre>": 7,
+    "POST /auth/login": 3,
+    "POST /auth/refresh": 3,
+    "POST /pedidos": 10,
+    "GET /pedidos/me": 12,
+    "GET /admin/productos": 4,
+    "GET /admin/usuarios": 4,
+    "GET /admin/pedidos": 4,
+}
+ESCENARIOS_ADMIN = {"GET /admin/productos", "GET /admin/usuarios", "GET /admin/pedidos"}
+
+# Base de datos
+def preparar_base(app, productos, usuarios, pedidos, semilla, lote=10000):
+    """Crea el esquema y lo siembra con semillas_service. Retorna False si la base ya tenía usuarios."""
+    with app.app_context():
+        migrar(db.engine)
+        if db.session.query(Usuario.id).first() is not None:
+            return False
+        # stock inagotable: los POST /pedidos de la corrida no deben empezar a fallar por falta de stock
+        sembrar(usuarios, productos, pedidos, semilla, lote, stock=10 ** 9)
+    return True
+
+def producto_visible(aleatorio, productos):
+    while True:
+        numero = aleatorio.randint(1, productos)
+        if not producto_oculto(numero):
+            return numero
+
+def email_cliente(numero, usuarios):
+    # el usuario 1 es el administrador; los inactivos no pueden iniciar sesión
+    id = 2 + numero % (usuarios - 1)
+    return email_usuario(id - 1 if usuario_inactivo(id) else id)
+
+# Cliente HTTP
+class Cliente:
+    def __init__(self, url):
+        partes = urlsplit(url)
+        self.host, self.port = partes.hostname, partes.port or 80
+        self.conexion = None
+
+    def pedir(self, metodo, ruta, cuerpo=None, token=None):
+        cabeceras = {"Accept-Encoding": "gzip"}
+        if cuerpo is not None:
+            cuerpo = json.dumps(cuerpo)
+            cabeceras["Content-Type"] = "application/json"
+        if token:
+            cabeceras["Authorization"] = f"Bearer {token}"
+        for intento in range(2):
+            if self.conexion is None:
+                self.conexion = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+                respuesta = self.conexion.getresponse()
+                datos = respuesta.read()
+                if respuesta.getheader("Connection", "").lower() == "close":
+                    self.cerrar()
+                return respuesta.status, datos, respuesta.getheader("Content-Encoding")
+            except (http.client.HTTPException, OSError):
+                # conexión keep-alive cerrada por el servidor: se reintenta una vez con una nueva
+                self.cerrar()
+                if intento:
+                    raise
+
+    def cerrar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
+
+class UsuarioVirtual:
+    def __init__(self, url, numero, es_admin, args, aleatorio):
+        self.cliente = Cliente(url)
+        self.email = email_usuario(1) if es_admin else email_cliente(numero, args.usuarios)
+        self.es_admin = es_admin
+        self.args = args
+        self.aleatorio = aleatorio
+        self.token = self.refresh = None
+        escenarios = [e for e in ESCENARIOS if es_admin or e not in ESCENARIOS_ADMIN]
+        self.escenarios = escenarios
+        self.pesos = [ESCENARIOS[e] for e in escenarios]
+
+    def ejecutar(self, escenario):
+        aleatorio, args = self.aleatorio, self.args
+        if escenario == "GET /productos":
+            cursor = codificar_cursor(aleatorio.randint(0, args.productos))
+            return self.cliente.pedir("GET", f"/productos?limit=20&cursor={cursor}")
+        if escenario == "GET /productos/<id>":
+            return self.cliente.pedir("GET", f"/productos/{producto_visible(aleatorio, args.productos)}")
+        if escenario == "GET /productos/categoria/<categoria>":
+            return self.cliente.pedir("GET", f"/productos/categoria/{quote(aleatorio.choice(CATEGORIAS))}")
+        if escenario == "GET /productos/destacado":
+            return self.cliente.pedir("GET", "/productos/destacado")
+        if escenario == "GET /productos/<nombre>":
+            nombre = nombre_producto(producto_visible(aleatorio, args.productos))
+            return self.cliente.pedir("GET", f"/productos/{quote(nombre)}")
+        if escenario == "POST /auth/login":
+            return self.login()
+        if escenario == "POST /auth/refresh":
+            status, datos, codificacion = self.cliente.pedir("POST", "/auth/refresh", token=self.refresh)
+            if status == 200:
+                tokens = json.loads(datos)
+                self.token, self.refresh = tokens["token"], tokens["refresh"]
+            return status, datos, codificacion
+        if escenario == "POST /pedidos":
+            productos = {producto_visible(aleatorio, args.productos) for _ in range(aleatorio.randint(1, 3))}
+            cuerpo = {"productos": [{"producto_id": p, "cantidad": aleatorio.randint(1, 2)} for p in productos]}
+            return self.cliente.pedir("POST", "/pedidos", cuerpo, token=self.token)
+        if escenario == "GET /pedidos/me":
+            return self.cliente.pedir("GET", "/pedidos/me", token=self.token)
+        recurso = escenario.rsplit("/", 1)[1]
+        return self.cliente.pedir("GET", f"/admin/{recurso}?limit=50", token=self.token)
+
+    def login(self):
+        status, datos, codificacion = self.cliente.pedir(
+            "POST", "/auth/login", {"email": self.email, "contrasenia": CONTRASENIA_POR_DEFECTO}
+        )
+        if status == 200:
+            tokens = json.loads(datos)
+            self.token, self.refresh = tokens["token"], tokens["refresh"]
+        return status, datos, codificacion
+
+    def correr(self, hasta, registrar):
+        escenario = "POST /auth/login"
+        while True:
+            inicio = time.perf_counter()
+            try:
+                status = self.ejecutar(escenario)[0]
+            except Exception:
+                status = None  # falla de red o de la respuesta: cuenta como error
+            fin = time.perf_counter()
+            registrar(escenario, status, fin - inicio)
+            if fin >= hasta:
+                break
+            escenario = self.aleatorio.choices(self.escenarios, self.pesos)[0]
+        self.cliente.cerrar()
+
+# Reporte
+def percentil(ordenados, p):
+    if not ordenados:
+        return None
+    indice = max(int(round(p / 100 * len(ordenados))) - 1, 0)
+    return ordenados[min(indice, len(ordenados) - 1)]
+
+def resumir(registros, duracion, parametros):
+    por_escenario = {}
+    for escenario, status, segundos in registros:
+        por_escenario.setdefault(escenario, []).append((status, segundos))
+
+    endpoints = {}
+    for escenario, muestras in sorted(por_escenario.items()):
+        latencias = sorted(s * 1000 for _, s in muestras)
+        endpoints[escenario] = {
+            "peticiones": len(muestras),
+            "errores": sum(1 for status, _ in muestras if status is None or status >= 400),
+            "rps": round(len(muestras) / duracion, 2),
+            **{f"p{p}_ms": round(percentil(latencias, p), 2) for p in (50, 95, 99)},
+            "max_ms": round(latencias[-1], 2),
+        }
+    total = len(registros)
+    return {
+        "parametros": parametros,
+        "duracion_s": round(duracion, 2),
+        "peticiones": total,
+        "errores": sum(e["errores"] for e in endpoints.values()),
+        "throughput_rps": round(total / duracion, 2),
+        "endpoints": endpoints,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API con tráfico mixto")
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--duracion", type=float, default=30)
+    parser.add_argument("--db", default=None, help="URI de SQLAlchemy (por defecto, un archivo SQLite temporal)")
+    parser.add_argument("--url", default=None, help="Servidor ya levantado; si se omite se levanta uno en proceso")
+    parser.add_argument("--productos", type=int, default=2000)
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--pedidos", type=int, default=5000)
+    parser.add_argument("--admins", type=float, default=0.1, help="Fracción de usuarios virtuales administradores")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--sin-sembrar", action="store_true", help="Usar la base tal cual está")
+    parser.add_argument("--salida", default=None, help="Archivo donde guardar el JSON del resultado")
+    args = parser.parse_args()
+
+    uri = args.db or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'mj_api_carga_semillas.db')}"
+    # stdout queda sólo para el JSON del resultado
+    with redirect_stdout(sys.stderr):
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": uri,
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY", "carga-jwt-secret"),
+            "CORS_ORIGINS": ["*"],
+        })
+    if not args.sin_sembrar:
+        sembrado = preparar_base(app, args.productos, args.usuarios, args.pedidos, args.semilla)
+        print("Base sembrada" if sembrado else "La base ya tenía datos: se usa tal cual", file=sys.stderr)
+
+    servidor = None
+    url = args.url
+    if url is None:
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        servidor = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_port}"
+
+    aleatorio = random.Random(args.semilla)
+    usuarios = [
+        UsuarioVirtual(url, i, aleatorio.random() < args.admins, args, random.Random(aleatorio.random()))
+        for i in range(args.concurrencia)
+    ]
+    registros, lock = [], threading.Lock()
+
+    def registrar(escenario, status, segundos):
+        with lock:
+            registros.append((escenario, status, segundos))
+
+    inicio = time.perf_counter()
+    hasta = inicio + args.duracion
+    with ThreadPoolExecutor(max_workers=args.concurrencia) as executor:
+        for futuro in [executor.submit(u.correr, hasta, registrar) for u in usuarios]:
+            futuro.result()
+    duracion = time.perf_counter() - inicio
+
+    if servidor is not None:
+        servidor.shutdown()
+
+    parametros = {k: v for k, v in vars(args).items() if k != "salida"}
+    parametros["db"] = make_url(uri).render_as_string(hide_password=True)
+    resultado = resumir(registros, duracion, parametros)
+    salida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(salida + "\n")
+    print(salida)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+import timeit
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.json_provider import OrjsonProvider, orjson
+from app.model.dto.Productos_dto import ProductoSalidaDTO
+"""
+Benchmark de serialización JSON: proveedor estándar de Flask vs OrjsonProvider.
+Arma un catálogo sintético con la misma forma que devuelven los servicios (ProductoSalidaDTO.__dict__ y
+pedidos con fecha datetime y subtotales Decimal) y mide el tiempo de 'app.json.response(...)', que es lo
+que ejecuta jsonify en cada petición.
+Uso:
+    python benchmarks/bench_json.py [--productos 10000] [--pedidos 2000] [--repeticiones 20]
+"""
+
+def armar_catalogo(cantidad):
+    return [
+        asdict(ProductoSalidaDTO(
+            id=i,
+            nombre=f"Producto {i}",
+            precio=round(100 + i * 0.37, 2),
+            stock=i % 50,
+            categoria=f"Categoria {i % 25}",
+            descripcion="Descripción del producto " * 4,
+            imagen_url=f"https://res.cloudinary.com/demo/image/upload/productos/{i}.jpg",
+            mostrar=True,
+            destacado=i % 10 == 0,
+        ))
+        for i in range(1, cantidad + 1)
+    ]
+
+def armar_pedidos(cantidad):
+    inicio = datetime(2024, 1, 1)
+    return [
+        {
+            "id": i,
+            "id_usuario": i % 300,
+            "total": Decimal("1500.00") * 3,
+            "fecha": inicio + timedelta(minutes=i),
+            "cerrado": i % 2 == 0,
+            "productos": [
+                {"producto_id": j, "nombre": f"Producto {j}", "cantidad": 3, "subtotal": Decimal("1500.00")}
+                for j in range(3)
+            ],
+        }
+        for i in range(1, cantidad + 1)
+    ]
+
+def medir(app, proveedor, datos, repeticiones):
+    with app.app_context():
+        tiempos = timeit.repeat(lambda: proveedor.response(datos), number=1, repeat=repeticiones)
+    return min(tiempos), sum(tiempos) / len(tiempos)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización JSON: Flask vs orjson")
+    parser.add_argument("--productos", type=int, default=10000)
+    parser.add_argument("--pedidos", type=int, default=2000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    if orjson is None:
+        sys.exit("orjson no está instalado: pip install orjson")
+
+    app = Flask(__name__)
+    proveedores = {"flask (json)": DefaultJSONProvider(app), "orjson": OrjsonProvider(app)}
+    casos = {
+        f"catalogo ({args.productos} productos)": armar_catalogo(args.productos),
+        f"pedidos ({args.pedidos}, datetime + Decimal)": armar_pedidos(args.pedidos),
+    }
+
+    for nombre_caso, datos in casos.items():
+        print(nombre_caso)
+        resultados = {}
+        for nombre, proveedor in proveedores.items():
+            minimo, promedio = medir(app, proveedor, datos, args.repeticiones)
+            resultados[nombre] = minimo
+            print(f"  {nombre:<14} min {minimo * 1000:8.2f} ms   prom {promedio * 1000:8.2f} ms")
+        print(f"  mejora: x{resultados['flask (json)'] / resultados['orjson']:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_carga import preparar_base
+from app.app import create_app
+from app.extensions import db
+from app.service import admin_service, pedidos_service, productos_service, usuarios_service
+from app.service.cache_service import invalidar_catalogo
+from app.service.paginacion import codificar_cursor
+from app.service.semillas_service import (
+    CATEGORIAS, CONTRASENIA_POR_DEFECTO, email_usuario, nombre_producto, producto_oculto, usuario_inactivo
+)
+"""
+Microbenchmarks de la capa de servicios contra bases de distinto tamaño, con línea base y control de regresiones.
+Por cada tamaño (--tamanos, cantidad de productos y de pedidos; los usuarios son la décima parte) se siembra con
+semillas_service una base SQLite en el directorio temporal (se reutiliza en corridas siguientes) y se llama directamente a cada caso de
+CASOS dentro de un contexto de la app: una vez para calentar y luego --repeticiones veces, vaciando antes la caché del
+catálogo y la sesión, así se mide siempre el camino a la base. Los casos de CASOS_ESCRITURA corren sobre una copia
+descartable de la base, para que la base reutilizada sea la misma en la línea base y en cada comparación.
+Modos:
+    (por defecto): imprime los resultados (JSON con mínimo y mediana en ms por tamaño y caso).
+    --guardar ARCHIVO: además los guarda como línea base.
+    --comparar ARCHIVO: compara con la línea base y marca como regresión todo caso cuyo mínimo Y cuya mediana
+        son más lentos que (1 + --tolerancia) veces los de la base y por más de --piso-ms. Exigir que coincidan
+        ambas medidas filtra el ruido de la máquina, que suele mover sólo una (en corridas repetidas sobre el mismo
+        código cada una por separado varió hasta un 50-70%). Sale con código 1 si hay regresiones.
+Las líneas base dependen del hardware: sólo tiene sentido comparar corridas hechas en la misma máquina.
+Uso:
+    python benchmarks/bench_servicios.py [--tamanos 1k,100k,1m] [--repeticiones 30] [--casos listar,crear]
+        [--guardar benchmarks/baseline_servicios.json | --comparar benchmarks/baseline_servicios.json]
+"""
+
+def _caso_listar(n):
+    cursor = codificar_cursor(n // 2)
+    return lambda: productos_service.listar("50", cursor)
+
+def _caso_obtener_id(n):
+    return lambda: productos_service.obtener(1, _visible(n // 2))
+
+def _caso_obtener_nombre(n):
+    return lambda: productos_service.obtener(0, nombre_producto(_visible(n // 3)))
+
+def _caso_obtener_categoria(n):
+    return lambda: productos_service.obtener(2, CATEGORIAS[3])
+
+def _caso_pedidos_crear(n):
+    productos = [{"producto_id": _visible(i), "cantidad": 1} for i in (1, n // 2, n)]
+    cuerpo = {"id_usuario": _usuarios(n), "productos": productos}
+    return lambda: pedidos_service.crear({**cuerpo, "productos": list(cuerpo["productos"])})
+
+def _caso_pedidos_obtener(n):
+    return lambda: pedidos_service.obtener(0, 2, None)
+
+def _caso_admin_pedidos(n):
+    cursor = codificar_cursor(n // 2)
+    return lambda: admin_service.listar_pedidos("false", "50", cursor)
+
+def _caso_check_password(n):
+    email = email_usuario(_activo(max(_usuarios(n) // 2, 2)))
+    return lambda: usuarios_service.check_password(email, CONTRASENIA_POR_DEFECTO)
+
+CASOS = {
+    "productos.listar (página de 50)": _caso_listar,
+    "productos.obtener por id": _caso_obtener_id,
+    "productos.obtener por nombre": _caso_obtener_nombre,
+    "productos.obtener por categoría": _caso_obtener_categoria,
+    "pedidos.crear (3 productos)": _caso_pedidos_crear,
+    "pedidos.obtener por usuario": _caso_pedidos_obtener,
+    "admin.listar_pedidos (abiertos, página de 50)": _caso_admin_pedidos,
+    "usuarios.check_password": _caso_check_password,
+}
+CASOS_ESCRITURA = {"pedidos.crear (3 productos)"}
+
+def _usuarios(n):
+    return max(n // 10, 10)
+
+def _visible(numero):
+    # los múltiplos de 7 se siembran ocultos: se usa el anterior
+    return numero - 1 if producto_oculto(numero) else numero
+
+def _activo(numero):
+    return numero - 1 if usuario_inactivo(numero) else numero
+
+def parse_tamano(texto):
+    texto = texto.strip().lower()
+    multiplicador = {"k": 1000, "m": 1000000}.get(texto[-1:], 1)
+    return int(float(texto.rstrip("km")) * multiplicador)
+
+def _ruta_base(n):
+    return os.path.join(tempfile.gettempdir(), f"mj_api_servicios_semillas_{n}.db")
+
+def _crear_app(ruta):
+    with redirect_stdout(sys.stderr):
+        return create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{ruta}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "JWT_SECRET_KEY": "bench-jwt-secret",
+            "SERVER_TIMING_HABILITADO": False,
+        })
+
+def preparar_app(n):
+    app = _crear_app(_ruta_base(n))
+    inicio = time.perf_counter()
+    if preparar_base(app, n, _usuarios(n), n, semilla=n):
+        print(f"Base de {n} filas sembrada en {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+    return app
+
+@contextmanager
+def copia_descartable(n):
+    descriptor, ruta = tempfile.mkstemp(suffix=".db", prefix=f"mj_api_servicios_{n}_")
+    os.close(descriptor)
+    shutil.copyfile(_ruta_base(n), ruta)
+    app = _crear_app(ruta)
+    try:
+        yield app
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.unlink(ruta)
+
+def medir(app, funcion, repeticiones):
+    tiempos = []
+    with app.app_context():
+        for i in range(repeticiones + 1):
+            invalidar_catalogo()
+            db.session.remove()
+            inicio = time.perf_counter()
+            funcion()
+            if i:  # la primera llamada sólo calienta
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        db.session.remove()
+    return {"min_ms": round(min(tiempos), 3), "mediana_ms": round(statistics.median(tiempos), 3)}
+
+def comparar(actual, base, tolerancia, piso_ms):
+    regresiones = []
+    for tamano, casos in actual["resultados"].items():
+        for caso, medida in casos.items():
+            referencia = base["resultados"].get(tamano, {}).get(caso)
+            if referencia is None:
+                continue
+            cambios = {}
+            for estadistico in ("min_ms", "mediana_ms"):
+                antes, ahora = referencia[estadistico], medida[estadistico]
+                cambio = ahora / antes - 1 if antes else 0.0
+                cambios[estadistico] = (antes, ahora, cambio, cambio > tolerancia and ahora - antes > piso_ms)
+            regresion = all(peor for *_, peor in cambios.values())
+            antes, ahora, cambio, _ = cambios["min_ms"]
+            marca = "REGRESIÓN" if regresion else "ok"
+            print(f"{tamano:>8} {caso:<48} mín {antes:10.2f} -> {ahora:10.2f} ms ({cambio:+7.1%}), "
+                  f"mediana ({cambios['mediana_ms'][2]:+7.1%}) {marca}", file=sys.stderr)
+            if regresion:
+                regresiones.append({
+                    "tamano": tamano, "caso": caso,
+                    **{f"base_{e}": c[0] for e, c in cambios.items()},
+                    **{f"actual_{e}": c[1] for e, c in cambios.items()},
+                })
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks de servicios con línea base")
+    parser.add_argument("--tamanos", default="1k,100k,1m", help="Filas de productos y pedidos (sufijos k y m)")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--casos", default=None, help="Subcadenas separadas por coma para filtrar los casos")
+    parser.add_argument("--guardar", default=None, help="Guardar el resultado como línea base en este archivo")
+    parser.add_argument("--comparar", default=None, help="Línea base contra la cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.3, help="Aumento relativo permitido (0.3 = 30%%)")
+    parser.add_argument("--piso-ms", type=float, default=2.0, help="Diferencia absoluta mínima para marcar")
+    args = parser.parse_args()
+
+    filtros = [f.strip() for f in args.casos.split(",")] if args.casos else None
+    casos = {nombre: fabrica for nombre, fabrica in CASOS.items()
+             if filtros is None or any(f in nombre for f in filtros)}
+
+    resultados = {}
+    for n in (parse_tamano(t) for t in args.tamanos.split(",")):
+        app = preparar_app(n)
+        resultados[str(n)] = {}
+        for nombre, fabrica in casos.items():
+            if nombre in CASOS_ESCRITURA:
+                with copia_descartable(n) as copia:
+                    medida = medir(copia, fabrica(n), args.repeticiones)
+            else:
+                medida = medir(app, fabrica(n), args.repeticiones)
+            resultados[str(n)][nombre] = medida
+            print(f"{n:>8} {nombre:<48} mín {medida['min_ms']:10.2f} ms  mediana {medida['mediana_ms']:10.2f} ms",
+                  file=sys.stderr)
+        with app.app_context():
+            db.engine.dispose()
+
+    actual = {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "maquina": {"python": platform.python_version(), "plataforma": platform.platform()},
+        "repeticiones": args.repeticiones,
+        "resultados": resultados,
+    }
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(actual, archivo, indent=2, ensure_ascii=False)
+            archivo.write("\n")
+
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(actual, base, args.tolerancia, args.piso_ms)
+        actual["regresiones"] = regresiones
+
+    print(json.dumps(actual, indent=2, ensure_ascii=False))
+    sys.exit(1 if regresiones else 0)
+
+if __name__ == "__main__":
+    main()
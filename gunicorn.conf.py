@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+"""
+Configuración de gunicorn (se carga sola si se ejecuta gunicorn desde la raíz del proyecto).
+Prepara el modo multiproceso de prometheus_client para que GET /metrics agregue los valores de todos los workers:
+    - PROMETHEUS_MULTIPROC_DIR se define acá, antes de que los workers importen la app (y prometheus_client).
+    - Al arrancar el master se vacía el directorio, para no arrastrar valores de una ejecución anterior.
+    - Cuando un worker termina se marcan como muertos sus gauges 'livesum' (pool de conexiones).
+Además, cada worker abre DB_POOL_PREFILL conexiones del pool apenas carga la app (post_worker_init), también con
+preload_app: las que abriera el master se descartarían en el fork.
+Variables de entorno:
+    PORT (default 5000), WEB_CONCURRENCY (cantidad de workers, default 2),
+    PROMETHEUS_MULTIPROC_DIR (default: <tmp>/mj_api_metricas).
+"""
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "mj_api_metricas"))
+
+def on_starting(server):
+    directorio = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(directorio, exist_ok=True)
+
+def post_worker_init(worker):
+    from app.service.pool_service import calentar_pool
+    calentar_pool(worker.wsgi)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)